@@ -0,0 +1,99 @@
+import os
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+from fastapi.concurrency import run_in_threadpool
+from database import dbconfig
+
+# [NEW] asyncio 전용 MySQL Connection Pool (aiomysql)
+# 동기 풀(database.py)과 같은 접속 정보를 쓰지만, 쿼리 대기 중에 스레드를 점유하지 않습니다.
+# aiomysql은 선택 의존성입니다. 설치되지 않았으면 *_async 함수는 @sync_fallback으로 동기 버전을 스레드풀에서 실행합니다.
+# 이 풀은 database.PoolManager 밖에 있어 DB_POOL_SIZE/DB_MAX_OVERFLOW 한도와 db_pool_* 지표에 포함되지 않으므로,
+# 워커당 연결 수는 DB_POOL_SIZE + DB_MAX_OVERFLOW + DB_ASYNC_POOL_MAXSIZE로 계산하세요.
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+ASYNC_POOL_MINSIZE = int(os.getenv("DB_ASYNC_POOL_MINSIZE", 1))
+ASYNC_POOL_MAXSIZE = int(os.getenv("DB_ASYNC_POOL_MAXSIZE", 20))
+
+async_pool = None
+_pool_lock = asyncio.Lock()
+
+
+def sync_fallback(sync_fn):
+    """aiomysql이 없으면 장식한 async 함수 대신 sync_fn을 스레드풀에서 실행합니다."""
+    def decorator(async_fn):
+        if aiomysql is not None:
+            return async_fn
+
+        @functools.wraps(async_fn)
+        async def wrapper(*args, **kwargs):
+            return await run_in_threadpool(sync_fn, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def get_async_pool():
+    """aiomysql Pool을 (최초 호출 시) 생성하여 반환합니다."""
+    global async_pool
+    if async_pool is not None:
+        return async_pool
+    if aiomysql is None:
+        raise RuntimeError("비동기 DB 계층을 사용하려면 aiomysql 패키지가 필요합니다. (pip install aiomysql)")
+    async with _pool_lock:
+        if async_pool is None:
+            async_pool = await aiomysql.create_pool(
+                host=dbconfig["host"],
+                port=dbconfig["port"],
+                user=dbconfig["user"],
+                password=dbconfig["password"],
+                db=dbconfig["database"],
+                minsize=ASYNC_POOL_MINSIZE,
+                maxsize=ASYNC_POOL_MAXSIZE,
+                # 트랜잭션이 열린 채 반납된 연결은 aiomysql이 끊어버리므로
+                # 읽기는 autocommit, 쓰기는 conn.begin()으로 명시적으로 시작합니다.
+                autocommit=True,
+                charset="utf8mb4",
+            )
+    return async_pool
+
+
+@asynccontextmanager
+async def get_async_connection():
+    """비동기 Pool에서 연결을 빌려오고, 블록이 끝나면 반납합니다."""
+    pool = await get_async_pool()
+    conn = await pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+@asynccontextmanager
+async def async_transaction():
+    """
+    BEGIN ~ COMMIT 구간의 연결. 커밋하지 않고 블록을 빠져나오면 롤백합니다.
+    커밋해도 읽기 고정(database.pin_reads)은 걸리지 않으므로, 라우트에서 쓰기에 사용하면 호출한 쪽에서 고정합니다.
+    """
+    async with get_async_connection() as conn:
+        await conn.begin()
+        try:
+            yield conn
+        finally:
+            if conn.get_transaction_status():
+                await conn.rollback()
+
+
+def dict_cursor(conn):
+    """dictionary=True 커서와 같은 형태(dict)로 결과를 받는 커서"""
+    return conn.cursor(aiomysql.DictCursor)
+
+
+async def close_async_pool():
+    global async_pool
+    if async_pool is not None:
+        async_pool.close()
+        await async_pool.wait_closed()
+        async_pool = None
@@ -1,26 +1,57 @@
-import os
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import NullPool
 from sqlalchemy.orm import sessionmaker, declarative_base
-from dotenv import load_dotenv
+import database
+from database import pin_reads, is_pinned
+from routers.deps import client_pin_key
 
-load_dotenv()
+# [NEW] 게시판 엔진도 database.pool_manager의 연결을 사용합니다.
+# SQLAlchemy 쪽에는 풀을 두지 않고(NullPool), 세션이 연결을 요청할 때마다 pool_manager에서 빌리고
+# 세션이 끝나면 close()로 돌려줍니다. 접속 정보(dbconfig), 연결 수 한도, 대기 시간, ping/recycle,
+# 연결/쿼리 지표(pool="mysql"), 종료 처리가 raw SQL 서비스와 같습니다.
+# 한도를 넘으면 PoolExhaustedError가 그대로 올라가 503으로 응답합니다.
+engine = create_engine(
+    "mysql+mysqlconnector://",
+    creator=lambda: database.pool_manager.get_connection(),
+    poolclass=NullPool,
+    echo=False,
+)
 
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "3306")
-DB_USER = os.getenv("DB_USER", "root")
-DB_PASSWORD = os.getenv("DB_PASSWORD", "")
-DB_NAME = os.getenv("DB_NAME", "pk_fk_practice")
+# [NEW] 조회 전용 엔진 - replica(database.read_pool_manager)가 있으면 그 연결을, 없으면 primary를 사용
+read_engine = create_engine(
+    "mysql+mysqlconnector://",
+    creator=lambda: (database.read_pool_manager or database.pool_manager).get_connection(),
+    poolclass=NullPool,
+    echo=False,
+)
 
-DATABASE_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-engine = create_engine(DATABASE_URL, echo=False)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 
-def get_db():
+@event.listens_for(SessionLocal, "after_commit")
+def _pin_after_commit(session):
+    # 글/댓글을 쓴 클라이언트는 잠시 동안 목록도 primary에서 읽음 (replica 지연 대비)
+    pin_reads(session.info.get("pin_key"))
+
+
+def get_db(request: Request):
     """SQLAlchemy DB 세션 (게시판용)"""
     db = SessionLocal()
+    db.info["pin_key"] = client_pin_key(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request):
+    """조회 전용 SQLAlchemy 세션 (replica, 방금 쓰기를 한 클라이언트는 primary)"""
+    pin_key = client_pin_key(request)
+    db = SessionLocal() if is_pinned(pin_key) else ReadSessionLocal()
+    db.info["pin_key"] = pin_key
     try:
         yield db
     finally:
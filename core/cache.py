@@ -0,0 +1,256 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from core.metrics import LatencyStats
+from core.cache_backend import CACHE_KEY_PREFIX, INVALIDATION_CHANNEL
+
+SHARED_LOCK_TTL = 5.0  # 공유 캐시를 채우는 워커가 잡는 락의 최대 유지 시간(초)
+
+
+class TTLCache:
+    """만료 시간(TTL)과 최대 개수(LRU) 제한이 있는 스레드 안전 인메모리 캐시"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            # 가장 오래 사용되지 않은 항목부터 제거
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def delete_where(self, predicate) -> int:
+        """predicate(key)가 참인 항목을 모두 제거하고 제거한 개수를 반환합니다."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+_MISSING = object()
+
+
+class SingleFlightCache:
+    """
+    값 하나를 캐싱하는 갱신형 캐시. (예: 상점 아이템 카탈로그)
+    - ttl 이내: 캐시 값 반환
+    - ttl ~ stale_ttl: 기존 값을 바로 반환하고 백그라운드에서 한 번만 갱신 (stale-while-revalidate)
+    - 값이 없거나 invalidate() 된 경우: 한 요청만 DB를 조회하고 나머지는 그 결과를 기다림 (single-flight)
+    빈 목록도 정상 값으로 캐싱합니다.
+    backend를 주면 여러 워커가 값 하나를 공유하고, invalidate()가 모든 워커에 전파됩니다.
+    공유 값은 세대 번호가 붙은 키에 저장하므로, invalidate() 전에 시작된 조회가 끝나면서 쓴 값은
+    새 세대에서 보이지 않습니다.
+    """
+
+    def __init__(self, loader, ttl: float = 60.0, stale_ttl: float = 300.0, name: str = "cache", backend=None):
+        self._loader = loader
+        self._backend = backend
+        self._shared_key = CACHE_KEY_PREFIX + name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self._cond = threading.Condition()
+        self._value = _MISSING
+        self._loaded_at = 0.0
+        self._generation = 0      # invalidate() 할 때마다 증가
+        self._refreshing = False
+        self.version = 0          # 새 값이 들어올 때마다 증가 (파생 데이터 재생성 판단용)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.shared_hits = 0
+        self.refresh_latency = LatencyStats()
+        if backend is not None:
+            backend.subscribe(INVALIDATION_CHANNEL, self._on_invalidation)
+
+    def get(self):
+        with self._cond:
+            while True:
+                age = time.monotonic() - self._loaded_at
+                if self._value is not _MISSING and age < self.ttl:
+                    self.hits += 1
+                    return self._value
+                if self._value is not _MISSING and age < self.stale_ttl:
+                    self.stale_hits += 1
+                    self._refresh_in_background()
+                    return self._value
+                if not self._refreshing:
+                    break
+                # 다른 요청이 이미 조회 중 → 결과를 기다림
+                self._cond.wait()
+            self.misses += 1
+            self._refreshing = True
+            generation = self._generation
+        return self._refresh(generation, raise_errors=True)
+
+    def peek(self):
+        """
+        DB 조회 없이 돌려줄 수 있는 값이 있으면 반환하고, 없으면(비었거나 stale_ttl이 지남) None을 반환합니다.
+        기다리거나 loader를 직접 호출하지 않으므로 이벤트 루프에서 호출해도 됩니다. (TTL이 지난 값이면 백그라운드 갱신만 시작)
+        """
+        with self._cond:
+            if self._value is _MISSING:
+                return None
+            age = time.monotonic() - self._loaded_at
+            if age < self.ttl:
+                self.hits += 1
+                return self._value
+            if age < self.stale_ttl:
+                self.stale_hits += 1
+                self._refresh_in_background()
+                return self._value
+            return None
+
+    def _refresh_in_background(self):
+        # lock 안에서 호출 - 이미 갱신 중이면 아무것도 하지 않음
+        if not self._refreshing:
+            self._refreshing = True
+            threading.Thread(target=self._refresh, args=(self._generation,),
+                             name=f"{self.name}-refresh", daemon=True).start()
+
+    def _refresh(self, generation: int, raise_errors: bool = False):
+        started = time.perf_counter()
+        try:
+            value = self._load()
+        except Exception as e:
+            with self._cond:
+                self._refreshing = False
+                self.refresh_errors += 1
+                self._cond.notify_all()
+            if raise_errors:
+                raise
+            print(f"⚠️ {self.name} refresh failed: {e}")
+            return None
+        self.refresh_latency.observe(time.perf_counter() - started)
+        with self._cond:
+            self._refreshing = False
+            self.refreshes += 1
+            # 조회 도중 invalidate() 되었다면 이 값은 이미 낡은 값이므로 저장하지 않음
+            if generation == self._generation:
+                self._value = value
+                self._loaded_at = time.monotonic()
+                self.version += 1
+            self._cond.notify_all()
+        return value
+
+    def _load(self):
+        """공유 저장소에 값이 있으면 그것을 쓰고, 없으면 한 워커만 DB에서 읽어 채웁니다."""
+        if self._backend is None:
+            return self._loader()
+        try:
+            key = self._generation_key()
+            lock_key = key + ":lock"
+            raw = self._backend.get(key)
+            locked = raw is None and self._backend.add(lock_key, b"1", ttl=SHARED_LOCK_TTL)
+            if raw is None and not locked:
+                # 다른 워커가 채우는 중 → 잠시 기다렸다가 그 결과를 사용
+                deadline = time.monotonic() + SHARED_LOCK_TTL
+                while raw is None and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    raw = self._backend.get(key)
+            if raw is not None:
+                with self._cond:
+                    self.shared_hits += 1
+                return pickle.loads(raw)
+        except Exception as e:
+            print(f"⚠️ {self.name} shared cache unavailable: {e}")
+            return self._loader()
+
+        try:
+            value = self._loader()
+            # 조회 도중 invalidate() 되었다면 세대가 바뀌었으므로 이 값은 이전 세대 키에만 남음
+            self._backend.set(key, pickle.dumps(value), ttl=self.ttl)
+            return value
+        finally:
+            if locked:
+                self._backend.delete(lock_key)
+
+    def _generation_key(self) -> str:
+        """공유 저장소의 현재 세대 값 키 (invalidate()마다 세대 번호가 올라감)"""
+        generation = self._backend.get(self._shared_key + ":gen")
+        return f"{self._shared_key}:{int(generation or 0)}"
+
+    def invalidate(self):
+        """캐시를 무효화합니다. 다음 요청이 새 값을 조회합니다. (공유 저장소 사용 시 모든 워커에 전파)"""
+        self._invalidate_local()
+        if self._backend is not None:
+            try:
+                old_key = self._generation_key()
+                self._backend.incr(self._shared_key + ":gen")
+                self._backend.delete(old_key)
+                self._backend.publish(INVALIDATION_CHANNEL, self.name)
+            except Exception as e:
+                print(f"⚠️ {self.name} invalidation broadcast failed: {e}")
+
+    def _on_invalidation(self, name: str):
+        if name == self.name:
+            self._invalidate_local()
+
+    def _invalidate_local(self):
+        with self._cond:
+            self._generation += 1
+            self._value = _MISSING
+            self._loaded_at = 0.0
+
+    def stats(self) -> dict:
+        with self._cond:
+            total = self.hits + self.stale_hits + self.misses
+            return {
+                "version": self.version,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.stale_hits) / total, 4) if total else 0.0,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+                "shared_hits": self.shared_hits,
+                "refreshing": self._refreshing,
+                "refresh_latency": self.refresh_latency.snapshot(),
+            }
@@ -0,0 +1,149 @@
+import os
+import time
+import threading
+
+# [NEW] 여러 워커(uvicorn --workers N)가 함께 쓰는 캐시 저장소
+# CACHE_BACKEND_URL=redis://host:6379/0 이면 Redis(호환 서버)를, 없으면 프로세스 내부 저장소를 사용합니다.
+CACHE_BACKEND_URL = os.getenv("CACHE_BACKEND_URL", "")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "fastapi:")
+INVALIDATION_CHANNEL = CACHE_KEY_PREFIX + "invalidate"
+
+
+class LocalCacheBackend:
+    """프로세스 내부 저장소 (단일 워커 / 테스트용 대체 구현)"""
+
+    SWEEP_EVERY = 1024  # 쓰기 이만큼마다 만료된 키 정리 (읽히지 않는 키가 쌓이지 않도록)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}  # key -> (만료 시각 또는 None, 값)
+        self._subscribers = {}
+        self._writes = 0
+
+    def _sweep(self):
+        # lock 안에서 호출
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY:
+            return
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at is not None and expires_at <= now]:
+            del self._data[key]
+
+    def _alive(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str):
+        with self._lock:
+            return self._alive(key)
+
+    def set(self, key: str, value: bytes, ttl: float = None):
+        with self._lock:
+            self._sweep()
+            self._data[key] = (time.monotonic() + ttl if ttl else None, value)
+
+    def add(self, key: str, value: bytes, ttl: float = None) -> bool:
+        """키가 없을 때만 저장합니다. (분산 락 용도)"""
+        with self._lock:
+            if self._alive(key) is not None:
+                return False
+            self._sweep()
+            self._data[key] = (time.monotonic() + ttl if ttl else None, value)
+            return True
+
+    def incr(self, key: str) -> int:
+        """정수 값을 1 늘리고 새 값을 반환합니다. (없으면 0에서 시작)"""
+        with self._lock:
+            value = int(self._alive(key) or 0) + 1
+            self._data[key] = (None, str(value).encode())
+            return value
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def publish(self, channel: str, message: str):
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, []))
+        for callback in callbacks:
+            callback(message)
+
+    def subscribe(self, channel: str, callback):
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+
+class RedisCacheBackend:
+    """Redis 프로토콜 서버를 쓰는 공유 저장소. 무효화는 Pub/Sub으로 모든 워커에 전달됩니다."""
+
+    def __init__(self, url: str):
+        import redis  # 선택 의존성: Redis 백엔드를 쓸 때만 필요
+        self._client = redis.Redis.from_url(url)
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._pubsub = None
+        self._listener = None
+
+    def get(self, key: str):
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float = None):
+        self._client.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    def add(self, key: str, value: bytes, ttl: float = None) -> bool:
+        return bool(self._client.set(key, value, px=int(ttl * 1000) if ttl else None, nx=True))
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(key))
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+    def publish(self, channel: str, message: str):
+        self._client.publish(channel, message)
+
+    def subscribe(self, channel: str, callback):
+        with self._lock:
+            first = channel not in self._subscribers
+            self._subscribers.setdefault(channel, []).append(callback)
+            if not first:
+                return
+            if self._pubsub is None:
+                self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{channel: self._dispatch})
+            if self._listener is None:
+                self._listener = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def _dispatch(self, message):
+        channel = message["channel"].decode("utf-8")
+        data = message["data"].decode("utf-8")
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, []))
+        for callback in callbacks:
+            try:
+                callback(data)
+            except Exception as e:
+                print(f"⚠️ cache invalidation handler failed: {e}")
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.stop()
+        self._client.close()
+
+
+def create_cache_backend(url: str = CACHE_BACKEND_URL):
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return RedisCacheBackend(url)
+        except ImportError:
+            print("⚠️ redis 패키지가 없어 프로세스 내부 캐시를 사용합니다. (pip install redis)")
+    return LocalCacheBackend()
+
+
+cache_backend = create_cache_backend()
@@ -0,0 +1,85 @@
+import re
+import time
+from core.metrics import REGISTRY, Counter, Histogram
+
+# [NEW] DB 연결/쿼리 지표 (mysql.connector 풀과 SQLAlchemy 엔진이 함께 사용)
+CHECKOUT_WAIT = REGISTRY.register(Histogram(
+    "db_pool_checkout_wait_seconds", "연결을 얻기까지 기다린 시간", ["pool"]))
+CONNECTION_HOLD = REGISTRY.register(Histogram(
+    "db_pool_connection_hold_seconds", "연결을 빌려서 반납하기까지의 시간", ["pool"]))
+QUERY_LATENCY = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "SQL 문 실행 시간 (정규화된 fingerprint 기준)", ["pool", "fingerprint"]))
+ROWS_RETURNED = REGISTRY.register(Counter(
+    "db_rows_returned_total", "SQL 문이 반환한 행 수", ["pool", "fingerprint"]))
+QUERY_ERRORS = REGISTRY.register(Counter(
+    "db_query_errors_total", "실패한 SQL 문 수", ["pool", "fingerprint"]))
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\([^)]*\)s|%s|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(sql) -> str:
+    """리터럴/파라미터를 ?로 바꾸고 공백을 정리하여 같은 형태의 쿼리를 하나로 묶습니다."""
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    sql = _STRING.sub("?", str(sql))
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _VALUES_LIST.sub(r"\1, ...", sql)
+    sql = _IN_LIST.sub("(?+)", sql)
+    sql = _SPACES.sub(" ", sql).strip()
+    return sql[:200]
+
+
+class InstrumentedCursor:
+    """execute/fetch 호출 시간을 기록하는 커서 래퍼"""
+
+    def __init__(self, cursor, pool_name: str):
+        self._cursor = cursor
+        self._pool_name = pool_name
+        self._fingerprint = None
+
+    def _timed(self, method, operation, *args, **kwargs):
+        self._fingerprint = fingerprint(operation)
+        started = time.perf_counter()
+        try:
+            return method(operation, *args, **kwargs)
+        except Exception:
+            QUERY_ERRORS.inc(pool=self._pool_name, fingerprint=self._fingerprint)
+            raise
+        finally:
+            QUERY_LATENCY.observe(time.perf_counter() - started,
+                                  pool=self._pool_name, fingerprint=self._fingerprint)
+
+    def execute(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.executemany, operation, *args, **kwargs)
+
+    def _count(self, rows):
+        if self._fingerprint is not None and rows:
+            ROWS_RETURNED.inc(len(rows), pool=self._pool_name, fingerprint=self._fingerprint)
+        return rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count([row])
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        return self._count(self._cursor.fetchmany(*args, **kwargs))
+
+    def fetchall(self):
+        return self._count(self._cursor.fetchall())
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
@@ -0,0 +1,117 @@
+import os
+import time
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from core import security
+from core.metrics import LatencyStats
+
+# [NEW] 비밀번호 해싱 전용 프로세스 풀
+# PBKDF2/bcrypt는 CPU를 오래 점유(GIL)하므로 공용 스레드풀 대신 별도 프로세스에서 실행합니다.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", min(4, os.cpu_count() or 1)))
+HASH_MAX_QUEUE = int(os.getenv("HASH_MAX_QUEUE", 32))
+
+
+class HashingBusyError(Exception):
+    """해싱 대기열이 가득 차서 요청을 받을 수 없을 때 발생합니다."""
+
+
+# ─── 워커 프로세스에서 실행되는 함수 (pickle 가능하도록 모듈 최상위에 정의) ───
+
+def pbkdf2_hash(password: str) -> str:
+    return security.get_password_hash(password)
+
+def pbkdf2_verify(plain: str, hashed: str) -> bool:
+    return security.verify_password(plain, hashed)
+
+def bcrypt_hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+def bcrypt_verify(plain: str, hashed: str) -> bool:
+    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+
+def _timed_call(fn, submitted_at: float, *args):
+    started_at = time.time()
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, started_at - submitted_at, time.perf_counter() - t0
+
+
+class HashingExecutor:
+    """동시 실행 수(max_workers)와 대기열 길이(max_queue)가 제한된 해싱 실행기"""
+
+    def __init__(self, max_workers: int = HASH_WORKERS, max_queue: int = HASH_MAX_QUEUE):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.queue_wait = LatencyStats()
+        self.hash_time = LatencyStats()
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise HashingBusyError("비밀번호 처리 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+            self._pending += 1
+            if self._pool is None:
+                # 서버 스레드가 이미 떠 있는 상태에서 fork하면 잠긴 락이 복사되어 멈출 수 있으므로 spawn 사용
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            pool = self._pool
+        try:
+            future = pool.submit(_timed_call, fn, time.time(), *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+        if future is not None and not future.cancelled() and future.exception() is None:
+            _, wait, elapsed = future.result()
+            self.queue_wait.observe(max(wait, 0.0))
+            self.hash_time.observe(elapsed)
+
+    def run(self, fn, *args):
+        """동기 코드용: 워커에 작업을 맡기고 결과를 기다립니다."""
+        return self._submit(fn, *args).result()[0]
+
+    async def arun(self, fn, *args):
+        """비동기 코드용: 이벤트 루프를 막지 않고 결과를 기다립니다."""
+        result = await asyncio.wrap_future(self._submit(fn, *args))
+        return result[0]
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = self._pending
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": pending,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.snapshot(),
+            "hash_time": self.hash_time.snapshot(),
+        }
+
+
+hash_executor = HashingExecutor()
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await hash_executor.arun(pbkdf2_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hash_executor.arun(pbkdf2_verify, plain_password, hashed_password)
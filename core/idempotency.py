@@ -0,0 +1,111 @@
+import os
+import time
+import pickle
+import hashlib
+import threading
+from core.cache_backend import cache_backend, LocalCacheBackend, CACHE_KEY_PREFIX
+
+# [NEW] Idempotency-Key 저장소
+# 같은 키로 다시 온 요청은 저장된 응답을 그대로 돌려주고(DB 접근 없음),
+# 아직 처리 중인 키는 두 번 실행하지 않고 처음 요청의 결과를 기다립니다.
+# 처리 중 표시와 응답은 공유 캐시 저장소(core.cache_backend)에 두므로, 재시도가 다른 워커로 가도 한 번만 실행됩니다.
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", 600))             # 응답 보관 시간(초)
+IDEMPOTENCY_PENDING_TTL = float(os.getenv("IDEMPOTENCY_PENDING_TTL", 60))  # 처리 중 표시 유지 시간(초) - 워커가 죽어도 풀리도록
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 10))  # 처리 중인 같은 키를 기다리는 최대 시간(초)
+IDEMPOTENCY_POLL_INTERVAL = 0.05
+
+
+class IdempotencyConflictError(Exception):
+    """같은 키의 요청이 아직 처리 중이거나, 다른 내용의 요청에 같은 키를 재사용했을 때 발생합니다."""
+
+
+class IdempotencyStore:
+    """(사용자, 엔드포인트, 키)별 응답을 TTL 동안 보관하는 저장소. 처음 요청만 SET NX로 실행 권한을 얻습니다."""
+
+    def __init__(self, backend=None, ttl: float = IDEMPOTENCY_TTL, pending_ttl: float = IDEMPOTENCY_PENDING_TTL,
+                 wait_timeout: float = IDEMPOTENCY_WAIT_TIMEOUT):
+        self._backend = backend or cache_backend
+        self._fallback = LocalCacheBackend()  # 공유 저장소 장애 시 최소한 프로세스 안에서는 중복 실행을 막음
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.replays = 0
+        self.waits = 0
+        self.conflicts = 0
+        self.backend_errors = 0
+
+    @staticmethod
+    def _storage_key(key) -> str:
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return f"{CACHE_KEY_PREFIX}idempotency:{digest}"
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _call(self, method: str, *args, **kwargs):
+        try:
+            return getattr(self._backend, method)(*args, **kwargs)
+        except Exception as e:
+            self._count("backend_errors")
+            print(f"⚠️ idempotency store unavailable, using local fallback: {e}")
+            return getattr(self._fallback, method)(*args, **kwargs)
+
+    def run(self, key, fn, fingerprint=None, on_wait=None):
+        """
+        key로 처음 온 요청이면 fn()을 실행해 결과를 저장하고, 이미 처리된 키면 저장된 결과를 반환합니다.
+        같은 키가 처리 중이면 기다립니다. 기다리기 전에 on_wait()을 한 번 호출합니다. (예: 요청 연결 반납)
+        """
+        storage_key = self._storage_key(key)
+        pending = pickle.dumps({"done": False, "fingerprint": fingerprint})
+        deadline = None
+        while True:
+            if self._call("add", storage_key, pending, ttl=self.pending_ttl):
+                self._count("executions")
+                break
+            raw = self._call("get", storage_key)
+            if raw is None:
+                continue  # 그 사이 만료/삭제됨 → 다시 선점 시도
+            entry = pickle.loads(raw)
+            if entry["fingerprint"] != fingerprint:
+                self._count("conflicts")
+                raise IdempotencyConflictError("같은 Idempotency-Key가 다른 요청에 사용되었습니다.")
+            if entry["done"]:
+                self._count("replays")
+                return entry["result"]
+            # 처음 요청이 끝날 때까지 기다린 뒤 다시 확인 (실패로 끝났으면 이번 요청이 실행)
+            if deadline is None:
+                self._count("waits")
+                deadline = time.monotonic() + self.wait_timeout
+                if on_wait is not None:
+                    on_wait()
+            elif time.monotonic() >= deadline:
+                self._count("conflicts")
+                raise IdempotencyConflictError("같은 Idempotency-Key의 요청이 아직 처리 중입니다.")
+            time.sleep(IDEMPOTENCY_POLL_INTERVAL)
+
+        try:
+            result = fn()
+        except BaseException:
+            # 예외(혼잡, DB 오류 등)는 저장하지 않음 → 같은 키로 다시 시도 가능
+            self._call("delete", storage_key)
+            raise
+
+        self._call("set", storage_key, pickle.dumps({"done": True, "fingerprint": fingerprint, "result": result}),
+                   ttl=self.ttl)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "replays": self.replays,
+                "waits": self.waits,
+                "conflicts": self.conflicts,
+                "backend_errors": self.backend_errors,
+            }
+
+
+idempotency_store = IdempotencyStore()
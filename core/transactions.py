@@ -0,0 +1,96 @@
+import os
+import time
+import random
+import asyncio
+import functools
+from core.metrics import REGISTRY, Counter
+
+# [NEW] 잠금 대기 초과(1205) / 교착 상태(1213)에서만 트랜잭션 전체를 다시 실행하는 헬퍼
+# 두 오류 모두 MySQL이 해당 문장(1213은 트랜잭션 전체)을 되돌린 상태이므로, 처음부터 다시 실행해도 안전합니다.
+TX_MAX_ATTEMPTS = int(os.getenv("TX_MAX_ATTEMPTS", 3))
+TX_RETRY_BASE_DELAY = float(os.getenv("TX_RETRY_BASE_DELAY", 0.02))  # 첫 재시도 전 최대 대기(초), 이후 2배씩
+TX_RETRY_MAX_DELAY = float(os.getenv("TX_RETRY_MAX_DELAY", 0.5))
+
+LOCK_WAIT_TIMEOUT = 1205
+DEADLOCK = 1213
+RETRYABLE_ERRNOS = {LOCK_WAIT_TIMEOUT, DEADLOCK}
+
+TX_RETRIES = REGISTRY.register(Counter(
+    "db_tx_retries_total", "잠금 대기 초과/교착 상태로 다시 실행한 트랜잭션 수", ["function", "errno"]))
+TX_OUTCOMES = REGISTRY.register(Counter(
+    "db_tx_outcomes_total", "재시도 트랜잭션의 최종 결과 (ok, retried_ok, gave_up, error)", ["function", "outcome"]))
+
+
+def error_code(exc):
+    """mysql.connector(errno) / aiomysql·PyMySQL(args[0]) 오류에서 MySQL 오류 번호를 꺼냅니다."""
+    code = getattr(exc, "errno", None)
+    if code is None and exc.args and isinstance(exc.args[0], int):
+        code = exc.args[0]
+    return code
+
+
+def is_retryable(exc) -> bool:
+    return error_code(exc) in RETRYABLE_ERRNOS
+
+
+def _backoff(attempt: int) -> float:
+    # full jitter: 0 ~ min(최대, 기본 * 2^(n-1)) 사이에서 무작위로 기다려 재시도 시점을 흩뜨림
+    return random.uniform(0, min(TX_RETRY_MAX_DELAY, TX_RETRY_BASE_DELAY * (2 ** (attempt - 1))))
+
+
+def retry_transaction(fn=None, *, attempts: int = None, name: str = None):
+    """
+    트랜잭션 함수 전체(연결 획득 ~ 커밋)를 감싸서 1205/1213 오류일 때만 다시 실행합니다.
+    감싼 함수는 재시도 가능한 오류를 삼키지 말고 rollback 후 그대로 raise 해야 합니다.
+    동기/비동기(async def) 함수 모두 사용할 수 있습니다.
+
+        @retry_transaction
+        def buy_item(...): ...
+    """
+    if fn is None:
+        return lambda f: retry_transaction(f, attempts=attempts, name=name)
+
+    label = name or fn.__name__
+    max_attempts = attempts or TX_MAX_ATTEMPTS
+
+    def _on_error(e, attempt):
+        if not is_retryable(e):
+            TX_OUTCOMES.inc(function=label, outcome="error")
+            return False
+        if attempt >= max_attempts:
+            TX_OUTCOMES.inc(function=label, outcome="gave_up")
+            return False
+        TX_RETRIES.inc(function=label, errno=str(error_code(e)))
+        return True
+
+    def _on_success(attempt):
+        TX_OUTCOMES.inc(function=label, outcome="ok" if attempt == 1 else "retried_ok")
+
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    result = await fn(*args, **kwargs)
+                except Exception as e:
+                    if not _on_error(e, attempt):
+                        raise
+                    await asyncio.sleep(_backoff(attempt))
+                    continue
+                _on_success(attempt)
+                return result
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(1, max_attempts + 1):
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not _on_error(e, attempt):
+                    raise
+                time.sleep(_backoff(attempt))
+                continue
+            _on_success(attempt)
+            return result
+    return wrapper
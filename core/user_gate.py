@@ -0,0 +1,91 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from core.metrics import LatencyStats
+
+# [NEW] 사용자별 쓰기 게이트
+# 같은 사용자의 쓰기 요청(구매/판매/가챠)을 앱 안에서 한 줄로 세웁니다.
+# 기다리는 동안에는 DB 연결을 잡지 않으므로, members 행 잠금을 기다리며 풀 연결이 묶이지 않습니다.
+USER_GATE_MAX_WAIT = float(os.getenv("USER_GATE_MAX_WAIT", 2.0))     # 앞 요청을 기다리는 최대 시간(초)
+USER_GATE_MAX_WAITERS = int(os.getenv("USER_GATE_MAX_WAITERS", 4))  # 사용자당 대기 가능한 요청 수
+
+
+class UserBusyError(Exception):
+    """같은 사용자의 다른 요청이 처리 중이라 기다릴 수 없을 때 발생합니다."""
+
+
+class _Slot:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0  # 잡고 있거나 기다리는 요청 수
+
+
+class UserGate:
+    """키(사용자 이름)마다 한 번에 하나의 요청만 통과시키는 게이트. 대기 시간과 대기 수가 제한됩니다."""
+
+    def __init__(self, max_wait: float = USER_GATE_MAX_WAIT, max_waiters: int = USER_GATE_MAX_WAITERS):
+        self.max_wait = max_wait
+        self.max_waiters = max_waiters
+        self._lock = threading.Lock()
+        self._slots = {}  # 사용 중인 키만 보관 (다 쓰면 제거)
+        self.acquired = 0
+        self.contended = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.wait = LatencyStats()
+
+    @contextmanager
+    def hold(self, key, on_wait=None):
+        """key의 차례가 올 때까지 기다립니다. 기다려야 하면 먼저 on_wait()을 호출합니다. (예: 빌린 연결 반납)"""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = _Slot()
+            elif slot.users > self.max_waiters:
+                self.rejected += 1
+                raise UserBusyError("같은 요청을 처리하고 있습니다. 잠시 후 다시 시도해주세요.")
+            slot.users += 1
+
+        try:
+            if not slot.lock.acquire(blocking=False):
+                with self._lock:
+                    self.contended += 1
+                if on_wait is not None:
+                    on_wait()
+                started = time.perf_counter()
+                acquired = slot.lock.acquire(timeout=self.max_wait)
+                self.wait.observe(time.perf_counter() - started)
+                if not acquired:
+                    with self._lock:
+                        self.timeouts += 1
+                    raise UserBusyError("이전 요청이 아직 처리 중입니다. 잠시 후 다시 시도해주세요.")
+            with self._lock:
+                self.acquired += 1
+            try:
+                yield
+            finally:
+                slot.lock.release()
+        finally:
+            with self._lock:
+                slot.users -= 1
+                if slot.users == 0:
+                    del self._slots[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_wait_seconds": self.max_wait,
+                "max_waiters": self.max_waiters,
+                "active_keys": len(self._slots),
+                "acquired": self.acquired,
+                "contended": self.contended,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "wait": self.wait.snapshot(),
+            }
+
+
+user_gate = UserGate()
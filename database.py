@@ -1,7 +1,17 @@
 import mysql.connector
 from mysql.connector import pooling
 import os
+import time
+import inspect
+import functools
+import threading
+from contextvars import ContextVar
+from collections import deque
 from dotenv import load_dotenv
+from core.cache import TTLCache
+from core.cache_backend import cache_backend, CACHE_KEY_PREFIX
+from core.metrics import LatencyStats
+from core.db_metrics import CHECKOUT_WAIT, CONNECTION_HOLD, InstrumentedCursor
 
 # 환경 변수 로드 (.env)
 # database.py가 루트에 있거나, 호출되는 위치에 따라 경로 조정 필요
@@ -17,31 +27,527 @@ dbconfig = {
     "database": os.getenv("DB_NAME", "fashion_app"),
 }
 
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))        # 풀이 가득 찼을 때 추가로 허용할 임시 연결 수
+CHECKOUT_TIMEOUT = float(os.getenv("DB_CHECKOUT_TIMEOUT", 5))  # 연결을 기다리는 최대 시간(초)
+# [NEW] 풀 방식: "session" = mysql.connector 기본 풀 (꺼낼 때 ping, 반납할 때 세션 리셋)
+#               "light"   = 반납 시 열린 트랜잭션만 rollback, 오래 쉬었던 연결만 ping
+POOL_RESET_MODE = os.getenv("DB_POOL_RESET_MODE", "session")
+POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", 30))  # light 모드: 이 시간(초) 이상 쉰 연결은 ping으로 확인
+POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", 5))           # 서버 시작 시 미리 열어 둘 연결 수
+POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", 3600))      # light 모드: 이 시간(초)보다 오래된 연결은 닫고 새로 연결 (0이면 사용 안 함)
+
+# [NEW] 읽기 전용 복제본(replica) 설정 - DB_READ_HOST가 없으면 모든 조회가 primary로 갑니다.
+read_dbconfig = {
+    "host": os.getenv("DB_READ_HOST"),
+    "port": int(os.getenv("DB_READ_PORT", dbconfig["port"])),
+    "user": os.getenv("DB_READ_USER", dbconfig["user"]),
+    "password": os.getenv("DB_READ_PASSWORD", dbconfig["password"]),
+    "database": os.getenv("DB_READ_NAME", dbconfig["database"]),
+}
+READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", POOL_SIZE))
+READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", MAX_OVERFLOW))
+READ_PIN_SECONDS = float(os.getenv("DB_READ_PIN_SECONDS", 5))  # 쓰기 후 이 시간(초) 동안 그 사용자의 조회는 primary로 (replica 지연 대비)
+
+
+class LightweightPool:
+    """
+    세션 리셋 없이 연결을 재사용하는 풀 (DB_POOL_RESET_MODE=light)
+    - 반납: 트랜잭션이 열려 있을 때만 rollback (대부분 추가 왕복 없음)
+    - 꺼내기: 마지막 사용 후 ping_after초가 지난 연결만 ping으로 확인, recycle초보다 오래된 연결은 새로 연결
+    세션 변수/임시 테이블은 초기화되지 않으므로, 세션 상태를 바꾸는 코드는 직접 되돌려야 합니다.
+    """
+
+    def __init__(self, pool_size: int, ping_after: float = POOL_PING_AFTER, connect=None,
+                 recycle: float = POOL_RECYCLE, **config):
+        self.pool_size = pool_size
+        self.ping_after = ping_after
+        self.recycle = recycle
+        self._connect = connect or (lambda: mysql.connector.connect(**config))
+        self._lock = threading.Lock()
+        self._idle = deque()  # (연결, 마지막 사용 시각) - 최근에 쓴 연결부터 재사용
+        self._opened_at = {}  # id(연결) -> 연결한 시각 (recycle 판단용)
+        self._created = 0
+        self.pings = 0
+        self.stale_dropped = 0
+        self.recycled = 0
+        self.rollbacks = 0
+
+    def get_connection(self):
+        while True:
+            with self._lock:
+                if self._idle:
+                    raw, last_used = self._idle.pop()
+                elif self._created < self.pool_size:
+                    self._created += 1
+                    raw = None
+                else:
+                    raise mysql.connector.errors.PoolError("Failed getting connection; pool exhausted")
+            if raw is None:
+                return self._open()
+            if self.recycle and time.monotonic() - self._opened_at.get(id(raw), 0) > self.recycle:
+                with self._lock:
+                    self.recycled += 1
+                self._discard(raw, stale=False)
+                continue
+            if time.monotonic() - last_used < self.ping_after:
+                return raw
+            if not hasattr(raw, "ping"):
+                return raw  # ping을 지원하지 않는 연결 (sqlite3 등)
+            try:
+                with self._lock:
+                    self.pings += 1
+                raw.ping(reconnect=False)
+                return raw
+            except Exception:
+                self._discard(raw)  # 끊어진 연결은 버리고 다음 연결로
+
+    def _open(self):
+        # _created는 호출 전에 이미 늘려 둔 상태
+        try:
+            raw = self._connect()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            self._opened_at[id(raw)] = time.monotonic()
+        return raw
+
+    def put(self, raw):
+        try:
+            if raw.in_transaction:
+                with self._lock:
+                    self.rollbacks += 1
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+        with self._lock:
+            self._idle.append((raw, time.monotonic()))
+
+    def _discard(self, raw, stale: bool = True):
+        with self._lock:
+            self._created -= 1
+            self._opened_at.pop(id(raw), None)
+            if stale:
+                self.stale_dropped += 1
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def prewarm(self, n: int) -> int:
+        """연결 n개(최대 pool_size)를 미리 열어 idle 목록에 넣습니다."""
+        opened = []
+        try:
+            for _ in range(max(0, min(n, self.pool_size))):
+                with self._lock:
+                    if self._created >= self.pool_size:
+                        break
+                    self._created += 1
+                opened.append(self._open())
+        finally:
+            for raw in opened:
+                self.put(raw)
+        return len(opened)
+
+    def close(self):
+        """쉬고 있는 연결을 모두 닫습니다. (종료 시)"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for raw, _ in idle:
+            self._discard(raw, stale=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "created": self._created,
+                "idle": len(self._idle),
+                "pings": self.pings,
+                "stale_dropped": self.stale_dropped,
+                "recycled": self.recycled,
+                "rollbacks_on_return": self.rollbacks,
+            }
+
+
+def create_pool(mode: str = POOL_RESET_MODE, config: dict = None, pool_size: int = POOL_SIZE,
+                pool_name: str = "mypool"):
+    config = config or dbconfig
+    if mode == "light":
+        return LightweightPool(pool_size, POOL_PING_AFTER, **config)
+    # mysql.connector 풀은 생성 시 pool_size개를 모두 연결합니다.
+    return pooling.MySQLConnectionPool(
+        pool_name=pool_name,
+        pool_size=pool_size,
+        pool_reset_session=True,
+        **config
+    )
+
 pool = None
 
 try:
     # Pool 생성
-    pool = pooling.MySQLConnectionPool(
-        pool_name="mypool",
-        pool_size=20, 
-        pool_reset_session=True, 
-        **dbconfig
-    )
+    pool = create_pool()
 except Exception as e:
     print(f"Pool creation warning: {e}")
+    pool = None
+
+
+class PoolExhaustedError(Exception):
+    """정해진 시간 안에 DB 연결을 얻지 못했을 때 발생합니다. (503으로 응답)"""
+
+
+class ManagedConnection:
+    """PoolManager가 빌려준 연결. close() 하면 슬롯이 반납됩니다."""
+
+    def __init__(self, manager, raw, overflow: bool):
+        self._manager = manager
+        self._raw = raw
+        self.overflow = overflow
+        self._closed = False
+        self._checked_out_at = time.perf_counter()
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._raw.cursor(*args, **kwargs), self._manager.name)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        CONNECTION_HOLD.observe(time.perf_counter() - self._checked_out_at, pool=self._manager.name)
+        try:
+            self._manager._return(self._raw, self.overflow)
+        finally:
+            self._manager._release(self)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class PoolManager:
+    """
+    전체 연결 수를 pool_size + max_overflow로 제한하는 풀 관리자.
+    - 풀에 여유가 있으면 풀 연결을, 없으면 overflow 한도 안에서 임시 연결을 만듭니다.
+    - 한도에 도달하면 checkout_timeout 동안 대기열에서 기다리고, 그래도 없으면 바로 실패합니다.
+    - raw SQL 서비스와 게시판 SQLAlchemy 엔진(board_database)이 같은 관리자를 쓰므로, 두 쪽을 합친 동기 연결 수가 이 한도를 넘지 않습니다.
+    """
+
+    def __init__(self, pool, pool_size: int, max_overflow: int, checkout_timeout: float,
+                 name: str = "mysql", connect=None, config: dict = None):
+        self.pool = pool
+        self.name = name  # 지표의 pool 라벨
+        # overflow 연결을 여는 함수 (기본: mysql.connector). 테스트에서는 sqlite3 등으로 바꿀 수 있습니다.
+        self._open = connect or (lambda: mysql.connector.connect(**(config or dbconfig)))
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.checkout_timeout = checkout_timeout
+        self._slots = threading.BoundedSemaphore(pool_size + max_overflow)
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.overflow_in_use = 0
+        self.overflow_total = 0
+        self.waiting = 0
+        self.timeouts = 0
+        self.checkout_latency = LatencyStats()
+
+    def get_connection(self, timeout: float = None):
+        started = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+        acquired = self._slots.acquire(timeout=self.checkout_timeout if timeout is None else timeout)
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.timeouts += 1
+        if not acquired:
+            raise PoolExhaustedError("DB 연결이 모두 사용 중입니다. 잠시 후 다시 시도해주세요.")
+
+        try:
+            raw, overflow = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.in_use += 1
+            if overflow:
+                self.overflow_in_use += 1
+                self.overflow_total += 1
+        waited = time.perf_counter() - started
+        self.checkout_latency.observe(waited)
+        CHECKOUT_WAIT.observe(waited, pool=self.name)
+        return ManagedConnection(self, raw, overflow)
+
+    def _connect(self):
+        if self.pool is not None:
+            try:
+                return self.pool.get_connection(), False
+            except mysql.connector.errors.PoolError:
+                pass  # 풀 소진 → overflow 연결
+        return self._open(), True
+
+    def _return(self, raw, overflow: bool):
+        if overflow or not hasattr(self.pool, "put"):
+            # mysql.connector 풀 연결은 close() 하면 (세션 리셋 후) 풀로 돌아가고, overflow 연결은 실제로 끊어집니다.
+            raw.close()
+        else:
+            self.pool.put(raw)
+
+    def prewarm(self, n: int = POOL_PREWARM) -> int:
+        """연결 n개를 미리 열어 둡니다. (light 모드용 - mysql.connector 풀은 생성 시 이미 채워짐)"""
+        if self.pool is None or not hasattr(self.pool, "prewarm"):
+            return 0
+        return self.pool.prewarm(n)
+
+    def shutdown(self):
+        """풀에서 쉬고 있는 연결을 닫습니다. (빌려 간 연결은 반납될 때 정리됨)"""
+        if self.pool is None:
+            return
+        if hasattr(self.pool, "close"):
+            self.pool.close()
+        else:
+            self.pool._remove_connections()
+
+    def _release(self, conn: ManagedConnection):
+        with self._lock:
+            self.in_use -= 1
+            if conn.overflow:
+                self.overflow_in_use -= 1
+        self._slots.release()
+
+    @property
+    def capacity(self) -> int:
+        return self.pool_size + self.max_overflow
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "in_use": self.in_use,
+                "overflow_in_use": self.overflow_in_use,
+                "overflow_total": self.overflow_total,
+                "waiting": self.waiting,
+                "timeouts": self.timeouts,
+                "checkout_latency": self.checkout_latency.snapshot(),
+                **({"light_pool": self.pool.stats()} if hasattr(self.pool, "stats") else {}),
+            }
+
+
+pool_manager = PoolManager(pool, POOL_SIZE, MAX_OVERFLOW, CHECKOUT_TIMEOUT)
+
+
+def build_pool_manager(connect, pool_size: int, max_overflow: int = 0,
+                       checkout_timeout: float = CHECKOUT_TIMEOUT, name: str = "mysql") -> PoolManager:
+    """
+    연결 생성 함수(connect)로 LightweightPool 기반 PoolManager를 만듭니다.
+    예) build_pool_manager(lambda: sqlite3.connect(path, check_same_thread=False), 2, name="replica")
+    """
+    return PoolManager(LightweightPool(pool_size, connect=connect), pool_size, max_overflow,
+                       checkout_timeout, name=name, connect=connect)
+
+
+read_pool_manager = None
+
+if read_dbconfig["host"]:
     try:
-        pool = None 
-    except:
+        read_pool_manager = PoolManager(
+            create_pool(config=read_dbconfig, pool_size=READ_POOL_SIZE, pool_name="readpool"),
+            READ_POOL_SIZE, READ_MAX_OVERFLOW, CHECKOUT_TIMEOUT, name="mysql_read", config=read_dbconfig,
+        )
+    except Exception as e:
+        print(f"Read pool creation warning: {e}")
+        read_pool_manager = None
+
+
+def configure_pools(primary: PoolManager = None, replica=False):
+    """
+    primary / replica PoolManager를 교체합니다. (두 개의 로컬 DB로 라우팅을 시험할 때)
+    replica=None이면 복제본 라우팅을 끕니다. 이미 등록된 지표 collector는 기존 관리자를 계속 봅니다.
+    """
+    global pool_manager, read_pool_manager
+    if primary is not None:
+        pool_manager = primary
+    if replica is not False:
+        read_pool_manager = replica
+
+
+# [NEW] 읽기 라우팅
+# @read_only 함수 안에서 get_db_connection()을 부르면 replica 연결을 받습니다.
+# 쓰기(그 외 모든 호출)는 primary로 가고, 요청 연결로 커밋한 사용자는 READ_PIN_SECONDS 동안
+# 조회도 primary에서 하므로 방금 쓴 내용이 replica 지연 때문에 사라져 보이지 않습니다.
+# 고정 표시는 공유 캐시 저장소(core.cache_backend)에 두므로 다음 요청이 다른 워커로 가도 유지됩니다.
+# 요청 연결 밖의 쓰기(수강신청 대기열 워커, 회원가입)는 호출한 쪽에서 pin_reads()를 부릅니다.
+# aiomysql(async_transaction) 쓰기는 고정하지 않습니다. (비동기 쓰기 서비스를 라우트에서 쓰면 pin_reads()를 함께 호출)
+_read_route = ContextVar("db_read_route", default=False)
+_read_pins = TTLCache(maxsize=int(os.getenv("DB_READ_PIN_MAX", 10000)), ttl=READ_PIN_SECONDS)  # 이 워커가 건 고정 (공유 저장소 조회 생략용)
+_READ_PIN_PREFIX = CACHE_KEY_PREFIX + "read-pin:"
+read_pin_backend_errors = 0
+
+
+def read_only(func):
+    """조회만 하는 서비스 함수 표시. 이 함수 안의 연결은 (가능하면) replica에서 가져옵니다."""
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            token = _read_route.set(True)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _read_route.reset(token)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _read_route.set(True)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _read_route.reset(token)
+    return wrapper
+
+
+def _pin_backend_failed(e):
+    global read_pin_backend_errors
+    read_pin_backend_errors += 1
+    print(f"⚠️ read pin store unavailable, using this worker only: {e}")
+
+
+def pin_reads(key):
+    """key(사용자 이름 등)의 조회를 READ_PIN_SECONDS 동안 primary로 고정합니다. (모든 워커에 적용, replica가 없으면 무시)"""
+    if key is None or read_pool_manager is None:
+        return
+    _read_pins.set(key, True)
+    try:
+        cache_backend.set(_READ_PIN_PREFIX + key, b"1", ttl=READ_PIN_SECONDS)
+    except Exception as e:
+        _pin_backend_failed(e)
+
+
+def is_pinned(key) -> bool:
+    if key is None or read_pool_manager is None:
+        return False
+    if _read_pins.get(key, False):
+        return True
+    try:
+        return cache_backend.get(_READ_PIN_PREFIX + key) is not None
+    except Exception as e:
+        _pin_backend_failed(e)
+        return False
+
+
+def use_replica(pin_key=None) -> bool:
+    """지금 연결을 replica에서 가져와야 하는지 (@read_only 안이고, replica가 있고, 고정되지 않았을 때)"""
+    return read_pool_manager is not None and _read_route.get() and not is_pinned(pin_key)
+
+
+def read_routing_stats() -> dict:
+    return {"enabled": read_pool_manager is not None, "pin_seconds": READ_PIN_SECONDS,
+            "replica_fallbacks": read_fallbacks, "pins": _read_pins.stats(),
+            "pin_backend_errors": read_pin_backend_errors}
+
+
+# [NEW] 요청 단위 연결 공유
+# 인증(get_current_user)과 서비스 함수가 한 요청 안에서 같은 연결을 쓰도록,
+# 필요할 때 한 번만 풀에서 가져오고(lazy) 요청이 끝나면 반납합니다.
+
+class RequestConnection:
+    """
+    요청 하나가 함께 쓰는 연결. 처음 get() 할 때 풀에서 가져옵니다.
+    조회(@read_only)는 이미 primary 연결을 가진 경우 그 연결을, 아니면 replica 연결을 따로 가져옵니다.
+    pin_key(로그인 사용자 또는 클라이언트 주소)로 커밋하면 그 키의 조회가 잠시 primary로 고정됩니다.
+    """
+
+    def __init__(self, manager=None, pin_key=None):
+        self._manager = manager or pool_manager
+        self._conn = None
+        self._read_conn = None
+        self.pin_key = pin_key
+        self._client_key = pin_key  # 로그인 후 pin_key가 사용자 이름으로 바뀌어도, 같은 클라이언트의 비로그인 조회까지 고정
+
+    def get(self):
+        if self._conn is None:
+            self._conn = self._manager.get_connection()
+        return self._conn
+
+    def get_read(self):
+        """조회용 연결 (replica를 쓸 수 없으면 get()과 같음)"""
+        if self._conn is not None or not use_replica(self.pin_key):
+            return self.get()
+        if self._read_conn is None:
+            self._read_conn = _replica_connection()
+        return self._read_conn or self.get()
+
+    def mark_write(self):
+        pin_reads(self.pin_key)
+        if self._client_key != self.pin_key:
+            pin_reads(self._client_key)
+
+    def release(self):
+        """연결을 풀에 돌려줍니다. (다시 get() 하면 새로 가져옴)"""
+        conn, self._conn = self._conn, None
+        read_conn, self._read_conn = self._read_conn, None
+        if read_conn is not None:
+            read_conn.close()
+        if conn is not None:
+            conn.close()
+
+    close = release
+
+
+class BorrowedConnection:
+    """다른 쪽이 소유한 연결을 빌려 쓰는 래퍼. close()는 아무 일도 하지 않고, 반납은 소유자가 합니다."""
+
+    def __init__(self, conn, on_commit=None):
+        self._conn = conn
+        self._on_commit = on_commit
+
+    def start_transaction(self, *args, **kwargs):
+        # 앞선 조회(인증 등)로 열린 암묵적 읽기 트랜잭션을 먼저 끝내고 시작
+        if self._conn.in_transaction:
+            self._conn.commit()
+        return self._conn.start_transaction(*args, **kwargs)
+
+    def commit(self):
+        result = self._conn.commit()
+        if self._on_commit is not None:
+            self._on_commit()
+        return result
+
+    def close(self):
         pass
 
-def get_db_connection():
-    """Connection Pool에서 연결을 가져옵니다."""
-    global pool
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+read_fallbacks = 0  # replica 연결 실패로 primary를 대신 쓴 횟수
+
+
+def _replica_connection():
+    """replica 연결. 가져오지 못하면 None (호출한 쪽이 primary를 사용)"""
+    global read_fallbacks
     try:
-        if pool:
-            return pool.get_connection()
-        else:
-            return mysql.connector.connect(**dbconfig)
+        return read_pool_manager.get_connection()
     except Exception as e:
-        print(f"Error getting connection from pool: {e}")
-        return mysql.connector.connect(**dbconfig)
+        read_fallbacks += 1
+        print(f"Read replica unavailable, using primary: {e}")
+        return None
+
+
+def get_db_connection(conn=None):
+    """
+    Connection Pool에서 연결을 가져옵니다. (한도 초과 시 대기 후 PoolExhaustedError)
+    conn(요청 연결 또는 이미 가진 연결)을 넘기면 새로 가져오지 않고 그 연결을 빌려줍니다.
+    @read_only 함수 안에서는 replica 연결을 가져옵니다. (replica가 없거나, 읽기가 primary로 고정된 사용자는 primary)
+    """
+    if conn is None:
+        if use_replica():
+            return _replica_connection() or pool_manager.get_connection()
+        return pool_manager.get_connection()
+    if isinstance(conn, RequestConnection):
+        if _read_route.get():
+            return BorrowedConnection(conn.get_read())
+        return BorrowedConnection(conn.get(), on_commit=conn.mark_write)
+    return BorrowedConnection(conn)
@@ -3,12 +3,37 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import os
+from fastapi.concurrency import run_in_threadpool
 
 # Services for warm-up
 from services.shop_service import get_items
+from services.course_service import reconcile_enrolled_counts
+from core.hashing import hash_executor, HashingBusyError
+from async_database import close_async_pool
+import database
+from database import PoolExhaustedError, POOL_PREWARM
+from core.user_gate import UserBusyError
+from core.idempotency import IdempotencyConflictError
+from core.cache_backend import cache_backend
+from services.registration_queue import registration_queue, RegistrationQueueFullError
 
 # Routers
-from routers import users, courses, appeals, shop, auth, board
+from routers import users, courses, appeals, shop, auth, board, monitoring
+
+# [NEW] enrolled_count 주기 보정 간격(초), 0이면 사용 안 함 (scripts/reconcile_enrolled_counts.py로 수동 실행 가능)
+ENROLLMENT_RECONCILE_INTERVAL = float(os.getenv("ENROLLMENT_RECONCILE_INTERVAL", 0))
+
+async def reconcile_enrollments_periodically(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            result = await run_in_threadpool(reconcile_enrolled_counts)
+            if result["fixed"]:
+                print(f"🔧 enrolled_count reconciled: {result['fixed']}")
+        except Exception as e:
+            print(f"⚠️ enrolled_count reconciliation failed: {e}")
 
 # [NEW] 서버 시작 시 미리 데이터 로딩 (Warm-up)
 @asynccontextmanager
@@ -19,14 +44,40 @@ async def lifespan(app: FastAPI):
     BoardBase.metadata.create_all(bind=board_engine)
     print("📋 Board Tables Ready!")
 
+    # DB 연결 미리 열어 두기 (배포 직후 첫 트래픽이 연결 생성 비용을 치르지 않도록)
+    try:
+        # configure_pools()로 교체될 수 있으므로 풀은 항상 database 모듈에서 조회
+        opened = await run_in_threadpool(database.pool_manager.prewarm, POOL_PREWARM)
+        if database.read_pool_manager is not None:
+            opened += await run_in_threadpool(database.read_pool_manager.prewarm, POOL_PREWARM)
+        if opened:
+            print(f"✅ {opened} DB connection(s) pre-warmed")
+    except Exception as e:
+        print(f"⚠️ DB Pre-warm Failed: {e}")
+
     print("🔥 Warming up Shop Cache...")
     try:
         get_items()
         print("✅ Shop Cache Ready!")
     except Exception as e:
         print(f"⚠️ Cache Warmup Failed: {e}")
+
+    reconcile_task = None
+    if ENROLLMENT_RECONCILE_INTERVAL > 0:
+        reconcile_task = asyncio.create_task(reconcile_enrollments_periodically(ENROLLMENT_RECONCILE_INTERVAL))
     yield
     print("🛑 Server Shutting Down...")
+    if reconcile_task is not None:
+        reconcile_task.cancel()
+    hash_executor.shutdown()
+    registration_queue.shutdown()
+    await close_async_pool()
+    board_engine.dispose()
+    database.pool_manager.shutdown()
+    if database.read_pool_manager is not None:
+        database.read_pool_manager.shutdown()
+    if hasattr(cache_backend, "close"):
+        cache_backend.close()
 
 app = FastAPI(
     title="나만의 API (Refactored)",
@@ -35,8 +86,6 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-import os
-
 # CORS 허용 Origin 목록 (프론트엔드 개발 서버 + 백엔드 서버들)
 ALLOWED_ORIGINS = [
     "http://localhost:5173",   # React 프론트엔드 (Vite 기본 포트)
@@ -78,6 +127,70 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         }
     )
 
+@app.exception_handler(HashingBusyError)
+async def hashing_busy_handler(request: Request, exc: HashingBusyError):
+    """해싱 대기열 초과 시 오래 기다리게 하지 않고 바로 503 응답"""
+    return JSONResponse(
+        status_code=503,
+        content={
+            "success": False,
+            "error": "서버 혼잡",
+            "detail": str(exc)
+        },
+        headers={"Retry-After": "1"}
+    )
+
+@app.exception_handler(PoolExhaustedError)
+async def pool_exhausted_handler(request: Request, exc: PoolExhaustedError):
+    """DB 연결 한도 초과 시 연결을 더 만들지 않고 바로 503 응답"""
+    return JSONResponse(
+        status_code=503,
+        content={
+            "success": False,
+            "error": "서버 혼잡",
+            "detail": str(exc)
+        },
+        headers={"Retry-After": "1"}
+    )
+
+@app.exception_handler(RegistrationQueueFullError)
+async def registration_queue_full_handler(request: Request, exc: RegistrationQueueFullError):
+    """수강신청 대기열이 가득 찼을 때 바로 503 응답"""
+    return JSONResponse(
+        status_code=503,
+        content={
+            "success": False,
+            "error": "서버 혼잡",
+            "detail": str(exc)
+        },
+        headers={"Retry-After": "1"}
+    )
+
+@app.exception_handler(UserBusyError)
+async def user_busy_handler(request: Request, exc: UserBusyError):
+    """같은 사용자의 쓰기 요청이 밀려 있으면 DB 연결을 잡지 않고 바로 429 응답"""
+    return JSONResponse(
+        status_code=429,
+        content={
+            "success": False,
+            "error": "요청 중복",
+            "detail": str(exc)
+        },
+        headers={"Retry-After": "1"}
+    )
+
+@app.exception_handler(IdempotencyConflictError)
+async def idempotency_conflict_handler(request: Request, exc: IdempotencyConflictError):
+    """같은 Idempotency-Key 요청이 아직 처리 중이거나 다른 요청에 재사용된 경우 409 응답"""
+    return JSONResponse(
+        status_code=409,
+        content={
+            "success": False,
+            "error": "요청 충돌",
+            "detail": str(exc)
+        }
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """처리되지 않은 모든 예외를 통일된 형식으로 응답"""
@@ -115,3 +228,4 @@ app.include_router(appeals.router)
 app.include_router(shop.router)
 app.include_router(auth.router)
 app.include_router(board.router)
+app.include_router(monitoring.router)
@@ -3,20 +3,21 @@ from pydantic import BaseModel
 from services.course_service import get_enrollments, delete_enrollment
 from services.appeal_service import create_appeal, get_appeals
 from routers.auth import get_current_user, get_admin_user
+from routers.deps import request_connection
 
 router = APIRouter()
 
 # ─── 관리자 전용 기능 (ADMIN only) ───
 
 @router.get("/courses/{course_id}/enrollments")
-def read_enrollments_endpoint(course_id: int, admin = Depends(get_admin_user)):
+def read_enrollments_endpoint(course_id: int, admin = Depends(get_admin_user), db = Depends(request_connection)):
     """수강생 목록 조회 (관리자용)"""
-    return get_enrollments(course_id)
+    return get_enrollments(course_id, conn=db)
 
 @router.delete("/enrollments/{enrollment_id}")
-def cancel_enrollment_endpoint(enrollment_id: int, admin = Depends(get_admin_user)):
+def cancel_enrollment_endpoint(enrollment_id: int, admin = Depends(get_admin_user), db = Depends(request_connection)):
     """수강취소 (관리자용)"""
-    return delete_enrollment(enrollment_id)
+    return delete_enrollment(enrollment_id, conn=db)
 
 # ─── 이의신청 ───
 
@@ -26,11 +27,11 @@ class AppealRequest(BaseModel):
     is_secret: bool = True
 
 @router.post("/appeals")
-def create_appeal_endpoint(request: AppealRequest, user = Depends(get_current_user)):
+def create_appeal_endpoint(request: AppealRequest, user = Depends(get_current_user), db = Depends(request_connection)):
     """이의신청 등록"""
-    return create_appeal(request.course_id, user['username'], request.content, request.is_secret)
+    return create_appeal(request.course_id, user['username'], request.content, request.is_secret, conn=db)
 
 @router.get("/courses/{course_id}/appeals")
-def read_appeals_endpoint(course_id: int):
+def read_appeals_endpoint(course_id: int, db = Depends(request_connection)):
     """이의신청 목록 조회"""
-    return get_appeals(course_id)
+    return get_appeals(course_id, conn=db)
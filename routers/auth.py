@@ -2,10 +2,16 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from datetime import timedelta
-from core.security import create_access_token, verify_password, get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY, ALGORITHM
+from fastapi.concurrency import run_in_threadpool
+from core.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY, ALGORITHM
+from core.hashing import get_password_hash_async, verify_password_async
 from jose import JWTError, jwt
-from services.user_service import get_member
-from database import get_db_connection
+from typing import Literal
+from services.user_service import (
+    get_member, get_principal, get_principal_async, invalidate_principal, invalidate_members, set_member_role,
+)
+from database import get_db_connection, pin_reads
+from routers.deps import request_connection
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -21,8 +27,10 @@ class UserCreate(BaseModel):
     password: str
     name: str # Real Name
 
-@router.post("/register")
-def register(user: UserCreate):
+class RoleUpdate(BaseModel):
+    role: Literal["USER", "ADMIN"]
+
+def _insert_member(user: UserCreate, hashed_password: str):
     conn = get_db_connection()
     try:
         cursor = conn.cursor(dictionary=True)
@@ -31,21 +39,31 @@ def register(user: UserCreate):
         if cursor.fetchone():
             raise HTTPException(status_code=400, detail="Username already registered")
         
-        hashed_password = get_password_hash(user.password)
-        
         # Insert
         sql = "INSERT INTO members (username, password_hash, name, role, gold) VALUES (%s, %s, %s, 'USER', 0)"
         cursor.execute(sql, (user.username, hashed_password, user.name))
         conn.commit()
-        
-        return {"msg": "User created successfully"}
+        pin_reads(user.username)  # 요청 연결 밖의 쓰기 - 가입 직후 조회도 primary에서
+        invalidate_principal(user.username)
+        invalidate_members()
     finally:
         conn.close()
 
+@router.post("/register")
+async def register(user: UserCreate):
+    # 중복 아이디면 해싱 비용을 쓰지 않고 바로 거절
+    if await run_in_threadpool(get_member, user.username):
+        raise HTTPException(status_code=400, detail="Username already registered")
+
+    # [NEW] 해싱은 전용 프로세스 풀에서 처리 (공용 스레드풀 점유 방지)
+    hashed_password = await get_password_hash_async(user.password)
+    await run_in_threadpool(_insert_member, user, hashed_password)
+    return {"msg": "User created successfully"}
+
 @router.post("/token")
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     # OAuth2PasswordRequestForm has username, password
-    member = get_member(form_data.username)
+    member = await run_in_threadpool(get_member, form_data.username)
     if not member or not member['password_hash']:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,7 +71,7 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
             headers={"WWW-Authenticate": "Bearer"},
         )
         
-    if not verify_password(form_data.password, member['password_hash']):
+    if not await verify_password_async(form_data.password, member['password_hash']):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -73,8 +91,8 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
 
 # ─── 의존성 함수 ───
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    """로그인된 사용자 정보를 반환합니다."""
+def _decode_subject(token: str) -> str:
+    """JWT를 검증하고 subject(username)를 반환합니다."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -87,10 +105,29 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-        
-    user = get_member(username)
+    return username
+
+def get_current_user(token: str = Depends(oauth2_scheme), db = Depends(request_connection)):
+    """로그인된 사용자 정보를 반환합니다. (캐시에 없으면 요청 연결로 조회 - 이후 서비스 호출과 같은 연결을 사용)"""
+    user = get_principal(_decode_subject(token), token, conn=db)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    db.pin_key = user["username"]  # 이 사용자가 쓰기를 하면 잠시 동안 조회도 primary에서
+    return user
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme)):
+    """get_current_user()의 비동기 버전 (async def 라우트용)"""
+    user = await get_principal_async(_decode_subject(token), token)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 def get_admin_user(user = Depends(get_current_user)):
@@ -102,3 +139,11 @@ def get_admin_user(user = Depends(get_current_user)):
         )
     return user
 
+@router.patch("/members/{username}/role")
+def update_member_role_endpoint(username: str, request: RoleUpdate, admin = Depends(get_admin_user),
+                                db = Depends(request_connection)):
+    """회원 권한 변경 (관리자용, Principal 캐시를 바로 비워 다음 요청부터 적용)"""
+    result = set_member_role(username, request.role, conn=db)
+    if not result["success"]:
+        raise HTTPException(status_code=404, detail=result["message"])
+    return result
@@ -1,10 +1,11 @@
 import math
-import bcrypt
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 
-from board_database import get_db
+from board_database import get_db, get_read_db
+from core.hashing import hash_executor, bcrypt_hash, bcrypt_verify
 from board_models import Post, Comment
 from board_schemas import (
     PostCreate, PostUpdate, PostDelete, PostDetail,
@@ -17,12 +18,63 @@ router = APIRouter(prefix="/api/v1", tags=["board"])
 POSTS_PER_PAGE = 15
 
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+# 비밀번호 해싱/검증은 async 라우트에서 프로세스 풀 결과를 await (스레드를 잡고 기다리지 않음)
+# SQLAlchemy 세션 작업은 동기 코드이므로 run_in_threadpool로 실행합니다.
+async def hash_password(password: str) -> str:
+    return await hash_executor.arun(bcrypt_hash, password)
 
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await hash_executor.arun(bcrypt_verify, plain, hashed)
+
+
+def _get_or_404(db: Session, model, object_id: int, message: str):
+    obj = db.query(model).filter(model.id == object_id).first()
+    if not obj:
+        raise HTTPException(status_code=404, detail=message)
+    return obj
+
+
+# [NEW] 비밀번호 해시만 읽고 읽기 트랜잭션을 끝냅니다.
+# 세션이 커넥션을 잡은 채로 프로세스 풀 검증을 await하면 그동안 pool_manager 슬롯이 묶이므로,
+# rollback으로 커넥션을 풀에 돌려준 뒤 검증하고, 쓰기는 행을 다시 읽어서 수행합니다.
+def _get_password_or_404(db: Session, model, object_id: int, message: str) -> str:
+    try:
+        row = db.query(model.password).filter(model.id == object_id).first()
+    finally:
+        db.rollback()
+    if not row:
+        raise HTTPException(status_code=404, detail=message)
+    return row.password
+
+
+def _exists_or_404(db: Session, model, object_id: int, message: str):
+    try:
+        _get_or_404(db, model, object_id, message)
+    finally:
+        db.rollback()
+
+
+def _save(db: Session, obj):
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj.id
+
+
+def _delete(db: Session, model, object_id: int, message: str):
+    obj = _get_or_404(db, model, object_id, message)
+    db.delete(obj)
+    db.commit()
+
+
+def _update_post(db: Session, post_id: int, data: PostUpdate):
+    post = _get_or_404(db, Post, post_id, "게시글을 찾을 수 없습니다.")
+    if data.title is not None:
+        post.title = data.title
+    if data.content is not None:
+        post.content = data.content
+    db.commit()
 
 
 # ─── 게시글 API ───
@@ -31,7 +83,7 @@ def verify_password(plain: str, hashed: str) -> bool:
 def list_posts(
     page: int = Query(1, ge=1),
     search: str = Query(""),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """게시글 목록 조회 (최신순, 페이지네이션, 검색)"""
     query = db.query(Post)
@@ -54,13 +106,11 @@ def list_posts(
 
 
 @router.post("/posts", status_code=201)
-def create_post(data: PostCreate, db: Session = Depends(get_db)):
+async def create_post(data: PostCreate, db: Session = Depends(get_db)):
     """게시글 생성"""
-    post = Post(title=data.title, content=data.content, author=data.author, password=hash_password(data.password))
-    db.add(post)
-    db.commit()
-    db.refresh(post)
-    return {"msg": "게시글이 작성되었습니다.", "id": post.id}
+    post = Post(title=data.title, content=data.content, author=data.author, password=await hash_password(data.password))
+    post_id = await run_in_threadpool(_save, db, post)
+    return {"msg": "게시글이 작성되었습니다.", "id": post_id}
 
 
 @router.get("/posts/{post_id}", response_model=PostDetail)
@@ -76,57 +126,41 @@ def get_post(post_id: int, db: Session = Depends(get_db)):
 
 
 @router.patch("/posts/{post_id}")
-def update_post(post_id: int, data: PostUpdate, db: Session = Depends(get_db)):
+async def update_post(post_id: int, data: PostUpdate, db: Session = Depends(get_db)):
     """게시글 수정 (비밀번호 확인)"""
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
-    if not verify_password(data.password, post.password):
+    hashed = await run_in_threadpool(_get_password_or_404, db, Post, post_id, "게시글을 찾을 수 없습니다.")
+    if not await verify_password(data.password, hashed):
         raise HTTPException(status_code=403, detail="비밀번호가 일치하지 않습니다.")
-    if data.title is not None:
-        post.title = data.title
-    if data.content is not None:
-        post.content = data.content
-    db.commit()
+    await run_in_threadpool(_update_post, db, post_id, data)
     return {"msg": "게시글이 수정되었습니다."}
 
 
 @router.delete("/posts/{post_id}")
-def delete_post(post_id: int, data: PostDelete, db: Session = Depends(get_db)):
+async def delete_post(post_id: int, data: PostDelete, db: Session = Depends(get_db)):
     """게시글 삭제 (비밀번호 확인)"""
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
-    if not verify_password(data.password, post.password):
+    hashed = await run_in_threadpool(_get_password_or_404, db, Post, post_id, "게시글을 찾을 수 없습니다.")
+    if not await verify_password(data.password, hashed):
         raise HTTPException(status_code=403, detail="비밀번호가 일치하지 않습니다.")
-    db.delete(post)
-    db.commit()
+    await run_in_threadpool(_delete, db, Post, post_id, "게시글을 찾을 수 없습니다.")
     return {"msg": "게시글이 삭제되었습니다."}
 
 
 # ─── 댓글 API ───
 
 @router.post("/posts/{post_id}/comments", status_code=201)
-def create_comment(post_id: int, data: CommentCreate, db: Session = Depends(get_db)):
+async def create_comment(post_id: int, data: CommentCreate, db: Session = Depends(get_db)):
     """댓글 작성"""
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="게시글을 찾을 수 없습니다.")
-    comment = Comment(post_id=post_id, author=data.author, content=data.content, password=hash_password(data.password))
-    db.add(comment)
-    db.commit()
-    db.refresh(comment)
-    return {"msg": "댓글이 작성되었습니다.", "id": comment.id}
+    await run_in_threadpool(_exists_or_404, db, Post, post_id, "게시글을 찾을 수 없습니다.")
+    comment = Comment(post_id=post_id, author=data.author, content=data.content, password=await hash_password(data.password))
+    comment_id = await run_in_threadpool(_save, db, comment)
+    return {"msg": "댓글이 작성되었습니다.", "id": comment_id}
 
 
 @router.delete("/comments/{comment_id}")
-def delete_comment(comment_id: int, data: PostDelete, db: Session = Depends(get_db)):
+async def delete_comment(comment_id: int, data: PostDelete, db: Session = Depends(get_db)):
     """댓글 삭제 (비밀번호 확인)"""
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="댓글을 찾을 수 없습니다.")
-    if not verify_password(data.password, comment.password):
+    hashed = await run_in_threadpool(_get_password_or_404, db, Comment, comment_id, "댓글을 찾을 수 없습니다.")
+    if not await verify_password(data.password, hashed):
         raise HTTPException(status_code=403, detail="비밀번호가 일치하지 않습니다.")
-    db.delete(comment)
-    db.commit()
+    await run_in_threadpool(_delete, db, Comment, comment_id, "댓글을 찾을 수 없습니다.")
     return {"msg": "댓글이 삭제되었습니다."}
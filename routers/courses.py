@@ -1,19 +1,45 @@
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
-from services.course_service import get_all_courses, register_student
-from routers.auth import get_current_user
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from services.course_service import get_all_courses, register_student, update_course_capacity
+from services.registration_queue import registration_queue
+from routers.auth import get_current_user, get_admin_user
+from routers.deps import request_connection
 
 router = APIRouter()
 
 class RegistrationRequest(BaseModel):
     course_id: int
+    waitlist: bool = False  # True면 정원이 찼을 때 대기자 명단에 등록
+
+class CapacityRequest(BaseModel):
+    capacity: int = Field(..., ge=0)
 
 @router.get("/courses")
 def read_courses():
     """개설된 강좌 목록을 반환합니다."""
     return get_all_courses()
 
+@router.patch("/courses/{course_id}/capacity")
+def update_capacity_endpoint(course_id: int, request: CapacityRequest, admin = Depends(get_admin_user),
+                             db = Depends(request_connection)):
+    """강좌 정원 변경 (관리자용, 늘어난 자리만큼 대기자 자동 등록)"""
+    return update_course_capacity(course_id, request.capacity, conn=db)
+
 @router.post("/registrations")
-def register_course_endpoint(request: RegistrationRequest, user = Depends(get_current_user)):
+def register_course_endpoint(request: RegistrationRequest, user = Depends(get_current_user),
+                             db = Depends(request_connection)):
     """수강신청을 처리합니다."""
-    return register_student(user['username'], request.course_id)
+    return register_student(user['username'], request.course_id, request.waitlist, conn=db)
+
+@router.post("/registrations/queue", status_code=202)
+def enqueue_registration_endpoint(request: RegistrationRequest, user = Depends(get_current_user)):
+    """수강신청을 대기열에 넣고 티켓을 반환합니다. (정원이 차면 자동으로 대기자 명단에 등록)"""
+    return registration_queue.submit(user['username'], request.course_id)
+
+@router.get("/registrations/queue/{ticket_id}")
+def read_registration_ticket_endpoint(ticket_id: str, user = Depends(get_current_user)):
+    """대기열 티켓의 처리 상태(대기 순번 / 결과)를 조회합니다."""
+    ticket = registration_queue.status(ticket_id, user['username'])
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="티켓을 찾을 수 없습니다.")
+    return ticket
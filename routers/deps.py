@@ -0,0 +1,18 @@
+from fastapi import Request
+from database import RequestConnection
+
+# [NEW] 라우터 공용 의존성 - database.py는 FastAPI에 의존하지 않도록 Request를 다루는 부분만 여기에 둡니다.
+
+
+def client_pin_key(request: Request) -> str:
+    """로그인하지 않은 요청의 읽기 고정 키 (클라이언트 주소)"""
+    return f"client:{request.client.host}" if request.client else None
+
+
+def request_connection(request: Request):
+    """FastAPI 의존성: 요청 동안 RequestConnection을 빌려주고 끝나면 반납합니다. (같은 요청 안에서는 한 개만 생성)"""
+    conn = RequestConnection(pin_key=client_pin_key(request))
+    try:
+        yield conn
+    finally:
+        conn.release()
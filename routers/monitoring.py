@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from core.metrics import REGISTRY
+from core.hashing import hash_executor
+from core.user_gate import user_gate
+from core.idempotency import idempotency_store
+import database
+from database import read_routing_stats
+from services.user_service import principal_cache, members_cache
+from services.shop_service import items_cache
+from services.course_service import courses_cache
+from services.registration_queue import registration_queue
+
+router = APIRouter(tags=["monitoring"])
+
+# readiness는 "지속적인" 포화에서만 실패로 응답합니다. (로드밸런서가 트래픽을 빼도록)
+# 풀이 잠깐 꽉 차거나 대기자가 몇 명 생기는 것은 checkout_timeout 안에 풀리는 정상 부하이므로 실패로 보지 않음
+# - 연결을 기다리는 요청이 READINESS_MAX_WAITING개를 넘거나
+# - 최근 READINESS_TIMEOUT_WINDOW초 안에 checkout 타임아웃(PoolExhaustedError)이 있었으면 실패
+READINESS_MAX_WAITING = int(os.getenv("READINESS_MAX_WAITING", 10))
+READINESS_TIMEOUT_WINDOW = float(os.getenv("READINESS_TIMEOUT_WINDOW", 10))
+
+
+class _TimeoutTracker:
+    """누적 타임아웃 수가 마지막으로 늘어난 시각을 기억해 '최근 타임아웃' 여부를 판단합니다."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._lock = threading.Lock()
+        self._seen = None
+        self._last_increase = None
+
+    def recent(self, timeouts: int, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # 첫 조회는 기준값만 기록 (기동 전의 누적값은 최근 타임아웃이 아님)
+            # configure_pools()로 풀이 교체되어 값이 줄어든 경우도 기준값만 다시 잡음
+            if self._seen is not None and timeouts > self._seen:
+                self._last_increase = now
+            self._seen = timeouts
+            return self._last_increase is not None and now - self._last_increase < self.window
+
+
+_mysql_timeouts = _TimeoutTracker(READINESS_TIMEOUT_WINDOW)
+
+def _read_pool_stats() -> dict:
+    """replica 풀 지표 (replica가 없으면 빈 dict → 지표 없음)"""
+    read_pool_manager = database.read_pool_manager
+    return read_pool_manager.stats() if read_pool_manager is not None else {}
+
+
+# configure_pools()로 풀이 교체/추가될 수 있으므로 수집 시점에 database 모듈에서 조회
+REGISTRY.register_collector("db_pool_mysql", lambda: database.pool_manager.stats())
+REGISTRY.register_collector("db_read_routing", read_routing_stats)
+REGISTRY.register_collector("db_pool_mysql_read", _read_pool_stats)
+REGISTRY.register_collector("principal_cache", principal_cache.stats)
+REGISTRY.register_collector("password_hashing", hash_executor.stats)
+REGISTRY.register_collector("catalog_cache", items_cache.stats)
+REGISTRY.register_collector("courses_cache", courses_cache.stats)
+REGISTRY.register_collector("members_cache", members_cache.stats)
+REGISTRY.register_collector("user_write_gate", user_gate.stats)
+REGISTRY.register_collector("idempotency", idempotency_store.stats)
+REGISTRY.register_collector("registration_queue", registration_queue.stats)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    """Prometheus 텍스트 형식 지표"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/health/ready")
+def readiness_probe():
+    """연결 풀이 지속적으로 포화 상태면 503을 반환하는 readiness probe (게시판 엔진도 같은 풀을 사용)"""
+    pool_manager, read_pool_manager = database.pool_manager, database.read_pool_manager
+    mysql_stats = pool_manager.stats()
+    mysql_saturation = mysql_stats["in_use"] / pool_manager.capacity
+    recent_timeouts = _mysql_timeouts.recent(mysql_stats["timeouts"])
+    ready = mysql_stats["waiting"] <= READINESS_MAX_WAITING and not recent_timeouts
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "mysql_pool": {"in_use": mysql_stats["in_use"], "capacity": pool_manager.capacity,
+                           "waiting": mysql_stats["waiting"], "saturation": round(mysql_saturation, 3),
+                           "timeouts": mysql_stats["timeouts"], "recent_timeouts": recent_timeouts},
+            # replica는 포화/장애 시 primary로 대신 조회하므로 readiness 판단에는 넣지 않음
+            **({"read_pool": {"in_use": read_pool_manager.stats()["in_use"], "capacity": read_pool_manager.capacity}}
+               if read_pool_manager is not None else {}),
+        }
+    )
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from services.shop_service import (
-    get_items, get_user_gold, get_inventory, buy_item, sell_item, sell_all_items, 
-    play_gacha_fixed, play_gacha_dynamic
+    get_inventory, get_inventory_page, buy_item, checkout_cart, sell_item, sell_all_items, 
+    play_gacha_fixed, play_gacha_dynamic, get_items_async, get_user_gold_async, invalidate_items,
+    GACHA_LIST_MAX_PULLS, list_pull_limit_message,
 )
-from routers.auth import get_current_user
+from routers.auth import get_current_user, get_current_user_async, get_admin_user
+from core.user_gate import user_gate
+from core.idempotency import idempotency_store
+from routers.deps import request_connection
 
 router = APIRouter()
 
@@ -12,47 +18,113 @@ router = APIRouter()
 class BuyRequest(BaseModel):
     item_id: int
 
+class CartLine(BaseModel):
+    item_id: int
+    quantity: int = Field(1, ge=1)
+
+class CheckoutRequest(BaseModel):
+    lines: List[CartLine]
+
 class SellRequest(BaseModel):
     inventory_id: int
 
+class SellAllRequest(BaseModel):
+    rarities: Optional[List[str]] = None       # 예: ["COMMON", "RARE"]
+    item_ids: Optional[List[int]] = None
+    acquired_before: Optional[datetime] = None  # 이 시각 이전에 처음 획득한 아이템만
+
 class GachaRequest(BaseModel):
     count: int = 1
+    bulk: bool = False  # True면 결과 목록 대신 아이템/등급별 요약만 반환
+
+def _run_write(user, db, endpoint: str, idempotency_key: Optional[str], request, fn, *args):
+    """
+    쓰기 요청 공통 처리
+    - Idempotency-Key 헤더가 있으면 같은 키의 재요청에 저장된 응답을 돌려줌 (DB 접근 없음, 워커 간 공유)
+    - user_gate로 사용자별 한 줄로 세운 뒤 서비스를 호출 (기다려야 하면 인증에 쓴 연결을 먼저 반납)
+    - 서비스는 인증과 같은 요청 연결(db)을 사용
+    """
+    def call():
+        with user_gate.hold(user['username'], on_wait=db.release):
+            return fn(*args, conn=db)
+
+    if not idempotency_key:
+        return call()
+    fingerprint = request.model_dump_json() if request is not None else None
+    # 같은 키가 다른 요청(다른 워커 포함)에서 처리 중이면 기다리는 동안 요청 연결을 반납
+    return idempotency_store.run((user['username'], endpoint, idempotency_key), call, fingerprint,
+                                 on_wait=db.release)
 
 # Endpoints
 @router.get("/shop/items")
-def read_shop_items():
+async def read_shop_items():
     """상점 아이템 목록 조회"""
-    return get_items()
+    return await get_items_async()
+
+@router.post("/shop/items/refresh")
+def refresh_shop_items(admin = Depends(get_admin_user)):
+    """아이템 카탈로그 캐시 무효화 (관리자용, 아이템 수정 후 호출)"""
+    invalidate_items()
+    return {"success": True, "message": "아이템 목록 캐시를 갱신합니다."}
 
 @router.get("/shop/inventory/me")
-def read_my_inventory(user = Depends(get_current_user)):
-    """내 인벤토리 조회"""
-    return get_inventory(user['username'])
+def read_my_inventory(limit: int = Query(None, ge=1, le=500), offset: int = Query(0, ge=0),
+                      user = Depends(get_current_user), db = Depends(request_connection)):
+    """내 인벤토리 조회 (아이템별 1행 + quantity, limit/offset으로 페이지 조회)"""
+    return get_inventory(user['username'], limit, offset, conn=db)
+
+@router.get("/shop/inventory/me/page")
+def read_my_inventory_page(cursor: str = Query(None), limit: int = Query(50, ge=1, le=200),
+                           user = Depends(get_current_user), db = Depends(request_connection)):
+    """내 인벤토리 커서 페이지 조회 (최근 획득 순, next_cursor로 다음 페이지)"""
+    try:
+        return get_inventory_page(user['username'], cursor, limit, conn=db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/members/me/gold")
-def read_my_gold(user = Depends(get_current_user)):
+async def read_my_gold(user = Depends(get_current_user_async)):
     """내 골드 조회"""
-    return get_user_gold(user['username'])
+    return await get_user_gold_async(user['username'])
 
 @router.post("/shop/buy")
-def buy_item_endpoint(request: BuyRequest, user = Depends(get_current_user)):
+def buy_item_endpoint(request: BuyRequest, user = Depends(get_current_user), db = Depends(request_connection),
+                      idempotency_key: Optional[str] = Header(None)):
     """아이템 구매 요청"""
-    return buy_item(user['username'], request.item_id)
+    return _run_write(user, db, "buy", idempotency_key, request, buy_item, user['username'], request.item_id)
+
+@router.post("/shop/checkout")
+def checkout_endpoint(request: CheckoutRequest, user = Depends(get_current_user), db = Depends(request_connection),
+                      idempotency_key: Optional[str] = Header(None)):
+    """장바구니 결제 요청 (여러 아이템을 한 번에 구매)"""
+    return _run_write(user, db, "checkout", idempotency_key, request, checkout_cart,
+                      user['username'], [(line.item_id, line.quantity) for line in request.lines])
 
 @router.post("/shop/sell")
-def sell_item_endpoint(request: SellRequest, user = Depends(get_current_user)):
+def sell_item_endpoint(request: SellRequest, user = Depends(get_current_user), db = Depends(request_connection),
+                       idempotency_key: Optional[str] = Header(None)):
     """아이템 판매 요청"""
-    return sell_item(user['username'], request.inventory_id)
+    return _run_write(user, db, "sell", idempotency_key, request, sell_item, user['username'], request.inventory_id)
 
 @router.post("/shop/sell/all")
-def sell_all_items_endpoint(user = Depends(get_current_user)):
-    """아이템 전체 판매 요청"""
-    return sell_all_items(user['username'])
+def sell_all_items_endpoint(request: Optional[SellAllRequest] = None,
+                            user = Depends(get_current_user), db = Depends(request_connection),
+                            idempotency_key: Optional[str] = Header(None)):
+    """아이템 전체 판매 요청 (본문으로 등급/아이템/획득 시각 조건 지정 가능)"""
+    request = request or SellAllRequest()
+    return _run_write(user, db, "sell_all", idempotency_key, request, sell_all_items,
+                      user['username'], request.rarities, request.item_ids, request.acquired_before)
 
 @router.post("/shop/gacha/fixed")
-def gacha_fixed_endpoint(user = Depends(get_current_user)):
-    return play_gacha_fixed(user['username'])
+def gacha_fixed_endpoint(user = Depends(get_current_user), db = Depends(request_connection),
+                         idempotency_key: Optional[str] = Header(None)):
+    return _run_write(user, db, "gacha_fixed", idempotency_key, None, play_gacha_fixed, user['username'])
 
 @router.post("/shop/gacha/dynamic")
-def gacha_dynamic_endpoint(request: GachaRequest, user = Depends(get_current_user)):
-    return play_gacha_dynamic(user['username'], request.count)
+def gacha_dynamic_endpoint(request: GachaRequest, user = Depends(get_current_user), db = Depends(request_connection),
+                           idempotency_key: Optional[str] = Header(None)):
+    # 결과 목록 모드의 대량 요청은 행 잠금을 오래 잡으므로 받지 않음 (bulk=true로 요청)
+    if not request.bulk and request.count > GACHA_LIST_MAX_PULLS:
+        raise HTTPException(status_code=400, detail=list_pull_limit_message())
+    return _run_write(user, db, "gacha_dynamic", idempotency_key, request, play_gacha_dynamic,
+                      user['username'], request.count, request.bulk)
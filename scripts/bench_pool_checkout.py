@@ -0,0 +1,102 @@
+import os
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 프로젝트 루트의 database 모듈 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mysql.connector import pooling
+from database import dbconfig, PoolManager, LightweightPool
+
+# 연결 풀 방식별 checkout 비용 비교
+# - session: mysql.connector 기본 풀 (꺼낼 때 ping + 반납할 때 세션 리셋)
+# - light  : LightweightPool (반납 시 열린 트랜잭션만 rollback, 오래 쉰 연결만 ping)
+# 각 방식으로 "빈 checkout/반납"과 "checkout + SELECT 1 + 반납"을 반복해 1회당 평균/백분위 시간을 출력합니다.
+# 실행: python scripts/bench_pool_checkout.py --iterations 2000 --threads 8
+
+
+def build_manager(mode: str, size: int) -> PoolManager:
+    if mode == "light":
+        pool = LightweightPool(size, **dbconfig)
+        pool.prewarm(size)
+    else:
+        pool = pooling.MySQLConnectionPool(pool_name=f"bench_{mode}", pool_size=size,
+                                           pool_reset_session=True, **dbconfig)
+    return PoolManager(pool, size, 0, 30)
+
+
+def checkout_only(manager):
+    conn = manager.get_connection()
+    conn.close()
+
+
+def checkout_query(manager):
+    conn = manager.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def measure(manager, fn, iterations: int, threads: int):
+    samples = []
+    lock = threading.Lock()
+
+    def worker(n):
+        local = []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            fn(manager)
+            local.append(time.perf_counter() - t0)
+        with lock:
+            samples.extend(local)
+
+    per_thread = max(1, iterations // threads)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, [per_thread] * threads))
+    wall = time.perf_counter() - started
+
+    samples.sort()
+    return {
+        "n": len(samples),
+        "avg_ms": sum(samples) / len(samples) * 1000,
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+        "ops_per_sec": len(samples) / wall,
+    }
+
+
+def run(modes, iterations: int, threads: int, size: int):
+    print(f"--- ⏱  POOL CHECKOUT BENCH ({iterations} iterations, {threads} threads, pool size {size}) ---")
+    results = {}
+    for mode in modes:
+        manager = build_manager(mode, size)
+        checkout_query(manager)  # 첫 연결 비용 제외
+        for label, fn in (("checkout", checkout_only), ("checkout+SELECT 1", checkout_query)):
+            r = measure(manager, fn, iterations, threads)
+            results[(mode, label)] = r
+            print(f"{mode:>8} | {label:<18} | avg {r['avg_ms']:.3f}ms | p50 {r['p50_ms']:.3f}ms | "
+                  f"p99 {r['p99_ms']:.3f}ms | {r['ops_per_sec']:.0f} ops/s")
+
+    if "session" in modes and "light" in modes:
+        for label in ("checkout", "checkout+SELECT 1"):
+            before, after = results[("session", label)], results[("light", label)]
+            print(f"\n{label}: {before['avg_ms']:.3f}ms -> {after['avg_ms']:.3f}ms "
+                  f"({before['avg_ms'] / max(after['avg_ms'], 1e-9):.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-checkout overhead: session reset pool vs lightweight pool")
+    parser.add_argument("--modes", default="session,light")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--size", type=int, default=8)
+    args = parser.parse_args()
+    run([m.strip() for m in args.modes.split(",") if m.strip()], args.iterations, args.threads, args.size)
@@ -0,0 +1,133 @@
+import os
+import sys
+import time
+import argparse
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# 프로젝트 루트의 database / services 모듈 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_db_connection
+from services.course_service import register_student
+
+# 수강신청 오픈 상황 재현: 정원 N명 강좌 하나에 수백 명이 동시에 register_student()를 호출합니다.
+# 끝나면 정원 초과 등록이 없는지(enrollments 수 == enrolled_count <= capacity)와 지연 시간을 출력합니다.
+# 실행: python scripts/bench_registration_rush.py --students 300 --capacity 50
+
+BENCH_PREFIX = "bench_rush_"
+
+
+def setup(students: int, capacity: int) -> int:
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT IGNORE INTO members (username, name) VALUES (%s, %s)",
+            [(f"{BENCH_PREFIX}{i:04d}", f"Bench {i}") for i in range(students)]
+        )
+        cursor.execute(
+            "INSERT INTO courses (name, instructor, capacity, enrolled_count, description) VALUES (%s, %s, %s, 0, %s)",
+            ("Registration Rush Bench", "bench", capacity, "bench_registration_rush.py")
+        )
+        course_id = cursor.lastrowid
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    return course_id
+
+
+def verify(course_id: int):
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT capacity, enrolled_count FROM courses WHERE id = %s", (course_id,))
+        course = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) AS cnt FROM enrollments WHERE course_id = %s", (course_id,))
+        course["enrollments"] = cursor.fetchone()["cnt"]
+        cursor.close()
+    finally:
+        conn.close()
+    return course
+
+
+def cleanup(course_id: int):
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM enrollments WHERE course_id = %s", (course_id,))
+        cursor.execute("DELETE FROM courses WHERE id = %s", (course_id,))
+        cursor.execute("DELETE FROM members WHERE username LIKE %s", (BENCH_PREFIX + "%",))
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run(students: int, capacity: int, threads: int, duplicates: int, keep: bool):
+    course_id = setup(students, capacity)
+    print(f"--- 🏁 REGISTRATION RUSH: {students} students (+{duplicates} duplicates) -> course {course_id} (capacity {capacity}) ---")
+
+    names = [f"{BENCH_PREFIX}{i:04d}" for i in range(students)]
+    names += names[:duplicates]  # 같은 학생의 중복 클릭
+    start_gate = threading.Barrier(min(threads, len(names)))
+    outcomes = Counter()
+    latencies = []
+    lock = threading.Lock()
+
+    def attempt(name):
+        try:
+            start_gate.wait(timeout=10)
+        except threading.BrokenBarrierError:
+            pass
+        t0 = time.perf_counter()
+        try:
+            result = register_student(name, course_id)
+            outcome = "success" if result["success"] else result["message"]
+        except Exception as e:
+            outcome = f"error: {type(e).__name__}"
+        elapsed = time.perf_counter() - t0
+        with lock:
+            outcomes[outcome] += 1
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(attempt, names))
+    wall = time.perf_counter() - started
+
+    course = verify(course_id)
+    print(f"\n⏱  {len(names)} requests in {wall:.2f}s ({len(names) / wall:.1f} req/s)")
+    print(f"   latency p50 {percentile(latencies, 0.5) * 1000:.1f}ms | "
+          f"p95 {percentile(latencies, 0.95) * 1000:.1f}ms | max {max(latencies) * 1000:.1f}ms")
+    for outcome, n in outcomes.most_common():
+        print(f"   {n:5d}  {outcome}")
+
+    ok = course["enrollments"] == course["enrolled_count"] <= course["capacity"] \
+        and outcomes["success"] == course["enrollments"]
+    print(f"\n{'✅' if ok else '❌'} capacity {course['capacity']} | enrolled_count {course['enrolled_count']} | "
+          f"enrollments rows {course['enrollments']}")
+
+    if not keep:
+        cleanup(course_id)
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent course registration benchmark")
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--capacity", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=100, help="동시에 신청하는 스레드 수")
+    parser.add_argument("--duplicates", type=int, default=20, help="중복 신청을 보내는 학생 수")
+    parser.add_argument("--keep", action="store_true", help="벤치마크 데이터를 지우지 않음")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.students, args.capacity, args.threads, args.duplicates, args.keep) else 1)
@@ -0,0 +1,98 @@
+import os
+import sys
+import sqlite3
+import tempfile
+
+# 프로젝트 루트의 database 모듈 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import (
+    build_pool_manager, configure_pools, get_db_connection, read_only, RequestConnection,
+)
+
+# 읽기 라우팅 확인: SQLite 파일 두 개를 primary / replica 대신 사용합니다.
+# 각 DB의 marker 테이블에 자기 이름을 넣어 두고, 조회가 어느 쪽으로 갔는지 확인합니다.
+# (서비스 SQL은 MySQL 문법이므로 여기서는 database 계층의 라우팅만 확인)
+# 실행: python scripts/check_read_routing.py
+
+
+def sqlite_connector(path: str):
+    return lambda: sqlite3.connect(path, check_same_thread=False)
+
+
+def setup(directory: str):
+    managers = {}
+    for name in ("primary", "replica"):
+        path = os.path.join(directory, f"{name}.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE marker (name TEXT)")
+        conn.execute("INSERT INTO marker VALUES (?)", (name,))
+        conn.commit()
+        conn.close()
+        managers[name] = build_pool_manager(sqlite_connector(path), pool_size=2, name=f"sqlite_{name}")
+    configure_pools(primary=managers["primary"], replica=managers["replica"])
+
+
+def which_db(conn=None) -> str:
+    conn = get_db_connection(conn)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM marker")
+        name = cursor.fetchone()[0]
+        cursor.close()
+    finally:
+        conn.close()
+    return name
+
+
+@read_only
+def which_db_read(conn=None) -> str:
+    return which_db(conn)
+
+
+def write(conn):
+    # 쓰기 대신 커밋만 - 요청 연결로 커밋하면 읽기 고정이 걸림
+    db = get_db_connection(conn)
+    try:
+        db.commit()
+    finally:
+        db.close()
+
+
+def request(pin_key, fn, *args):
+    conn = RequestConnection(pin_key=pin_key)
+    try:
+        return fn(*args, conn=conn)
+    finally:
+        conn.release()
+
+
+def run() -> bool:
+    checks = [
+        ("read without request connection", which_db_read(), "replica"),
+        ("write path without request connection", which_db(), "primary"),
+        ("read in request (alice)", request("alice", which_db_read), "replica"),
+        ("write path in request (alice)", request("alice", which_db), "primary"),
+    ]
+    request("alice", write)
+    checks += [
+        ("read right after alice commits (alice)", request("alice", which_db_read), "primary"),
+        ("read right after alice commits (bob)", request("bob", which_db_read), "replica"),
+    ]
+    configure_pools(replica=None)
+    checks.append(("read with replica disabled", which_db_read(), "primary"))
+
+    ok = True
+    for label, got, expected in checks:
+        passed = got == expected
+        ok = ok and passed
+        print(f"{'✅' if passed else '❌'} {label}: {got} (expected {expected})")
+    print(f"\npin window: {database.READ_PIN_SECONDS}s | routing stats: {database.read_routing_stats()}")
+    return ok
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        setup(directory)
+        sys.exit(0 if run() else 1)
@@ -1,6 +1,7 @@
 import mysql.connector
 import os
 from dotenv import load_dotenv
+from migrate import m0004_course_waitlist
 
 # .env 로드
 load_dotenv()
@@ -23,6 +24,7 @@ def init_course_tables():
             name VARCHAR(100) NOT NULL,
             instructor VARCHAR(100),
             capacity INT DEFAULT 30,
+            enrolled_count INT NOT NULL DEFAULT 0,
             description TEXT
         ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
         ''')
@@ -64,6 +66,10 @@ def init_course_tables():
         except Exception as e:
             print(f"Skipping insert (maybe duplicate): {e}")
 
+        # 대기자 명단 테이블 (DDL은 마이그레이션 0004와 같은 함수를 사용 - 버전 기록은 migrate.py가 함)
+        print("Creating table 'course_waitlist'...")
+        m0004_course_waitlist(cursor, conn)
+
         conn.commit()
         print("Course tables created successfully!")
         
@@ -41,14 +41,19 @@ def init_shop_tables():
         ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
         ''')
 
-        # 3. Create 'inventory' table
+        # 3. Create 'inventory' table (one row per (owner, item) with a quantity)
+        #    기존 1행=1개 구조의 DB는 scripts/migrate_inventory_stacks.py로 변환하세요.
         print("🎒 Creating table 'inventory'...")
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS inventory (
             id INT AUTO_INCREMENT PRIMARY KEY,
             student_name VARCHAR(50) NOT NULL,
             item_id INT NOT NULL,
+            quantity INT NOT NULL DEFAULT 1,
             acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_inventory_owner_item (student_name, item_id),
+            KEY idx_inventory_owner_acquired (student_name, acquired_at, id),
             FOREIGN KEY (item_id) REFERENCES items(id)
         ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
         ''')
@@ -0,0 +1,324 @@
+import os
+import sys
+import json
+import argparse
+import mysql.connector
+
+# 프로젝트 루트의 database 모듈 사용 (서버와 같은 접속 설정 / .env)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_db_connection
+from migrate_inventory_stacks import migrate_inventory_stacks, InventoryMigrationError
+
+# 버전 관리되는 스키마 마이그레이션 실행기
+# - 적용한 버전은 schema_migrations 테이블에 기록하고, 아직 적용하지 않은 버전만 순서대로 실행합니다.
+# - 각 마이그레이션은 information_schema로 현재 상태를 확인하므로 여러 번 실행해도 안전합니다.
+# - 대상 테이블이 아직 없어 건너뛴 부분이 있으면 그 버전은 기록하지 않고, 다음 실행 때 다시 적용합니다.
+#   (init_*.py로 테이블을 만든 뒤 migrate.py를 다시 실행)
+# - 실행 후 서비스 쿼리의 EXPLAIN 결과를 모아 주요 테이블의 전체 스캔(type=ALL)을 찾아냅니다.
+# 실행: python scripts/migrate.py            (마이그레이션 + EXPLAIN 점검)
+#       python scripts/migrate.py --status   (적용 현황만 출력)
+#       python scripts/migrate.py --explain-only --explain-out plans.json
+
+
+class MissingTablesError(Exception):
+    """마이그레이션 대상 테이블이 아직 없어 일부를 적용하지 못했을 때 발생합니다. (버전 기록 안 함)"""
+
+    def __init__(self, tables):
+        self.tables = list(tables)
+        super().__init__(f"missing tables: {', '.join(self.tables)}")
+
+
+# ─── information_schema 헬퍼 ───
+
+def table_exists(cursor, table: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return cursor.fetchone()[0] > 0
+
+def column_exists(cursor, table: str, column: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+def index_exists(cursor, table: str, index: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table, index))
+    return cursor.fetchone()[0] > 0
+
+def add_column(cursor, table: str, column: str, definition: str) -> bool:
+    """컬럼을 추가합니다. 테이블이 없어서 건너뛰었으면 False"""
+    if not table_exists(cursor, table):
+        print(f"   ⏭  '{table}' table not found. Skipping column '{column}'.")
+        return False
+    if column_exists(cursor, table, column):
+        print(f"   ✅ {table}.{column} already exists.")
+    else:
+        print(f"   ➕ Adding {table}.{column}...")
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+def add_index(cursor, table: str, index: str, columns: str) -> bool:
+    """인덱스를 추가합니다. 테이블이 없어서 건너뛰었으면 False"""
+    if not table_exists(cursor, table):
+        print(f"   ⏭  '{table}' table not found. Skipping index '{index}'.")
+        return False
+    if index_exists(cursor, table, index):
+        print(f"   ✅ {table}.{index} already exists.")
+    else:
+        print(f"   ➕ Adding index {table}.{index} ({columns})...")
+        cursor.execute(f"ALTER TABLE {table} ADD INDEX {index} ({columns})")
+    return True
+
+def require_tables(cursor, *tables):
+    """필요한 테이블이 모두 있는지 확인하고, 없으면 MissingTablesError"""
+    missing = [table for table in tables if not table_exists(cursor, table)]
+    if missing:
+        raise MissingTablesError(missing)
+
+def add_columns(cursor, columns):
+    """(테이블, 컬럼, 정의) 목록을 가능한 만큼 추가하고, 테이블이 없어 건너뛴 것이 있으면 MissingTablesError"""
+    _raise_if_skipped([table for table, column, definition in columns
+                       if not add_column(cursor, table, column, definition)])
+
+def add_indexes(cursor, indexes):
+    """(테이블, 인덱스, 컬럼) 목록을 가능한 만큼 추가하고, 테이블이 없어 건너뛴 것이 있으면 MissingTablesError"""
+    _raise_if_skipped([table for table, index, columns in indexes
+                       if not add_index(cursor, table, index, columns)])
+
+def _raise_if_skipped(tables):
+    if tables:
+        raise MissingTablesError(dict.fromkeys(tables))  # 순서 유지 + 중복 제거
+
+
+# ─── 마이그레이션 목록 (버전 순서대로, 한 번 배포한 항목은 수정하지 말고 새 버전을 추가) ───
+
+def m0001_shop_and_auth_columns(cursor, conn):
+    """init_shop_tables / init_gacha_schema / init_auth_schema가 추가하던 컬럼"""
+    add_columns(cursor, [
+        ("members", "gold", "INT DEFAULT 10000"),
+        ("members", "gacha_fail_count", "INT DEFAULT 0"),
+        ("members", "password_hash", "VARCHAR(255) DEFAULT NULL"),
+        ("members", "role", "VARCHAR(50) DEFAULT 'USER'"),
+        ("members", "created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+        ("items", "gacha_weight", "INT DEFAULT 0"),
+        ("items", "rarity", "VARCHAR(20) DEFAULT 'COMMON'"),
+    ])
+
+def m0002_inventory_stacks(cursor, conn):
+    """inventory를 (소유자, 아이템)당 1행 + quantity 구조로 변환 (scripts/migrate_inventory_stacks.py)"""
+    require_tables(cursor, "inventory")
+    migrate_inventory_stacks(conn)  # 변환 실패 시 InventoryMigrationError → 버전 기록 안 함
+
+def m0003_course_enrolled_count(cursor, conn):
+    """courses.enrolled_count 추가 후 실제 인원으로 채움"""
+    require_tables(cursor, "courses", "enrollments")
+    if not column_exists(cursor, "courses", "enrolled_count"):
+        add_column(cursor, "courses", "enrolled_count", "INT NOT NULL DEFAULT 0 AFTER capacity")
+        print("   🔄 Recounting enrollments...")
+        cursor.execute("""
+            UPDATE courses c
+            LEFT JOIN (SELECT course_id, COUNT(*) AS cnt FROM enrollments GROUP BY course_id) e
+                ON e.course_id = c.id
+            SET c.enrolled_count = COALESCE(e.cnt, 0)
+        """)
+    else:
+        print("   ✅ courses.enrolled_count already exists.")
+
+def m0004_course_waitlist(cursor, conn):
+    """정원 초과 신청 대기자 명단 (scripts/init_course_tables.py도 이 함수로 생성)"""
+    require_tables(cursor, "courses")
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS course_waitlist (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        course_id INT NOT NULL,
+        student_name VARCHAR(50) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (course_id) REFERENCES courses(id),
+        UNIQUE KEY unique_waitlist (course_id, student_name)
+    ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+    ''')
+    print("   ✅ course_waitlist ready.")
+
+def m0005_hot_path_indexes(cursor, conn):
+    """서비스 쿼리가 사용하는 보조 인덱스"""
+    add_indexes(cursor, [
+        ("members", "idx_members_name", "name"),                                        # play_gacha_fixed (WHERE name = ?)
+        ("inventory", "idx_inventory_owner_acquired", "student_name, acquired_at, id"),  # 인벤토리 목록/커서 페이지
+        ("enrollments", "idx_enrollments_course_created", "course_id, created_at"),     # get_enrollments
+        ("appeals", "idx_appeals_course_created", "course_id, created_at"),             # get_appeals
+    ])
+
+MIGRATIONS = [
+    ("0001", "shop/gacha/auth columns", m0001_shop_and_auth_columns),
+    ("0002", "stacked inventory", m0002_inventory_stacks),
+    ("0003", "courses.enrolled_count", m0003_course_enrolled_count),
+    ("0004", "course_waitlist table", m0004_course_waitlist),
+    ("0005", "hot-path secondary indexes", m0005_hot_path_indexes),
+]
+
+
+# ─── EXPLAIN 점검 대상 (서비스 쿼리와 같은 형태, 파라미터는 임의 값) ───
+
+WATCHED_TABLES = {"inventory", "enrollments", "appeals", "members", "course_waitlist"}
+TABLE_ALIASES = {"inv": "inventory", "e": "enrollments", "i": "items"}  # EXPLAIN은 별칭으로 표시
+
+EXPLAIN_QUERIES = [
+    ("user_service.get_member",
+     "SELECT * FROM members WHERE username = %s", ("__explain__",)),
+    ("shop_service.play_gacha_fixed",
+     "UPDATE members SET gold = gold - %s WHERE name = %s AND gold >= %s LIMIT 1", (0, "__explain__", 0)),
+    ("shop_service.get_inventory",
+     """SELECT inv.id, inv.acquired_at, inv.quantity, i.name, i.description, i.image_url, i.price
+        FROM inventory inv JOIN items i ON inv.item_id = i.id
+        WHERE inv.student_name = %s ORDER BY inv.acquired_at DESC, inv.id DESC LIMIT %s OFFSET %s""",
+     ("__explain__", 50, 0)),
+    ("shop_service.get_inventory_page",
+     """SELECT id, item_id, quantity, acquired_at FROM inventory
+        WHERE student_name = %s AND (acquired_at < %s OR (acquired_at = %s AND id < %s))
+        ORDER BY acquired_at DESC, id DESC LIMIT %s""",
+     ("__explain__", "2100-01-01", "2100-01-01", 0, 51)),
+    ("shop_service.sell_item",
+     """SELECT inv.id, inv.quantity, i.price, i.name FROM inventory inv JOIN items i ON inv.item_id = i.id
+        WHERE inv.id = %s AND inv.student_name = %s""", (0, "__explain__")),
+    ("shop_service.sell_all_items",
+     """SELECT inv.item_id, i.name, i.rarity, SUM(inv.quantity), SUM(FLOOR(i.price * 0.5) * inv.quantity)
+        FROM inventory inv JOIN items i ON inv.item_id = i.id
+        WHERE inv.student_name = %s GROUP BY inv.item_id, i.name, i.rarity""", ("__explain__",)),
+    ("course_service.get_enrollments",
+     """SELECT e.id, e.student_name, e.created_at, e.course_id FROM enrollments e
+        WHERE e.course_id = %s ORDER BY e.created_at DESC""", (0,)),
+    ("course_service.reconcile (recount)",
+     "SELECT COUNT(*) FROM enrollments WHERE course_id = %s", (0,)),
+    ("course_service._promote_waitlist",
+     "SELECT id, student_name FROM course_waitlist WHERE course_id = %s ORDER BY id LIMIT 1", (0,)),
+    ("appeal_service.get_appeals",
+     "SELECT * FROM appeals WHERE course_id = %s ORDER BY created_at DESC", (0,)),
+]
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(50) PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+    ''')
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate() -> bool:
+    """
+    아직 적용하지 않은 버전을 순서대로 실행합니다. 실패하면 그 버전을 기록하지 않고 멈춥니다. (다음 실행 때 다시 시도)
+    대상 테이블이 없어 일부만 적용한 버전도 기록하지 않습니다. (각 버전은 다시 실행해도 안전하므로 다음 버전은 계속 진행)
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(buffered=True)
+        ensure_migrations_table(cursor)
+        done = applied_versions(cursor)
+        pending = [m for m in MIGRATIONS if m[0] not in done]
+        deferred = []
+        if not pending:
+            print("✅ Schema is up to date.")
+        for version, description, fn in pending:
+            print(f"🔨 [{version}] {description}")
+            try:
+                fn(cursor, conn)
+            except MissingTablesError as e:
+                conn.commit()
+                deferred.append(version)
+                print(f"⏸  [{version}] not recorded - waiting for table(s): {', '.join(e.tables)}")
+                continue
+            except (InventoryMigrationError, mysql.connector.Error) as e:
+                conn.rollback()
+                print(f"❌ [{version}] failed: {e}")
+                print("   Later migrations were not run. Fix the problem and run the script again.")
+                return False
+            cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                           (version, description))
+            conn.commit()
+        if deferred:
+            print(f"ℹ️  Run this script again after creating the missing tables to apply {', '.join(deferred)}.")
+        cursor.close()
+    finally:
+        conn.close()
+    return True
+
+def status():
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(buffered=True)
+        ensure_migrations_table(cursor)
+        done = applied_versions(cursor)
+        for version, description, _ in MIGRATIONS:
+            print(f"{'✅' if version in done else '⏳'} [{version}] {description}")
+        cursor.close()
+    finally:
+        conn.close()
+
+def explain_queries():
+    """서비스 쿼리의 실행 계획을 모으고, 주요 테이블을 전체 스캔하는 쿼리를 표시합니다."""
+    plans = []
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        for name, sql, params in EXPLAIN_QUERIES:
+            try:
+                cursor.execute("EXPLAIN " + sql, params)
+                rows = cursor.fetchall()
+            except Exception as e:
+                plans.append({"query": name, "error": str(e), "full_scans": []})
+                continue
+            full_scans = [row['table'] for row in rows
+                          if row.get('type') == 'ALL' and TABLE_ALIASES.get(row['table'], row['table']) in WATCHED_TABLES]
+            plans.append({"query": name, "plan": rows, "full_scans": full_scans})
+        cursor.close()
+    finally:
+        conn.close()
+
+    flagged = 0
+    print("\n--- 🔍 EXPLAIN CHECK ---")
+    for plan in plans:
+        if "error" in plan:
+            print(f"⚠️  {plan['query']}: {plan['error']}")
+            continue
+        summary = ", ".join(f"{row['table']}:{row['type']}/{row.get('key') or '-'}" for row in plan["plan"])
+        if plan["full_scans"]:
+            flagged += 1
+            print(f"❌ {plan['query']}: FULL SCAN on {plan['full_scans']} ({summary})")
+        else:
+            print(f"✅ {plan['query']}: {summary}")
+    return plans, flagged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versioned schema migrations + EXPLAIN check")
+    parser.add_argument("--status", action="store_true", help="적용 현황만 출력")
+    parser.add_argument("--explain-only", action="store_true", help="마이그레이션 없이 EXPLAIN 점검만 실행")
+    parser.add_argument("--explain-out", help="EXPLAIN 결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    if args.status:
+        status()
+        sys.exit(0)
+
+    print("--- 🗄  SCHEMA MIGRATIONS ---")
+    if not args.explain_only and not migrate():
+        sys.exit(1)
+    plans, flagged = explain_queries()
+    if args.explain_out:
+        with open(args.explain_out, "w", encoding="utf-8") as f:
+            json.dump(plans, f, ensure_ascii=False, indent=2, default=str)
+        print(f"📝 Plans written to {args.explain_out}")
+    sys.exit(1 if flagged else 0)
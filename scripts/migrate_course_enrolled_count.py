@@ -0,0 +1,40 @@
+import os
+import sys
+
+# 프로젝트 루트의 database 모듈 사용 (서버와 같은 접속 설정 / .env)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_db_connection
+from migrate import migrate
+
+# courses 테이블에 enrolled_count(현재 수강 인원) 컬럼을 추가하고 enrollments 기준으로 채웁니다.
+# 수강신청은 이 컬럼을 조건부 UPDATE로 늘리고 줄이므로, 기존 DB는 서버 시작 전에 한 번 실행하세요.
+# 컬럼/대기자 명단 테이블은 scripts/migrate.py (0003, 0004)가 만들고, 여기서는 인원만 다시 맞춥니다.
+
+def migrate_course_enrolled_count():
+    print("--- 📚 COURSE ENROLLED_COUNT MIGRATION ---")
+    if not migrate():
+        return False
+
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        # 실제 수강 인원으로 다시 맞춤 (여러 번 실행해도 안전)
+        print("🔄 Recounting enrollments...")
+        cursor.execute("""
+            UPDATE courses c
+            LEFT JOIN (SELECT course_id, COUNT(*) AS cnt FROM enrollments GROUP BY course_id) e
+                ON e.course_id = c.id
+            SET c.enrolled_count = COALESCE(e.cnt, 0)
+        """)
+        print(f"✅ {cursor.rowcount} course(s) updated.")
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+
+    print("🎉 Course Migration Complete!")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if migrate_course_enrolled_count() else 1)
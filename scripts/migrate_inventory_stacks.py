@@ -0,0 +1,88 @@
+import os
+import sys
+
+# 프로젝트 루트의 database 모듈 사용 (서버와 같은 접속 설정 / .env)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_db_connection
+
+# 1행=아이템 1개 구조의 inventory를 (소유자, 아이템)당 1행 + quantity 구조로 변환합니다.
+# - 새 테이블(inventory_stacks)에 묶어서 채운 뒤 RENAME TABLE로 한 번에 교체
+# - 기존 테이블은 inventory_legacy로 남겨 두므로 확인 후 직접 삭제하세요.
+# 변환 중 들어온 구매/가챠 기록이 빠지지 않도록 서버를 멈춘 상태에서 실행하는 것을 권장합니다.
+# scripts/migrate.py (0002)가 자신의 연결을 넘겨 호출합니다. 변환에 실패하면 예외를 던지므로 버전이 기록되지 않습니다.
+
+
+class InventoryMigrationError(Exception):
+    """변환 결과가 원본과 맞지 않아 테이블을 교체하지 않았을 때 발생합니다."""
+
+
+def migrate_inventory_stacks(conn=None):
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+    cursor = conn.cursor(buffered=True)
+    print("--- 🎒 INVENTORY STACK MIGRATION ---")
+
+    try:
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'inventory' AND COLUMN_NAME = 'quantity'
+        """)
+        if cursor.fetchone()[0]:
+            print("✅ 'inventory' already uses quantity stacks. Nothing to do.")
+            return
+
+        cursor.execute("SELECT COUNT(*) FROM inventory")
+        legacy_rows = cursor.fetchone()[0]
+
+        print("🔨 Creating table 'inventory_stacks'...")
+        cursor.execute("DROP TABLE IF EXISTS inventory_stacks")
+        cursor.execute('''
+        CREATE TABLE inventory_stacks (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            student_name VARCHAR(50) NOT NULL,
+            item_id INT NOT NULL,
+            quantity INT NOT NULL DEFAULT 1,
+            acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE KEY uq_inventory_owner_item (student_name, item_id),
+            KEY idx_inventory_owner_acquired (student_name, acquired_at, id),
+            FOREIGN KEY (item_id) REFERENCES items(id)
+        ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+        ''')
+
+        # 처음 획득한 시각을 acquired_at으로, 마지막 획득 시각을 updated_at으로 보존
+        print(f"📦 Stacking {legacy_rows} legacy rows...")
+        cursor.execute('''
+        INSERT INTO inventory_stacks (student_name, item_id, quantity, acquired_at, updated_at)
+        SELECT student_name, item_id, COUNT(*), MIN(acquired_at), MAX(acquired_at)
+        FROM inventory
+        GROUP BY student_name, item_id
+        ''')
+        conn.commit()
+
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(quantity), 0) FROM inventory_stacks")
+        stacks, total = cursor.fetchone()
+        if int(total) != legacy_rows:
+            cursor.execute("DROP TABLE IF EXISTS inventory_stacks")
+            raise InventoryMigrationError(
+                f"Count mismatch (legacy {legacy_rows} vs stacked {total}). 'inventory' left untouched.")
+
+        # 두 테이블 이름을 한 번에 교체 (중간 상태가 보이지 않음)
+        cursor.execute("DROP TABLE IF EXISTS inventory_legacy")
+        cursor.execute("RENAME TABLE inventory TO inventory_legacy, inventory_stacks TO inventory")
+        print(f"✅ {legacy_rows} rows -> {stacks} stacks. Old table kept as 'inventory_legacy'.")
+    finally:
+        cursor.close()
+        if own_conn:
+            conn.close()
+
+    print("🎉 Inventory Migration Complete!")
+
+if __name__ == "__main__":
+    try:
+        migrate_inventory_stacks()
+    except InventoryMigrationError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
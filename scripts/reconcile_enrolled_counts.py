@@ -0,0 +1,18 @@
+import os
+import sys
+
+# 프로젝트 루트의 database / services 모듈 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.course_service import reconcile_enrolled_counts
+
+# courses.enrolled_count가 enrollments 실제 인원과 어긋난 강좌를 찾아 보정합니다.
+# 서버 실행 중에도 안전하게 실행할 수 있습니다. (강좌 하나씩 잠가서 보정)
+# 서버에서 주기적으로 실행하려면 ENROLLMENT_RECONCILE_INTERVAL(초)을 설정하세요.
+
+if __name__ == "__main__":
+    print("--- 🔄 ENROLLED_COUNT RECONCILIATION ---")
+    result = reconcile_enrolled_counts()
+    for row in result["fixed"]:
+        print(f"🔧 course {row['course_id']}: {row['enrolled_count']} -> {row['actual']}")
+    print(f"✅ {result['checked']} drifted candidate(s), {len(result['fixed'])} fixed.")
@@ -1,9 +1,9 @@
-from database import get_db_connection
+from database import get_db_connection, read_only
 import mysql.connector
 
-def create_appeal(course_id: int, student_name: str, content: str, is_secret: bool = True):
+def create_appeal(course_id: int, student_name: str, content: str, is_secret: bool = True, conn=None):
     """이의신청을 등록합니다."""
-    conn = get_db_connection()
+    conn = get_db_connection(conn)
     try:
         cursor = conn.cursor()
         sql = """
@@ -19,9 +19,10 @@ def create_appeal(course_id: int, student_name: str, content: str, is_secret: bo
         conn.close()
     return {"success": True, "message": "이의신청이 등록되었습니다."}
 
-def get_appeals(course_id: int):
+@read_only
+def get_appeals(course_id: int, conn=None):
     """특정 강좌의 이의신청 목록을 반환합니다."""
-    conn = get_db_connection()
+    conn = get_db_connection(conn)
     try:
         cursor = conn.cursor(dictionary=True)
         sql = """
@@ -1,70 +1,165 @@
-from database import get_db_connection
+import os
+from database import get_db_connection, read_only
+from core.cache import SingleFlightCache
+from core.cache_backend import cache_backend
 import mysql.connector
+from core.transactions import retry_transaction, is_retryable, error_code
 
-def get_all_courses():
-    """개설된 전체 강좌 목록과 현재 수강 인원을 반환합니다."""
+# [NEW] 강좌 목록 캐시 (워커 간 공유, 수강신청/취소 시 무효화)
+COURSES_CACHE_TTL = float(os.getenv("COURSES_CACHE_TTL", 5))
+
+def _load_courses():
     conn = get_db_connection()
     try:
         cursor = conn.cursor(dictionary=True)
-        # courses 테이블과 enrollments 테이블을 조인하여 수강 인원(enrolled_count) 계산
-        sql = """
-            SELECT c.*, COUNT(e.id) as enrolled_count 
-            FROM courses c 
-            LEFT JOIN enrollments e ON c.id = e.course_id 
-            GROUP BY c.id
-        """
-        cursor.execute(sql)
+        # 수강 인원(enrolled_count)은 수강신청/취소 때 courses 행에서 함께 관리되므로 JOIN 없이 조회
+        cursor.execute("SELECT * FROM courses")
         courses = cursor.fetchall()
         cursor.close()
     finally:
         conn.close()
     return courses
 
-def register_student(student_name: str, course_id: int):
-    """학생을 강좌에 등록합니다. (정원 체크, 중복 체크 포함)"""
-    conn = get_db_connection()
+courses_cache = SingleFlightCache(_load_courses, ttl=COURSES_CACHE_TTL, stale_ttl=COURSES_CACHE_TTL * 2,
+                                  name="courses", backend=cache_backend)
+
+def get_all_courses():
+    """개설된 전체 강좌 목록과 현재 수강 인원을 반환합니다."""
+    return courses_cache.get()
+
+# [NEW] 정원 확인과 인원 증가를 한 문장으로 처리하는 조건부 UPDATE (courses.enrolled_count)
+# 같은 강좌 신청은 이 행 잠금으로 줄을 서므로 정원을 넘겨 등록되지 않습니다.
+DUPLICATE_ENTRY = 1062
+
+def _registration_failure(cursor, course_id: int):
+    """조건부 UPDATE가 실패한 경우에만 원인(강좌 없음 / 정원 초과)을 확인합니다."""
+    cursor.execute("SELECT id FROM courses WHERE id = %s", (course_id,))
+    if not cursor.fetchone():
+        return {"success": False, "message": "강좌를 찾을 수 없습니다."}
+    return {"success": False, "message": "수강 정원이 초과되었습니다."}
+
+# [NEW] 대기자 명단 (course_waitlist) - 정원이 찬 강좌는 신청 순서대로 대기하고,
+# delete_enrollment() / 정원 확대 / 인원 보정으로 자리가 나면 맨 앞 대기자부터 자동으로 등록됩니다.
+# 대기 등록과 자리 반환은 모두 courses 행을 잠근 상태에서 하므로, 자리가 빈 채로 대기하는 학생이 생기지 않습니다.
+
+def _join_waitlist(cursor, student_name: str, course_id: int):
+    """정원이 찬 강좌의 대기자 명단에 올리고 대기 순번을 반환합니다. (이미 대기 중이면 기존 순번)"""
+    cursor.execute("SELECT 1 FROM enrollments WHERE student_name = %s AND course_id = %s", (student_name, course_id))
+    if cursor.fetchone():
+        return {"success": False, "message": "이미 수강 신청한 강좌입니다."}
+    cursor.execute(
+        "INSERT IGNORE INTO course_waitlist (course_id, student_name) SELECT %s, username FROM members WHERE username = %s",
+        (course_id, student_name)
+    )
+    cursor.execute("SELECT id FROM course_waitlist WHERE course_id = %s AND student_name = %s", (course_id, student_name))
+    row = cursor.fetchone()
+    if not row:
+        return {"success": False, "message": "등록되지 않은 학생입니다. (멤버 리스트에 있는 이름만 가능)"}
+    cursor.execute("SELECT COUNT(*) AS position FROM course_waitlist WHERE course_id = %s AND id <= %s",
+                   (course_id, row['id']))
+    position = cursor.fetchone()['position']
+    return {"success": False, "waitlisted": True, "position": position,
+            "message": f"수강 정원이 초과되어 대기자 명단에 등록되었습니다. (대기 {position}번)"}
+
+def _promote_waitlist(cursor, course_id: int):
+    """비어 있는 자리에 맨 앞 대기자를 등록합니다. 등록한 학생 이름(없으면 None)을 반환합니다."""
+    while True:
+        cursor.execute(
+            "SELECT id, student_name FROM course_waitlist WHERE course_id = %s ORDER BY id LIMIT 1 FOR UPDATE",
+            (course_id,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        waitlist_id, student_name = row
+        cursor.execute("DELETE FROM course_waitlist WHERE id = %s", (waitlist_id,))
+        try:
+            cursor.execute("INSERT INTO enrollments (student_name, course_id) VALUES (%s, %s)", (student_name, course_id))
+            return student_name
+        except mysql.connector.IntegrityError as err:
+            if error_code(err) != DUPLICATE_ENTRY:
+                raise
+            # 그 사이 직접 등록된 학생은 명단에서만 빼고 다음 대기자로
+
+def _fill_from_waitlist(cursor, course_id: int, capacity: int, enrolled_count: int):
+    """빈 자리만큼 대기자를 등록하고 enrolled_count를 맞춥니다. (courses 행을 잠근 상태에서 호출) 등록한 학생 목록 반환"""
+    promoted = []
+    while enrolled_count + len(promoted) < capacity:
+        student_name = _promote_waitlist(cursor, course_id)
+        if student_name is None:
+            break
+        promoted.append(student_name)
+    if promoted:
+        cursor.execute("UPDATE courses SET enrolled_count = enrolled_count + %s WHERE id = %s",
+                       (len(promoted), course_id))
+    return promoted
+
+@retry_transaction
+def register_student(student_name: str, course_id: int, waitlist: bool = False, conn=None):
+    """
+    학생을 강좌에 등록합니다. (정원 체크, 중복 체크 포함)
+    1) 정원이 남았을 때만 enrolled_count +1  2) members에 있는 학생만 INSERT ... SELECT
+    중복 신청은 unique_enrollment 키(1062)로 판단합니다.
+    waitlist=True면 정원이 찼을 때 대기자 명단에 올립니다.
+    """
+    conn = get_db_connection(conn)
     try:
-        cursor = conn.cursor(dictionary=True)
-        
-        # 1. 강좌 존재 여부 및 정원 확인
-        cursor.execute("SELECT * FROM courses WHERE id = %s", (course_id,))
-        course = cursor.fetchone()
-        if not course:
-            return {"success": False, "message": "강좌를 찾을 수 없습니다."}
-        
-        # 현재 수강 인원 확인
-        cursor.execute("SELECT COUNT(*) as count FROM enrollments WHERE course_id = %s", (course_id,))
-        current_count = cursor.fetchone()['count']
-        
-        if current_count >= course['capacity']:
-             return {"success": False, "message": "수강 정원이 초과되었습니다."}
-
-        # 1.5. 멤버 존재 여부 확인 (수강신청 실명 인증)
-        cursor.execute("SELECT * FROM members WHERE username = %s", (student_name,))
-        member = cursor.fetchone()
-        if not member:
-             return {"success": False, "message": "등록되지 않은 학생입니다. (멤버 리스트에 있는 이름만 가능)"}
-
-        # 2. 이미 등록했는지 확인
-        cursor.execute("SELECT * FROM enrollments WHERE student_name = %s AND course_id = %s", (student_name, course_id))
-        if cursor.fetchone():
-             return {"success": False, "message": "이미 수강 신청한 강좌입니다."}
-
-        # 3. 등록 처리
-        cursor.execute("INSERT INTO enrollments (student_name, course_id) VALUES (%s, %s)", (student_name, course_id))
+        conn.start_transaction()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+
+        # 1. 정원 확인 + 자리 확보 (한 문장)
+        cursor.execute(
+            "UPDATE courses SET enrolled_count = enrolled_count + 1 WHERE id = %s AND enrolled_count < capacity",
+            (course_id,)
+        )
+        if cursor.rowcount == 0:
+            if not waitlist:
+                conn.rollback()
+                return _registration_failure(cursor, course_id)
+            # 대기자 명단 등록은 강좌 행을 잠그고 다시 확인한 뒤 같은 트랜잭션에서 처리
+            # (그 사이 취소로 자리가 났으면 대기 없이 바로 등록)
+            cursor.execute("SELECT capacity, enrolled_count FROM courses WHERE id = %s FOR UPDATE", (course_id,))
+            course = cursor.fetchone()
+            if not course:
+                conn.rollback()
+                return {"success": False, "message": "강좌를 찾을 수 없습니다."}
+            if course['enrolled_count'] >= course['capacity']:
+                result = _join_waitlist(cursor, student_name, course_id)
+                conn.commit()
+                return result
+            cursor.execute("UPDATE courses SET enrolled_count = enrolled_count + 1 WHERE id = %s", (course_id,))
+
+        # 2. 등록 처리 (멤버 리스트에 있는 이름만 - 수강신청 실명 인증)
+        try:
+            cursor.execute(
+                "INSERT INTO enrollments (student_name, course_id) SELECT username, %s FROM members WHERE username = %s",
+                (course_id, student_name)
+            )
+        except mysql.connector.IntegrityError as err:
+            if error_code(err) != DUPLICATE_ENTRY:
+                raise
+            conn.rollback()
+            return {"success": False, "message": "이미 수강 신청한 강좌입니다."}
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return {"success": False, "message": "등록되지 않은 학생입니다. (멤버 리스트에 있는 이름만 가능)"}
+
         conn.commit()
-        
         cursor.close()
+        courses_cache.invalidate()
         return {"success": True, "message": "수강 신청이 완료되었습니다!"}
         
     except mysql.connector.Error as err:
+        conn.rollback()
+        if is_retryable(err): raise  # retry_transaction이 다시 실행
         return {"success": False, "message": f"DB 오류: {str(err)}"}
     finally:
         conn.close()
 
-def get_enrollments(course_id: int):
+@read_only
+def get_enrollments(course_id: int, conn=None):
     """특정 강좌의 수강생 목록을 반환합니다."""
-    conn = get_db_connection()
+    conn = get_db_connection(conn)
     try:
         cursor = conn.cursor(dictionary=True)
         sql = """
@@ -80,18 +175,126 @@ def get_enrollments(course_id: int):
         conn.close()
     return enrollments
 
-def delete_enrollment(enrollment_id: int):
-    """수강신청을 취소(삭제)합니다."""
-    conn = get_db_connection()
+@retry_transaction
+def delete_enrollment(enrollment_id: int, conn=None):
+    """수강신청을 취소(삭제)합니다. 대기자가 있으면 그 자리에 바로 등록하고, 없으면 enrolled_count를 감소합니다."""
+    conn = get_db_connection(conn)
     try:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM enrollments WHERE id = %s", (enrollment_id,))
-        if cursor.rowcount == 0:
+        conn.start_transaction()
+        cursor = conn.cursor(buffered=True)
+        cursor.execute("SELECT course_id FROM enrollments WHERE id = %s", (enrollment_id,))
+        row = cursor.fetchone()
+        if not row:
+            conn.rollback()
             return {"success": False, "message": "삭제할 내역이 없습니다."}
+        # 수강신청/대기 등록과 같은 순서(강좌 행 → 수강 내역)로 잠금
+        cursor.execute("SELECT id FROM courses WHERE id = %s FOR UPDATE", (row[0],))
+        cursor.execute("SELECT course_id FROM enrollments WHERE id = %s FOR UPDATE", (enrollment_id,))
+        if not cursor.fetchone():
+            conn.rollback()
+            return {"success": False, "message": "삭제할 내역이 없습니다."}
+        cursor.execute("DELETE FROM enrollments WHERE id = %s", (enrollment_id,))
+        promoted = _promote_waitlist(cursor, row[0])
+        if promoted is None:
+            cursor.execute("UPDATE courses SET enrolled_count = enrolled_count - 1 WHERE id = %s AND enrolled_count > 0",
+                           (row[0],))
         conn.commit()
         cursor.close()
     except mysql.connector.Error as err:
+        conn.rollback()
+        if is_retryable(err): raise
         return {"success": False, "message": f"삭제 실패: {str(err)}"}
     finally:
         conn.close()
+    courses_cache.invalidate()
+    if promoted:
+        return {"success": True, "message": f"수강신청이 취소되었습니다. (대기자 '{promoted}' 자동 등록)", "promoted": promoted}
     return {"success": True, "message": "수강신청이 취소되었습니다."}
+
+@retry_transaction
+def update_course_capacity(course_id: int, capacity: int, conn=None):
+    """강좌 정원을 바꿉니다. 늘어난 자리만큼 대기자를 순서대로 등록합니다."""
+    if capacity < 0:
+        return {"success": False, "message": "정원은 0 이상이어야 합니다."}
+    conn = get_db_connection(conn)
+    try:
+        conn.start_transaction()
+        cursor = conn.cursor(buffered=True)
+        cursor.execute("SELECT enrolled_count FROM courses WHERE id = %s FOR UPDATE", (course_id,))
+        row = cursor.fetchone()
+        if not row:
+            conn.rollback()
+            return {"success": False, "message": "강좌를 찾을 수 없습니다."}
+        cursor.execute("UPDATE courses SET capacity = %s WHERE id = %s", (capacity, course_id))
+        promoted = _fill_from_waitlist(cursor, course_id, capacity, row[0])
+        conn.commit()
+        cursor.close()
+    except mysql.connector.Error as err:
+        conn.rollback()
+        if is_retryable(err): raise
+        return {"success": False, "message": f"정원 변경 실패: {str(err)}"}
+    finally:
+        conn.close()
+    courses_cache.invalidate()
+    # 정원을 현재 인원보다 줄여도 기존 수강생은 유지 (새 신청만 막힘)
+    return {"success": True, "message": f"정원이 {capacity}명으로 변경되었습니다.", "promoted": promoted}
+
+# [NEW] enrolled_count 보정 (reconciliation)
+# 직접 SQL 수정 등으로 enrollments와 enrolled_count가 어긋난 강좌를 찾아 실제 인원으로 맞춥니다.
+
+@retry_transaction
+def _reconcile_course(course_id: int):
+    """강좌 하나의 인원을 잠금 상태에서 다시 세어 맞춥니다. (보정 전, 보정 후) 반환"""
+    conn = get_db_connection()
+    try:
+        conn.start_transaction()
+        cursor = conn.cursor(buffered=True)
+        # 강좌 행을 먼저 잠가 수강신청/취소와 순서를 맞춘 뒤, 커밋 전인 변경까지 기다리는 잠금 읽기로 계산
+        cursor.execute("SELECT enrolled_count, capacity FROM courses WHERE id = %s FOR UPDATE", (course_id,))
+        row = cursor.fetchone()
+        if not row:
+            conn.rollback()
+            return None
+        # FOR SHARE는 MySQL 8 전용 - MariaDB와 MySQL 5.7도 받는 LOCK IN SHARE MODE 사용
+        cursor.execute("SELECT COUNT(*) FROM enrollments WHERE course_id = %s LOCK IN SHARE MODE", (course_id,))
+        actual = cursor.fetchone()[0]
+        if actual != row[0]:
+            cursor.execute("UPDATE courses SET enrolled_count = %s WHERE id = %s", (actual, course_id))
+            # 보정으로 자리가 생겼으면 대기자 등록
+            _fill_from_waitlist(cursor, course_id, row[1], actual)
+        conn.commit()
+        cursor.close()
+        return row[0], actual
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def reconcile_enrolled_counts():
+    """어긋난 강좌의 enrolled_count를 보정하고 보정 내역을 반환합니다."""
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        # 1. 잠금 없이 후보만 찾음
+        cursor.execute("""
+            SELECT c.id
+            FROM courses c
+            LEFT JOIN (SELECT course_id, COUNT(*) AS cnt FROM enrollments GROUP BY course_id) e
+                ON e.course_id = c.id
+            WHERE c.enrolled_count <> COALESCE(e.cnt, 0)
+        """)
+        candidates = [row['id'] for row in cursor.fetchall()]
+        cursor.close()
+    finally:
+        conn.close()
+
+    # 2. 후보 강좌만 하나씩 잠가서 확인 후 보정 (그 사이 정상화된 강좌는 건너뜀)
+    fixed = []
+    for course_id in candidates:
+        result = _reconcile_course(course_id)
+        if result and result[0] != result[1]:
+            fixed.append({"course_id": course_id, "enrolled_count": result[0], "actual": result[1]})
+    if fixed:
+        courses_cache.invalidate()
+    return {"checked": len(candidates), "fixed": fixed}
@@ -0,0 +1,122 @@
+import random
+import threading
+
+# [NEW] 가챠 샘플러
+# 카탈로그가 바뀔 때만 alias table을 만들어 두고, 뽑기는 O(1)로 처리합니다.
+# (매 요청마다 items 테이블을 읽거나 가중치 목록을 다시 만들지 않음)
+
+_rng = random.Random()
+
+
+class AliasTable:
+    """Vose의 alias method: 생성 O(n), 한 번 뽑기 O(1)"""
+
+    def __init__(self, items, weights):
+        if not items:
+            raise ValueError("뽑을 수 있는 아이템이 없습니다.")
+        n = len(items)
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("가중치 합이 0입니다.")
+        scaled = [w * n / total for w in weights]
+        self.items = list(items)
+        self._prob = [1.0] * n
+        self._alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # 남은 항목은 부동소수 오차를 감안해 확률 1로 처리
+        for i in small + large:
+            self._prob[i] = 1.0
+
+    def sample(self, rng=_rng):
+        i = rng.randrange(len(self.items))
+        return self.items[i] if rng.random() < self._prob[i] else self.items[self._alias[i]]
+
+    def sample_many(self, k: int, rng=_rng):
+        n = len(self.items)
+        items, prob, alias = self.items, self._prob, self._alias
+        randrange, random_ = rng.randrange, rng.random
+        out = []
+        for _ in range(k):
+            i = randrange(n)
+            out.append(items[i] if random_() < prob[i] else items[alias[i]])
+        return out
+
+
+class GachaPools:
+    """카탈로그 한 버전에서 만든 뽑기 풀 묶음"""
+
+    def __init__(self, items):
+        self.items_by_id = {i['id']: i for i in items}
+        weighted = [i for i in items if (i.get('gacha_weight') or 0) > 0]
+        legendaries = [i for i in items if i.get('rarity') == 'LEGENDARY']
+        others = [i for i in items if i.get('rarity') != 'LEGENDARY']
+
+        self.weighted = AliasTable(weighted, [i['gacha_weight'] for i in weighted]) if weighted else None
+        # 전설/일반 아이템이 없으면 기존 동작처럼 전체 아이템에서 뽑음
+        legend_source = legendaries or items
+        other_source = others or items
+        self.legendary = AliasTable(legend_source, [1] * len(legend_source)) if legend_source else None
+        self.others = AliasTable(other_source, [1] * len(other_source)) if other_source else None
+        # 각 풀은 전부 전설이거나 전부 비전설 (천장 카운트 계산에 사용)
+        self.legendary_is_legendary = bool(legendaries)
+        self.others_is_legendary = not others and bool(items)
+
+    def pick_weighted(self, k: int = 1):
+        if self.weighted is None:
+            raise ValueError("프리미엄 가챠 대상 아이템이 없습니다.")
+        return self.weighted.sample_many(k)
+
+    def plan_dynamic(self, fail_count: int, count: int, pity_limit: int, legendary_chance: float, rng=_rng):
+        """
+        천장(Pity) 규칙에 따라 각 뽑기가 어느 풀에서 나올지만 먼저 정합니다.
+        반환: (전설 풀 여부 리스트, 최종 fail count)
+        """
+        if self.legendary is None or self.others is None:
+            raise ValueError("뽑을 수 있는 아이템이 없습니다.")
+        plan = []
+        random_ = rng.random
+        for _ in range(count):
+            from_legendary = fail_count >= (pity_limit - 1) or random_() < legendary_chance
+            plan.append(from_legendary)
+            is_legendary = self.legendary_is_legendary if from_legendary else self.others_is_legendary
+            fail_count = 0 if is_legendary else fail_count + 1
+        return plan, fail_count
+
+    def fill_plan(self, plan):
+        """plan_dynamic()의 결과대로 풀별로 한꺼번에 뽑아 순서대로 합칩니다."""
+        n_legendary = sum(plan)
+        legend_iter = iter(self.legendary.sample_many(n_legendary))
+        other_iter = iter(self.others.sample_many(len(plan) - n_legendary))
+        return [next(legend_iter) if flag else next(other_iter) for flag in plan]
+
+
+class GachaSampler:
+    """카탈로그 목록이 바뀔 때만 GachaPools를 다시 만듭니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = (None, None)  # (카탈로그 목록, 그 목록으로 만든 풀)
+        self.rebuilds = 0
+
+    def pools_for(self, items) -> GachaPools:
+        source, pools = self._current
+        if source is items:
+            return pools
+        with self._lock:
+            source, pools = self._current
+            if source is not items:
+                pools = GachaPools(items)
+                self._current = (items, pools)
+                self.rebuilds += 1
+            return pools
+
+    def stats(self) -> dict:
+        return {"rebuilds": self.rebuilds}
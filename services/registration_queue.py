@@ -0,0 +1,151 @@
+import os
+import time
+import uuid
+import threading
+from collections import deque, OrderedDict
+from core.cache import TTLCache
+from core.metrics import LatencyStats
+from database import pin_reads
+from services.course_service import register_student
+
+# [NEW] 수강신청 대기열 (admission queue)
+# 인기 강좌가 열리면 요청을 바로 DB로 보내지 않고 강좌별 FIFO에 넣은 뒤,
+# 정해진 수의 워커만 DB에 접근해 순서대로 처리합니다. 요청한 쪽은 티켓을 받아 결과를 조회합니다.
+# 강좌마다 한 번에 한 건만 처리하므로 같은 강좌 행을 두고 연결이 서로 기다리지 않습니다.
+# (프로세스 내부 대기열 - 워커가 여러 개면 각자 대기열을 가지며, 정원은 DB의 조건부 UPDATE가 보장)
+REGISTRATION_QUEUE_WORKERS = int(os.getenv("REGISTRATION_QUEUE_WORKERS", 4))
+REGISTRATION_QUEUE_MAX = int(os.getenv("REGISTRATION_QUEUE_MAX", 5000))         # 전체 대기 가능 건수
+REGISTRATION_TICKET_TTL = float(os.getenv("REGISTRATION_TICKET_TTL", 600))      # 처리 결과 보관 시간(초)
+
+
+class RegistrationQueueFullError(Exception):
+    """대기열이 가득 차서 신청을 받을 수 없을 때 발생합니다."""
+
+
+class RegistrationQueue:
+    """강좌별 FIFO + 제한된 수의 워커 스레드로 수강신청을 처리합니다."""
+
+    def __init__(self, workers: int = REGISTRATION_QUEUE_WORKERS, max_pending: int = REGISTRATION_QUEUE_MAX,
+                 ticket_ttl: float = REGISTRATION_TICKET_TTL):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._cond = threading.Condition()
+        self._queues = OrderedDict()   # course_id -> deque[ticket] (대기 중인 강좌만)
+        self._busy = set()             # 지금 처리 중인 강좌 (강좌당 한 건씩)
+        self._by_student = {}          # (student_name, course_id) -> 대기 중인 ticket
+        self._pending = 0
+        self._threads = []
+        self._stopped = False
+        self._tickets = TTLCache(maxsize=max(max_pending * 4, 1024), ttl=ticket_ttl)
+        self.processed = 0
+        self.rejected = 0
+        self.queue_wait = LatencyStats()
+
+    def submit(self, student_name: str, course_id: int) -> dict:
+        """신청을 대기열에 넣고 티켓(ticket_id, 대기 순번)을 반환합니다. 같은 신청이 대기 중이면 그 티켓을 반환합니다."""
+        with self._cond:
+            ticket = self._by_student.get((student_name, course_id))
+            if ticket is None:
+                if self._pending >= self.max_pending:
+                    self.rejected += 1
+                    raise RegistrationQueueFullError("수강신청 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.")
+                ticket = {
+                    "ticket_id": uuid.uuid4().hex,
+                    "student_name": student_name,
+                    "course_id": course_id,
+                    "status": "queued",
+                    "result": None,
+                    "queued_at": time.time(),
+                }
+                self._queues.setdefault(course_id, deque()).append(ticket)
+                self._by_student[(student_name, course_id)] = ticket
+                self._tickets.set(ticket["ticket_id"], ticket)
+                self._pending += 1
+                self._ensure_workers()
+                self._cond.notify()
+            return self._view(ticket)
+
+    def status(self, ticket_id: str, student_name: str = None):
+        """티켓 상태를 반환합니다. (없거나 만료되었거나 다른 사람의 티켓이면 None)"""
+        ticket = self._tickets.get(ticket_id)
+        if ticket is None or (student_name is not None and ticket["student_name"] != student_name):
+            return None
+        with self._cond:
+            return self._view(ticket)
+
+    def _view(self, ticket) -> dict:
+        view = {"ticket_id": ticket["ticket_id"], "course_id": ticket["course_id"], "status": ticket["status"]}
+        if ticket["status"] == "queued":
+            queue = self._queues.get(ticket["course_id"], ())
+            view["position"] = next((i + 1 for i, t in enumerate(queue) if t is ticket), None)
+        elif ticket["status"] == "done":
+            view["result"] = ticket["result"]
+        return view
+
+    def _ensure_workers(self):
+        # 첫 신청 때 워커 시작 (lock 안에서 호출)
+        if self._threads or self._stopped:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"registration-queue-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_ticket(self):
+        # 처리 중이 아닌 강좌 중 가장 오래 기다린 강좌의 맨 앞 신청 (강좌 간 라운드 로빈)
+        for course_id in self._queues:
+            if course_id not in self._busy:
+                queue = self._queues.pop(course_id)
+                ticket = queue.popleft()
+                if queue:
+                    self._queues[course_id] = queue  # 맨 뒤로 보내 다른 강좌에도 차례를 줌
+                self._busy.add(course_id)
+                ticket["status"] = "processing"
+                return ticket
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                ticket = self._next_ticket()
+                while ticket is None:
+                    if self._stopped:
+                        return
+                    self._cond.wait()
+                    ticket = self._next_ticket()
+            self.queue_wait.observe(time.time() - ticket["queued_at"])
+            try:
+                result = register_student(ticket["student_name"], ticket["course_id"], waitlist=True)
+                # 요청 연결 밖의 쓰기 → 이 학생의 다음 조회가 replica 지연으로 결과를 놓치지 않도록 고정
+                pin_reads(ticket["student_name"])
+            except Exception as e:
+                result = {"success": False, "message": f"수강신청 처리 실패: {str(e)}"}
+            with self._cond:
+                ticket["result"] = result
+                ticket["status"] = "done"
+                self._busy.discard(ticket["course_id"])
+                self._by_student.pop((ticket["student_name"], ticket["course_id"]), None)
+                self._pending -= 1
+                self.processed += 1
+                self._cond.notify_all()
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "courses_waiting": len(self._queues),
+                "processing": len(self._busy),
+                "processed": self.processed,
+                "rejected": self.rejected,
+                "queue_wait": self.queue_wait.snapshot(),
+            }
+
+
+registration_queue = RegistrationQueue()
@@ -1,40 +1,129 @@
-from database import get_db_connection
+import os
 import time
-import random
-
-# 간단한 인메모리 캐시
-ITEMS_CACHE = None
-LAST_CACHE_TIME = 0
-CACHE_DURATION = 60 # 60초
-
-def get_items():
-    """상점의 모든 아이템 목록을 반환합니다. (캐싱 적용)"""
-    global ITEMS_CACHE, LAST_CACHE_TIME
-    
-    current_time = time.time()
-    
-    # 캐시가 있고, 유효 기간 내라면 캐시 반환
-    if ITEMS_CACHE and (current_time - LAST_CACHE_TIME < CACHE_DURATION):
-        return ITEMS_CACHE
-
+import json
+import base64
+from datetime import datetime
+from collections import Counter
+from database import get_db_connection, read_only
+from async_database import get_async_connection, async_transaction, dict_cursor, sync_fallback
+from fastapi.concurrency import run_in_threadpool
+from core.cache import SingleFlightCache
+from core.cache_backend import cache_backend
+from services.gacha_sampler import GachaSampler
+from core.transactions import retry_transaction, is_retryable
+
+# 가챠 설정
+GACHA_FIXED_COST = 1000
+GACHA_DYNAMIC_COST = 100
+PITY_LIMIT = 50
+LEGENDARY_CHANCE = 0.01  # 럭키 박스 일반 뽑기의 전설 확률 (1%)
+
+# [NEW] 대량 뽑기 설정
+GACHA_MAX_PULLS = int(os.getenv("GACHA_MAX_PULLS", 100000))            # 한 번에 요청할 수 있는 최대 횟수 (bulk)
+# 결과 목록 모드는 members 행을 잠근 채 시뮬레이션하고 뽑기마다 아이템 정보를 돌려주므로 훨씬 적게 제한
+GACHA_LIST_MAX_PULLS = int(os.getenv("GACHA_LIST_MAX_PULLS", 100))
+GACHA_CHUNK_SIZE = int(os.getenv("GACHA_CHUNK_SIZE", 1000))            # 시뮬레이션 단위
+GACHA_BULK_ATTEMPTS = 3  # 시뮬레이션 중 천장 카운트/골드가 바뀌어 다시 뽑는 최대 횟수
+
+# [NEW] 인벤토리는 (소유자, 아이템)마다 한 행에 수량(quantity)을 쌓는 구조입니다.
+GRANT_ITEMS_SQL = """
+    INSERT INTO inventory (student_name, item_id, quantity) VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)
+"""
+INVENTORY_WRITE_BATCH = 500
+
+def _grant_items(cursor, student_name: str, item_counts):
+    """{item_id: 개수}만큼 인벤토리 수량을 늘립니다. (아이템 종류 수만큼의 행만 기록)"""
+    rows = [(student_name, item_id, n) for item_id, n in item_counts.items()]
+    for i in range(0, len(rows), INVENTORY_WRITE_BATCH):
+        cursor.executemany(GRANT_ITEMS_SQL, rows[i:i + INVENTORY_WRITE_BATCH])
+
+# [NEW] 카탈로그가 바뀔 때만 alias table을 다시 만드는 가챠 샘플러
+gacha_sampler = GachaSampler()
+
+# [NEW] 아이템 카탈로그 캐시 (single-flight + stale-while-revalidate)
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", 60))          # 이 시간 동안은 그대로 사용
+CATALOG_CACHE_STALE_TTL = float(os.getenv("CATALOG_CACHE_STALE_TTL", 300))  # 이 시간까지는 옛 값을 주면서 백그라운드 갱신
+
+def _load_items():
     conn = get_db_connection()
     try:
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT * FROM items ORDER BY price ASC")
         items = cursor.fetchall()
         cursor.close()
-        
-        # 캐시 업데이트
-        ITEMS_CACHE = items
-        LAST_CACHE_TIME = current_time
-        
     finally:
         conn.close()
     return items
 
-def get_user_gold(student_name: str):
+items_cache = SingleFlightCache(_load_items, ttl=CATALOG_CACHE_TTL, stale_ttl=CATALOG_CACHE_STALE_TTL,
+                                name="catalog", backend=cache_backend)
+
+def get_items():
+    """상점의 모든 아이템 목록을 반환합니다. (캐싱 적용)"""
+    return items_cache.get()
+
+def invalidate_items():
+    """아이템이 추가/수정/삭제되었을 때 호출하면 다음 요청부터 새 카탈로그를 사용합니다."""
+    items_cache.invalidate()
+
+# [NEW] 카탈로그 목록이 바뀔 때만 다시 만드는 id -> 아이템 색인
+_catalog_index = (None, {})
+
+def _index_items(items):
+    global _catalog_index
+    source, index = _catalog_index
+    if source is not items:
+        index = {item['id']: item for item in items}
+        _catalog_index = (items, index)
+    return index
+
+def get_item(item_id: int):
+    """카탈로그 캐시에서 아이템 하나를 찾습니다. (없으면 None)"""
+    return _index_items(get_items()).get(item_id)
+
+# [NEW] 잔액이 충분할 때만 차감하는 조건부 UPDATE.
+# LAST_INSERT_ID(expr)로 차감 후 잔액을 같은 왕복에서 돌려받습니다. (cursor.lastrowid)
+CHARGE_GOLD_SQL = """
+    UPDATE members SET gold = LAST_INSERT_ID(gold - %s)
+    WHERE username = %s AND gold >= %s
+"""
+
+# 0G 차감은 값이 바뀌지 않아 rowcount가 0으로 보고되므로(CLIENT_FOUND_ROWS 미사용) 잔액 행만 잠가서 읽음
+LOCK_GOLD_SQL = "SELECT gold FROM members WHERE username = %s FOR UPDATE"
+
+def _charge_gold(cursor, student_name: str, amount: int):
+    """골드를 차감하고 남은 골드를 반환합니다. 사용자가 없거나 잔액이 부족하면 None"""
+    if amount <= 0:
+        cursor.execute(LOCK_GOLD_SQL, (student_name,))
+        row = cursor.fetchone()
+        return None if row is None else (row["gold"] or 0)
+    cursor.execute(CHARGE_GOLD_SQL, (amount, student_name, amount))
+    if cursor.rowcount == 0:
+        return None
+    return cursor.lastrowid or 0
+
+async def _charge_gold_async(cursor, student_name: str, amount: int):
+    """_charge_gold()의 비동기 버전 (dict_cursor)"""
+    if amount <= 0:
+        await cursor.execute(LOCK_GOLD_SQL, (student_name,))
+        row = await cursor.fetchone()
+        return None if row is None else (row["gold"] or 0)
+    await cursor.execute(CHARGE_GOLD_SQL, (amount, student_name, amount))
+    if cursor.rowcount == 0:
+        return None
+    return cursor.lastrowid or 0
+
+def _charge_failure(cursor, student_name: str, message: str):
+    """_charge_gold() 실패 시에만 원인(사용자 없음 / 잔액 부족)을 확인합니다."""
+    cursor.execute("SELECT 1 FROM members WHERE username = %s", (student_name,))
+    if not cursor.fetchone():
+        return {"success": False, "message": "사용자를 찾을 수 없습니다. (DB에 등록된 이름을 입력하세요)"}
+    return {"success": False, "message": message}
+
+def get_user_gold(student_name: str, conn=None):
     """사용자의 현재 골드를 반환합니다. (이름으로 조회)"""
-    conn = get_db_connection()
+    conn = get_db_connection(conn)
     try:
         cursor = conn.cursor(dictionary=True)
         # username으로 조회
@@ -47,73 +136,213 @@ def get_user_gold(student_name: str):
     finally:
         conn.close()
 
-def get_inventory(student_name: str):
-    """사용자가 보유한 아이템 목록을 반환합니다."""
-    conn = get_db_connection()
+@read_only
+def get_inventory(student_name: str, limit: int = None, offset: int = 0, conn=None):
+    """사용자가 보유한 아이템 목록을 반환합니다. (아이템별 1행 + quantity, limit 지정 시 페이지 단위)"""
+    conn = get_db_connection(conn)
     try:
         cursor = conn.cursor(dictionary=True)
         # JOIN을 사용하여 아이템 정보까지 함께 가져옴
         sql = """
-            SELECT inv.id, inv.acquired_at, i.name, i.description, i.image_url, i.price
+            SELECT inv.id, inv.acquired_at, inv.quantity, i.name, i.description, i.image_url, i.price
             FROM inventory inv
             JOIN items i ON inv.item_id = i.id
             WHERE inv.student_name = %s
-            ORDER BY inv.acquired_at DESC
+            ORDER BY inv.acquired_at DESC, inv.id DESC
         """
-        cursor.execute(sql, (student_name,))
+        params = (student_name,)
+        if limit is not None:
+            sql += " LIMIT %s OFFSET %s"
+            params += (limit, offset)
+        cursor.execute(sql, params)
         inventory = cursor.fetchall()
         cursor.close()
     finally:
         conn.close()
     return inventory
 
-def buy_item(student_name: str, item_id: int):
-    """아이템 구매 (트랜잭션 처리)"""
-    conn = get_db_connection()
+# [NEW] 인벤토리 커서 페이지 조회
+INVENTORY_PAGE_SIZE = int(os.getenv("INVENTORY_PAGE_SIZE", 50))
+INVENTORY_MAX_PAGE_SIZE = 200
+_ITEM_FIELDS = ("name", "description", "image_url", "price", "rarity")
+
+def _encode_inventory_cursor(row) -> str:
+    raw = json.dumps([row['acquired_at'].isoformat(), row['id']]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def _decode_inventory_cursor(cursor: str):
+    """커서 문자열을 (acquired_at, id)로 복원합니다. 형식이 틀리면 ValueError"""
     try:
-        conn.start_transaction() # 트랜잭션 시작
-        cursor = conn.cursor(dictionary=True, buffered=True)
+        acquired_at, inventory_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(acquired_at), int(inventory_id)
+    except Exception:
+        raise ValueError("잘못된 커서입니다.")
+
+def _attach_item_metadata(cursor, rows):
+    """아이템 정보는 카탈로그 캐시에서 붙입니다. (캐시에 아직 없는 아이템만 DB에서 조회)"""
+    index = _index_items(get_items())
+    missing = {row['item_id'] for row in rows if row['item_id'] not in index}
+    if missing:
+        cursor.execute(f"SELECT * FROM items WHERE id IN ({', '.join(['%s'] * len(missing))})", tuple(missing))
+        index = {**index, **{item['id']: item for item in cursor.fetchall()}}
+    for row in rows:
+        item = index.get(row['item_id'], {})
+        for field in _ITEM_FIELDS:
+            row[field] = item.get(field)
+    return rows
+
+@read_only
+def get_inventory_page(student_name: str, cursor: str = None, limit: int = INVENTORY_PAGE_SIZE, conn=None):
+    """
+    인벤토리를 (acquired_at, id) 내림차순으로 limit개씩 조회합니다.
+    다음 페이지는 응답의 next_cursor를 그대로 넘기면 됩니다. (마지막 페이지면 None)
+    """
+    limit = max(1, min(limit, INVENTORY_MAX_PAGE_SIZE))
+    sql = "SELECT id, item_id, quantity, acquired_at FROM inventory WHERE student_name = %s"
+    params = [student_name]
+    if cursor:
+        acquired_at, inventory_id = _decode_inventory_cursor(cursor)
+        sql += " AND (acquired_at < %s OR (acquired_at = %s AND id < %s))"
+        params += [acquired_at, acquired_at, inventory_id]
+    sql += " ORDER BY acquired_at DESC, id DESC LIMIT %s"
+    params.append(limit + 1)  # 한 개 더 읽어서 다음 페이지 존재 여부 확인
+
+    conn = get_db_connection(conn)
+    try:
+        db_cursor = conn.cursor(dictionary=True)
+        db_cursor.execute(sql, params)
+        rows = db_cursor.fetchall()
+        has_more = len(rows) > limit
+        rows = _attach_item_metadata(db_cursor, rows[:limit])
+        db_cursor.close()
+    finally:
+        conn.close()
 
-        # 1. 사용자 골드 확인 (username으로)
-        cursor.execute("SELECT gold, username FROM members WHERE username = %s FOR UPDATE", (student_name,))
-        user = cursor.fetchone()
-        if not user:
-            return {"success": False, "message": "사용자를 찾을 수 없습니다. (DB에 등록된 이름을 입력하세요)"}
-        
-        # 2. 아이템 가격 확인
-        cursor.execute("SELECT price, name FROM items WHERE id = %s", (item_id,))
-        item = cursor.fetchone()
-        if not item:
-             raise Exception("아이템이 존재하지 않습니다.")
+    return {
+        "items": rows,
+        "next_cursor": _encode_inventory_cursor(rows[-1]) if has_more else None,
+    }
 
-        # 3. 구매 가능 여부 체크
-        if user['gold'] < item['price']:
-            return {"success": False, "message": "골드가 부족합니다!"}
+@retry_transaction
+def buy_item(student_name: str, item_id: int, conn=None):
+    """아이템 구매 (트랜잭션 처리) - 조건부 UPDATE 한 번 + 인벤토리 기록"""
+    # 1. 아이템 가격 확인 (카탈로그 캐시, DB 조회 없음)
+    item = get_item(item_id)
+    if not item:
+        return {"success": False, "message": "아이템이 존재하지 않습니다."}
 
-        # 4. 골드 차감
-        new_gold = user['gold'] - item['price']
-        cursor.execute("UPDATE members SET gold = %s WHERE username = %s", (new_gold, user['username']))
+    conn = get_db_connection(conn)
+    try:
+        conn.start_transaction() # 트랜잭션 시작
+        cursor = conn.cursor(dictionary=True, buffered=True)
 
-        # 5. 인벤토리 추가
-        cursor.execute("INSERT INTO inventory (student_name, item_id) VALUES (%s, %s)", (student_name, item_id))
+        # 2. 골드 차감 (잔액이 충분할 때만 - 확인과 차감을 한 문장으로)
+        new_gold = _charge_gold(cursor, student_name, item['price'])
+        if new_gold is None:
+            conn.rollback()
+            return _charge_failure(cursor, student_name, "골드가 부족합니다!")
+
+        # 3. 인벤토리 추가 (이미 있으면 수량 +1)
+        _grant_items(cursor, student_name, {item_id: 1})
 
         conn.commit() # 모두 성공하면 커밋
         cursor.close()
         return {"success": True, "message": f"'{item['name']}' 구매 성공! 남은 골드: {new_gold}G"}
 
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
-def sell_item(student_name: str, inventory_id: int):
+# [NEW] 장바구니 결제 설정
+CART_MAX_LINES = int(os.getenv("CART_MAX_LINES", 50))            # 한 번에 결제할 수 있는 최대 줄 수
+CART_MAX_QUANTITY = int(os.getenv("CART_MAX_QUANTITY", 999))     # 한 줄의 최대 수량
+
+def _price_cart(lines, index):
+    """
+    장바구니 줄마다 카탈로그 가격을 매깁니다.
+    반환: (줄별 결과 목록, {item_id: 수량}, 총액) - 결제할 수 없는 줄은 결과에 사유만 남기고 제외
+    """
+    results = []
+    item_counts = Counter()
+    total_price = 0
+    for item_id, quantity in lines:
+        item = index.get(item_id)
+        line = {"item_id": item_id, "quantity": quantity}
+        if not item:
+            line.update(success=False, message="아이템이 존재하지 않습니다.")
+        elif not 1 <= quantity <= CART_MAX_QUANTITY:
+            line.update(success=False, message=f"수량은 1~{CART_MAX_QUANTITY}개여야 합니다.")
+        else:
+            subtotal = item['price'] * quantity
+            line.update(success=True, name=item['name'], unit_price=item['price'], subtotal=subtotal)
+            item_counts[item_id] += quantity
+            total_price += subtotal
+        results.append(line)
+    return results, item_counts, total_price
+
+def _cart_result(results, total_price: int, new_gold: int):
+    bought = sum(line['quantity'] for line in results if line['success'])
+    skipped = sum(1 for line in results if not line['success'])
+    msg = f"총 {bought}개 아이템 구매 성공! (-{total_price:,}G) 남은 골드: {new_gold:,}G"
+    if skipped:
+        msg += f" - {skipped}줄은 구매하지 못했습니다."
+    return {"success": True, "message": msg, "total_price": total_price, "gold": new_gold, "lines": results}
+
+@retry_transaction
+def checkout_cart(student_name: str, lines, conn=None):
+    """
+    장바구니 결제 - lines: [(item_id, quantity), ...]
+    카탈로그 캐시로 가격을 매기고, 골드 차감(조건부 UPDATE 1회)과 인벤토리 기록을 한 트랜잭션에서 처리합니다.
+    없는 아이템 등 결제할 수 없는 줄은 건너뛰고 줄별 결과에 사유를 남깁니다.
+    """
+    if not lines:
+        return {"success": False, "message": "장바구니가 비어 있습니다."}
+    if len(lines) > CART_MAX_LINES:
+        return {"success": False, "message": f"한 번에 최대 {CART_MAX_LINES}줄까지 결제할 수 있습니다."}
+
+    results, item_counts, total_price = _price_cart(lines, _index_items(get_items()))
+    if not item_counts:
+        return {"success": False, "message": "구매할 수 있는 아이템이 없습니다.", "lines": results}
+
+    conn = get_db_connection(conn)
+    try:
+        conn.start_transaction()
+        cursor = conn.cursor(dictionary=True, buffered=True)
+
+        # 1. 총액만큼 골드 차감 (한 번)
+        new_gold = _charge_gold(cursor, student_name, total_price)
+        if new_gold is None:
+            conn.rollback()
+            failure = _charge_failure(cursor, student_name, f"골드가 부족합니다! ({total_price:,}G 필요)")
+            failure["lines"] = results
+            return failure
+
+        # 2. 인벤토리 일괄 기록 (같은 아이템 줄은 합쳐서)
+        _grant_items(cursor, student_name, item_counts)
+
+        conn.commit()
+        cursor.close()
+        return _cart_result(results, total_price, new_gold)
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+@retry_transaction
+def sell_item(student_name: str, inventory_id: int, conn=None):
     """아이템 판매 (트랜잭션 처리) - 판매가는 구매가의 50%"""
-    conn = get_db_connection()
+    conn = get_db_connection(conn)
     try:
         conn.start_transaction()
         cursor = conn.cursor(dictionary=True, buffered=True)
 
         # 1. 인벤토리 및 아이템 정보 확인
         sql = """
-            SELECT inv.id, i.price, i.name 
+            SELECT inv.id, inv.quantity, i.price, i.name 
             FROM inventory inv
             JOIN items i ON inv.item_id = i.id
             WHERE inv.id = %s AND inv.student_name = %s FOR UPDATE
@@ -126,8 +355,11 @@ def sell_item(student_name: str, inventory_id: int):
 
         sell_price = int(item['price'] * 0.5)
 
-        # 2. 아이템 삭제
-        cursor.execute("DELETE FROM inventory WHERE id = %s", (inventory_id,))
+        # 2. 수량 1개 차감 (마지막 1개면 행 삭제)
+        if item['quantity'] > 1:
+            cursor.execute("UPDATE inventory SET quantity = quantity - 1 WHERE id = %s", (inventory_id,))
+        else:
+            cursor.execute("DELETE FROM inventory WHERE id = %s", (inventory_id,))
 
         # 3. 골드 지급
         cursor.execute("UPDATE members SET gold = gold + %s WHERE username = %s", (sell_price, student_name))
@@ -137,35 +369,65 @@ def sell_item(student_name: str, inventory_id: int):
 
     except Exception as e:
         conn.rollback()
+        if is_retryable(e): raise  # retry_transaction이 다시 실행
         return {"success": False, "message": f"판매 실패: {str(e)}"}
     finally:
         conn.close()
 
-def sell_all_items(student_name: str):
-    """인벤토리 전체 판매 (트랜잭션 처리)"""
-    conn = get_db_connection()
+def _sell_filter(student_name: str, rarities=None, item_ids=None, acquired_before=None):
+    """일괄 판매 대상 조건(WHERE 절, 파라미터)을 만듭니다."""
+    where = ["inv.student_name = %s"]
+    params = [student_name]
+    if rarities:
+        where.append(f"i.rarity IN ({', '.join(['%s'] * len(rarities))})")
+        params.extend(rarities)
+    if item_ids:
+        where.append(f"inv.item_id IN ({', '.join(['%s'] * len(item_ids))})")
+        params.extend(item_ids)
+    if acquired_before is not None:
+        where.append("inv.acquired_at < %s")
+        params.append(acquired_before)
+    return " AND ".join(where), params
+
+@retry_transaction
+def sell_all_items(student_name: str, rarities=None, item_ids=None, acquired_before=None, conn=None):
+    """
+    인벤토리 일괄 판매 (트랜잭션 처리) - 판매가는 구매가의 50%
+    판매액 합계와 삭제를 SQL 집합 연산으로 처리하므로 보유 수량이 늘어도 왕복 횟수는 같습니다.
+    rarities / item_ids / acquired_before(처음 획득 시각 기준)로 대상을 좁힐 수 있습니다.
+    """
+    where, params = _sell_filter(student_name, rarities, item_ids, acquired_before)
+    conn = get_db_connection(conn)
     try:
         conn.start_transaction()
         cursor = conn.cursor(dictionary=True, buffered=True)
 
-        # 1. 판매 가능한 전체 아이템 조회
-        sql = """
-            SELECT inv.id, i.price, i.name 
+        # 1. 아이템별 판매 수량/금액 집계 (대상 행은 잠금)
+        cursor.execute(f"""
+            SELECT inv.item_id, i.name, i.rarity,
+                   SUM(inv.quantity) AS count,
+                   SUM(FLOOR(i.price * 0.5) * inv.quantity) AS payout
             FROM inventory inv
             JOIN items i ON inv.item_id = i.id
-            WHERE inv.student_name = %s FOR UPDATE
-        """
-        cursor.execute(sql, (student_name,))
-        items = cursor.fetchall()
-        
-        if not items:
+            WHERE {where}
+            GROUP BY inv.item_id, i.name, i.rarity
+            FOR UPDATE
+        """, params)
+        summary = [
+            {"item_id": row['item_id'], "name": row['name'], "rarity": row['rarity'],
+             "count": int(row['count']), "payout": int(row['payout'])}
+            for row in cursor.fetchall()
+        ]
+
+        if not summary:
+            conn.rollback()
             return {"success": False, "message": "판매할 아이템이 없습니다."}
 
-        total_sell_price = sum(int(item['price'] * 0.5) for item in items)
-        count = len(items)
+        total_sell_price = sum(row['payout'] for row in summary)
+        count = sum(row['count'] for row in summary)
 
-        # 2. 전체 삭제
-        cursor.execute("DELETE FROM inventory WHERE student_name = %s", (student_name,))
+        # 2. 대상 삭제 (한 문장)
+        cursor.execute(f"DELETE inv FROM inventory inv JOIN items i ON inv.item_id = i.id WHERE {where}", params)
 
         # 3. 골드 지급
         cursor.execute("UPDATE members SET gold = gold + %s WHERE username = %s", (total_sell_price, student_name))
@@ -173,59 +435,112 @@ def sell_all_items(student_name: str):
         conn.commit()
         return {
             "success": True, 
-            "message": f"총 {count}개 아이템 일괄 판매 완료! +{total_sell_price:,}G" 
+            "message": f"총 {count}개 아이템 일괄 판매 완료! +{total_sell_price:,}G",
+            "count": count,
+            "total_price": total_sell_price,
+            "summary": summary,
         }
 
     except Exception as e:
         conn.rollback()
+        if is_retryable(e): raise  # retry_transaction이 다시 실행
         return {"success": False, "message": f"일괄 판매 실패: {str(e)}"}
     finally:
         conn.close()
 
-def play_gacha_fixed(student_name: str):
+# ─── 가챠 공통 로직 (동기/비동기 버전이 함께 사용) ───
+
+def _fixed_gacha_result(picked_item):
+    return {
+        "success": True, 
+        "message": f"💎 프리미엄 가챠 결과: [{picked_item['rarity']}] {picked_item['name']} 획득!",
+        "item_name": picked_item['name'],
+        "rarity": picked_item['rarity']
+    }
+
+def _simulate_dynamic_pulls(all_items, current_fail_count: int, count: int):
+    """천장(Pity) 규칙으로 count회 뽑기를 시뮬레이션합니다. (결과 목록, 최종 fail count) 반환"""
+    pools = gacha_sampler.pools_for(all_items)
+    plan, current_fail_count = pools.plan_dynamic(current_fail_count, count, PITY_LIMIT, LEGENDARY_CHANCE)
+    return pools.fill_plan(plan), current_fail_count
+
+def _dynamic_gacha_result(results, current_fail_count: int):
+    count = len(results)
+    legend_count = sum(1 for r in results if r['rarity'] == 'LEGENDARY')
+    if count > 1:
+        msg = f"총 {count}회 뽑기 완료! (전설: {legend_count}개) - 남은 Pity: {current_fail_count}/50"
+    else:
+        item = results[0]
+        prefix = "🌟 [JACKPOT]" if item['rarity'] == 'LEGENDARY' else f"꽝... ({current_fail_count}/{PITY_LIMIT})"
+        msg = f"{prefix} [{item['rarity']}] {item['name']} 획득!"
+
+    return {
+        "success": True, 
+        "message": msg,
+        "items": results,
+        "fail_count": current_fail_count
+    }
+
+@retry_transaction
+def play_gacha_fixed(student_name: str, conn=None):
     """프리미엄 가챠 (1,000G) - 고정 확률"""
-    conn = get_db_connection()
+    conn = get_db_connection(conn)
     try:
+        # 뽑기는 DB 조회 없이 먼저 처리 (카탈로그 캐시 + alias table)
+        picked_item = gacha_sampler.pools_for(get_items()).pick_weighted()[0]
+
         conn.start_transaction()
         cursor = conn.cursor(dictionary=True, buffered=True)
         
-        # 1. 유저 골드 확인
-        cursor.execute("SELECT gold, username FROM members WHERE name = %s FOR UPDATE", (student_name,))
-        user = cursor.fetchone()
-        if not user: return {"success": False, "message": "사용자를 찾을 수 없습니다."}
-        
-        COST = 1000
-        if user['gold'] < COST: return {"success": False, "message": "골드가 부족합니다! (1,000G 필요)"}
-
-        # 2. 골드 차감
-        cursor.execute("UPDATE members SET gold = gold - %s WHERE username = %s", (COST, user['username']))
-
-        # 3. 아이템 뽑기 (가중치 기반)
-        cursor.execute("SELECT id, name, rarity, gacha_weight FROM items WHERE gacha_weight > 0")
-        items = cursor.fetchall()
-        
-        weights = [item['gacha_weight'] for item in items]
-        picked_item = random.choices(items, weights=weights, k=1)[0]
-        
-        # 4. 인벤토리 지급
-        cursor.execute("INSERT INTO inventory (student_name, item_id) VALUES (%s, %s)", (student_name, picked_item['id']))
+        # 1. 골드 차감 (잔액이 충분할 때만 - 조건부 UPDATE 한 번으로 확인 + 차감)
+        cursor.execute(
+            "UPDATE members SET gold = gold - %s WHERE name = %s AND gold >= %s LIMIT 1",
+            (GACHA_FIXED_COST, student_name, GACHA_FIXED_COST)
+        )
+        if cursor.rowcount == 0:
+            conn.rollback()
+            # 실패한 경우에만 원인 확인
+            cursor.execute("SELECT gold FROM members WHERE name = %s LIMIT 1", (student_name,))
+            if not cursor.fetchone(): return {"success": False, "message": "사용자를 찾을 수 없습니다."}
+            return {"success": False, "message": "골드가 부족합니다! (1,000G 필요)"}
+
+        # 2. 인벤토리 지급
+        _grant_items(cursor, student_name, {picked_item['id']: 1})
         
         conn.commit()
-        return {
-            "success": True, 
-            "message": f"💎 프리미엄 가챠 결과: [{picked_item['rarity']}] {picked_item['name']} 획득!",
-            "item_name": picked_item['name'],
-            "rarity": picked_item['rarity']
-        }
+        return _fixed_gacha_result(picked_item)
     except Exception as e:
         conn.rollback()
+        if is_retryable(e): raise  # retry_transaction이 다시 실행
         return {"success": False, "message": f"가챠 실패: {str(e)}"}
     finally:
         conn.close()
 
-def play_gacha_dynamic(student_name: str, count: int = 1):
-    """럭키 박스 (100G) - 천장 시스템 (변동 확률) - 다중 뽑기 지원"""
-    conn = get_db_connection()
+def _check_pull_count(count: int, bulk: bool = True):
+    if count < 1:
+        return {"success": False, "message": "뽑기 횟수는 1회 이상이어야 합니다."}
+    if not bulk and count > GACHA_LIST_MAX_PULLS:
+        return {"success": False, "message": list_pull_limit_message()}
+    if count > GACHA_MAX_PULLS:
+        return {"success": False, "message": f"한 번에 최대 {GACHA_MAX_PULLS:,}회까지 뽑을 수 있습니다."}
+    return None
+
+def list_pull_limit_message() -> str:
+    return (f"결과 목록 뽑기는 한 번에 최대 {GACHA_LIST_MAX_PULLS:,}회까지 가능합니다. "
+            f"더 많이 뽑으려면 bulk=true로 요청하세요. (요약 결과, 최대 {GACHA_MAX_PULLS:,}회)")
+
+def play_gacha_dynamic(student_name: str, count: int = 1, bulk: bool = False, conn=None):
+    """럭키 박스 (100G) - 천장 시스템 (변동 확률) - 다중 뽑기 지원 (목록 모드는 GACHA_LIST_MAX_PULLS회까지)"""
+    error = _check_pull_count(count, bulk)
+    if error: return error
+    # bulk=True일 때만 결과 목록 대신 요약을 돌려주는 대량 뽑기로 처리 (응답 형식이 다르므로 클라이언트가 선택)
+    if bulk:
+        return play_gacha_bulk(student_name, count, conn=conn)
+    return _play_gacha_dynamic(student_name, count, conn=conn)
+
+@retry_transaction(name="play_gacha_dynamic")
+def _play_gacha_dynamic(student_name: str, count: int, conn=None):
+    conn = get_db_connection(conn)
     try:
         conn.start_transaction()
         cursor = conn.cursor(dictionary=True, buffered=True)
@@ -235,71 +550,245 @@ def play_gacha_dynamic(student_name: str, count: int = 1):
         user = cursor.fetchone()
         if not user: return {"success": False, "message": "사용자를 찾을 수 없습니다."}
 
-        COST_PER_PULL = 100
-        TOTAL_COST = COST_PER_PULL * count
+        TOTAL_COST = GACHA_DYNAMIC_COST * count
 
         if user['gold'] < TOTAL_COST: 
             return {"success": False, "message": f"골드가 부족합니다! ({TOTAL_COST}G 필요)"}
 
-        # 2. 다중 뽑기 시뮬레이션
-        current_fail_count = user['gacha_fail_count']
-        PITY_LIMIT = 50 
-        
-        cursor.execute("SELECT id, name, rarity FROM items")
-        all_items = cursor.fetchall()
-        legendaries = [i for i in all_items if i['rarity'] == 'LEGENDARY']
-        others = [i for i in all_items if i['rarity'] != 'LEGENDARY']
-        
-        results = []
-        
-        for _ in range(count):
-            is_pity = current_fail_count >= (PITY_LIMIT - 1)
-            picked = None
-
-            if is_pity:
-                # 천장
-                picked = random.choice(legendaries) if legendaries else random.choice(all_items)
-            else:
-                # 일반: 1% 확률
-                if random.randint(1, 100) == 1:
-                    picked = random.choice(legendaries) if legendaries else random.choice(all_items)
-                else:
-                    picked = random.choice(others) if others else random.choice(all_items)
-            
-            if picked['rarity'] == 'LEGENDARY':
-                current_fail_count = 0
-            else:
-                current_fail_count += 1
-            
-            results.append(picked)
+        # 2. 다중 뽑기 시뮬레이션 (카탈로그 캐시 사용)
+        results, current_fail_count = _simulate_dynamic_pulls(get_items(), user['gacha_fail_count'], count)
 
         # 3. 골드 및 Fail Count 업데이트
         cursor.execute("UPDATE members SET gold = gold - %s, gacha_fail_count = %s WHERE username = %s", 
                        (TOTAL_COST, current_fail_count, user['username']))
 
-        # 4. 인벤토리 일괄 지급
-        inventory_values = [(student_name, item['id']) for item in results]
-        cursor.executemany("INSERT INTO inventory (student_name, item_id) VALUES (%s, %s)", inventory_values)
+        # 4. 인벤토리 일괄 지급 (아이템별 수량으로 합쳐서)
+        _grant_items(cursor, student_name, Counter(item['id'] for item in results))
 
         conn.commit()
+        return _dynamic_gacha_result(results, current_fail_count)
 
-        legend_count = sum(1 for r in results if r['rarity'] == 'LEGENDARY')
-        if count > 1:
-            msg = f"총 {count}회 뽑기 완료! (전설: {legend_count}개) - 남은 Pity: {current_fail_count}/50"
-        else:
-            item = results[0]
-            prefix = "🌟 [JACKPOT]" if item['rarity'] == 'LEGENDARY' else f"꽝... ({current_fail_count}/{PITY_LIMIT})"
-            msg = f"{prefix} [{item['rarity']}] {item['name']} 획득!"
+    except Exception as e:
+        conn.rollback()
+        if is_retryable(e): raise  # retry_transaction이 다시 실행
+        return {"success": False, "message": f"가챠 실패: {str(e)}"}
+    finally:
+        conn.close()
 
-        return {
-            "success": True, 
-            "message": msg,
-            "items": results,
-            "fail_count": current_fail_count
-        }
+# 시뮬레이션한 천장 카운트가 그대로일 때만 골드 차감 + 카운트 갱신 (다르면 다시 뽑음)
+BULK_GACHA_CHARGE_SQL = """
+    UPDATE members SET gold = gold - %s, gacha_fail_count = %s
+    WHERE username = %s AND gold >= %s AND gacha_fail_count = %s
+"""
+
+@retry_transaction
+def play_gacha_bulk(student_name: str, count: int, conn=None):
+    """
+    럭키 박스 대량 뽑기 - 천장 규칙을 GACHA_CHUNK_SIZE 단위로 시뮬레이션하고
+    아이템별 개수만 모아 인벤토리 수량으로 한 번에 기록합니다.
+    시뮬레이션은 행 잠금 없이 하고, 골드 차감/지급만 짧은 트랜잭션으로 처리합니다.
+    결과는 아이템/등급별 개수 요약으로 반환합니다.
+    """
+    error = _check_pull_count(count)
+    if error: return error
+
+    TOTAL_COST = GACHA_DYNAMIC_COST * count
+    pools = gacha_sampler.pools_for(get_items())
+
+    conn = get_db_connection(conn)
+    try:
+        cursor = conn.cursor(dictionary=True, buffered=True)
+        for _ in range(GACHA_BULK_ATTEMPTS):
+            # 1. 현재 잔액/천장 카운트 확인 (잠금 없음)
+            cursor.execute("SELECT gold, username, gacha_fail_count FROM members WHERE username = %s", (student_name,))
+            user = cursor.fetchone()
+            conn.commit()  # 읽기 스냅샷 종료
+            if not user: return {"success": False, "message": "사용자를 찾을 수 없습니다."}
+            if user['gold'] < TOTAL_COST:
+                return {"success": False, "message": f"골드가 부족합니다! ({TOTAL_COST:,}G 필요)"}
+
+            # 2. 잠금 없이 시뮬레이션
+            started = time.perf_counter()
+            current_fail_count = user['gacha_fail_count']
+            item_counts = Counter()
+            for offset in range(0, count, GACHA_CHUNK_SIZE):
+                size = min(GACHA_CHUNK_SIZE, count - offset)
+                plan, current_fail_count = pools.plan_dynamic(current_fail_count, size, PITY_LIMIT, LEGENDARY_CHANCE)
+                item_counts.update(item['id'] for item in pools.fill_plan(plan))
+            simulate_seconds = time.perf_counter() - started
+
+            # 3. 조건부 차감 + 지급 (이 구간만 members 행을 잠금)
+            started = time.perf_counter()
+            conn.start_transaction()
+            cursor.execute(BULK_GACHA_CHARGE_SQL, (TOTAL_COST, current_fail_count, user['username'],
+                                                   TOTAL_COST, user['gacha_fail_count']))
+            if cursor.rowcount == 0:
+                conn.rollback()  # 그 사이 다른 뽑기/구매가 있었음 → 최신 값으로 다시
+                continue
+            _grant_items(cursor, student_name, item_counts)
+            conn.commit()
+            write_seconds = time.perf_counter() - started
+
+            return _bulk_gacha_result(pools, item_counts, count, current_fail_count, simulate_seconds, write_seconds)
+
+        return {"success": False, "message": "다른 요청과 겹쳐 뽑기를 처리하지 못했습니다. 잠시 후 다시 시도해주세요."}
 
     except Exception as e:
         conn.rollback()
+        if is_retryable(e): raise  # retry_transaction이 다시 실행
         return {"success": False, "message": f"가챠 실패: {str(e)}"}
     finally:
         conn.close()
+
+def _bulk_gacha_result(pools, item_counts, count: int, current_fail_count: int,
+                       simulate_seconds: float, write_seconds: float):
+    items_by_id = pools.items_by_id
+    summary = []
+    rarity_counts = Counter()
+    for item_id, n in item_counts.most_common():
+        item = items_by_id[item_id]
+        summary.append({"item_id": item_id, "name": item['name'], "rarity": item['rarity'], "count": n})
+        rarity_counts[item['rarity']] += n
+
+    return {
+        "success": True,
+        "message": f"총 {count:,}회 뽑기 완료! (전설: {rarity_counts.get('LEGENDARY', 0):,}개) - 남은 Pity: {current_fail_count}/{PITY_LIMIT}",
+        "count": count,
+        "summary": summary,
+        "rarity_summary": dict(rarity_counts),
+        "fail_count": current_fail_count,
+        "timing_ms": {
+            "simulate": round(simulate_seconds * 1000, 2),
+            "write": round(write_seconds * 1000, 2),
+        },
+    }
+
+# ─── 비동기 버전 (aiomysql) - async def 라우트에서 스레드 없이 사용 ───
+
+async def get_items_async():
+    """get_items()의 비동기 버전 (같은 캐시를 공유)"""
+    items = items_cache.peek()
+    if items is not None:
+        return items
+    # 캐시가 비었을 때만 스레드에서 조회 (single-flight 유지)
+    return await run_in_threadpool(items_cache.get)
+
+@sync_fallback(get_user_gold)
+async def get_user_gold_async(student_name: str):
+    """get_user_gold()의 비동기 버전"""
+    async with get_async_connection() as conn:
+        async with dict_cursor(conn) as cursor:
+            await cursor.execute("SELECT gold, gacha_fail_count FROM members WHERE username = %s", (student_name,))
+            result = await cursor.fetchone()
+    if result:
+        return result
+    return {"gold": 0, "gacha_fail_count": 0}
+
+async def _grant_items_async(cursor, student_name: str, item_counts):
+    rows = [(student_name, item_id, n) for item_id, n in item_counts.items()]
+    for i in range(0, len(rows), INVENTORY_WRITE_BATCH):
+        await cursor.executemany(GRANT_ITEMS_SQL, rows[i:i + INVENTORY_WRITE_BATCH])
+
+@sync_fallback(get_inventory)
+async def get_inventory_async(student_name: str, limit: int = None, offset: int = 0):
+    """get_inventory()의 비동기 버전"""
+    async with get_async_connection() as conn:
+        async with dict_cursor(conn) as cursor:
+            sql = """
+                SELECT inv.id, inv.acquired_at, inv.quantity, i.name, i.description, i.image_url, i.price
+                FROM inventory inv
+                JOIN items i ON inv.item_id = i.id
+                WHERE inv.student_name = %s
+                ORDER BY inv.acquired_at DESC, inv.id DESC
+            """
+            params = (student_name,)
+            if limit is not None:
+                sql += " LIMIT %s OFFSET %s"
+                params += (limit, offset)
+            await cursor.execute(sql, params)
+            return list(await cursor.fetchall())
+
+@sync_fallback(buy_item)
+@retry_transaction
+async def buy_item_async(student_name: str, item_id: int):
+    """buy_item()의 비동기 버전 (트랜잭션 처리)"""
+    item = _index_items(await get_items_async()).get(item_id)
+    if not item:
+        return {"success": False, "message": "아이템이 존재하지 않습니다."}
+
+    async with async_transaction() as conn:
+        async with dict_cursor(conn) as cursor:
+            new_gold = await _charge_gold_async(cursor, student_name, item['price'])
+            if new_gold is None:
+                await conn.rollback()
+                await cursor.execute("SELECT 1 FROM members WHERE username = %s", (student_name,))
+                if not await cursor.fetchone():
+                    return {"success": False, "message": "사용자를 찾을 수 없습니다. (DB에 등록된 이름을 입력하세요)"}
+                return {"success": False, "message": "골드가 부족합니다!"}
+
+            await _grant_items_async(cursor, student_name, {item_id: 1})
+
+        await conn.commit()
+        return {"success": True, "message": f"'{item['name']}' 구매 성공! 남은 골드: {new_gold}G"}
+
+@sync_fallback(play_gacha_fixed)
+@retry_transaction
+async def play_gacha_fixed_async(student_name: str):
+    """play_gacha_fixed()의 비동기 버전"""
+    try:
+        picked_item = gacha_sampler.pools_for(await get_items_async()).pick_weighted()[0]
+
+        async with async_transaction() as conn:
+            async with dict_cursor(conn) as cursor:
+                await cursor.execute(
+                    "UPDATE members SET gold = gold - %s WHERE name = %s AND gold >= %s LIMIT 1",
+                    (GACHA_FIXED_COST, student_name, GACHA_FIXED_COST)
+                )
+                if cursor.rowcount == 0:
+                    await conn.rollback()
+                    await cursor.execute("SELECT gold FROM members WHERE name = %s LIMIT 1", (student_name,))
+                    if not await cursor.fetchone(): return {"success": False, "message": "사용자를 찾을 수 없습니다."}
+                    return {"success": False, "message": "골드가 부족합니다! (1,000G 필요)"}
+
+                await _grant_items_async(cursor, student_name, {picked_item['id']: 1})
+
+            await conn.commit()
+            return _fixed_gacha_result(picked_item)
+    except Exception as e:
+        if is_retryable(e): raise
+        return {"success": False, "message": f"가챠 실패: {str(e)}"}
+
+@sync_fallback(play_gacha_dynamic)
+async def play_gacha_dynamic_async(student_name: str, count: int = 1, bulk: bool = False):
+    """play_gacha_dynamic()의 비동기 버전"""
+    error = _check_pull_count(count, bulk)
+    if error: return error
+    if bulk:
+        return await run_in_threadpool(play_gacha_bulk, student_name, count)
+    return await _play_gacha_dynamic_async(student_name, count)
+
+@retry_transaction(name="play_gacha_dynamic_async")
+async def _play_gacha_dynamic_async(student_name: str, count: int):
+    try:
+        async with async_transaction() as conn:
+            async with dict_cursor(conn) as cursor:
+                await cursor.execute("SELECT gold, username, gacha_fail_count FROM members WHERE username = %s FOR UPDATE", (student_name,))
+                user = await cursor.fetchone()
+                if not user: return {"success": False, "message": "사용자를 찾을 수 없습니다."}
+
+                TOTAL_COST = GACHA_DYNAMIC_COST * count
+                if user['gold'] < TOTAL_COST:
+                    return {"success": False, "message": f"골드가 부족합니다! ({TOTAL_COST}G 필요)"}
+
+                results, current_fail_count = _simulate_dynamic_pulls(await get_items_async(), user['gacha_fail_count'], count)
+
+                await cursor.execute("UPDATE members SET gold = gold - %s, gacha_fail_count = %s WHERE username = %s",
+                                     (TOTAL_COST, current_fail_count, user['username']))
+
+                await _grant_items_async(cursor, student_name, Counter(item['id'] for item in results))
+
+            await conn.commit()
+            return _dynamic_gacha_result(results, current_fail_count)
+    except Exception as e:
+        if is_retryable(e): raise
+        return {"success": False, "message": f"가챠 실패: {str(e)}"}
@@ -1,11 +1,41 @@
+import os
+import hashlib
 from database import get_db_connection
+from async_database import get_async_connection, dict_cursor, sync_fallback
+from core.cache import TTLCache, SingleFlightCache
+from core.cache_backend import cache_backend, INVALIDATION_CHANNEL
 
-def get_all_members():
-    """전체 팀원 목록을 딕셔너리 리스트로 반환합니다."""
+# [NEW] 인증 주체(Principal) 캐시: (username, 토큰 digest) -> {username, role}
+# 보호된 API마다 members 테이블을 다시 조회하지 않도록 짧게 캐싱합니다.
+# 인가에 필요한 필드만 보관합니다. (gold, password_hash 등은 캐시에 두지 않음 - 필요한 서비스가 직접 조회)
+principal_cache = TTLCache(
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", 1024)),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", 30)),
+)
+PRINCIPAL_FIELDS = ("username", "role")
+PRINCIPAL_INVALIDATION_PREFIX = "principal:"  # 무효화 채널 메시지: "principal:<username>"
+
+def _principal(member: dict) -> dict:
+    return {field: member.get(field) for field in PRINCIPAL_FIELDS}
+
+def _on_principal_invalidation(message: str):
+    # 다른 워커에서 권한이 바뀐 사용자의 캐시도 비움
+    if message.startswith(PRINCIPAL_INVALIDATION_PREFIX):
+        principal_cache.delete_where(lambda key: key[0] == message[len(PRINCIPAL_INVALIDATION_PREFIX):])
+
+cache_backend.subscribe(INVALIDATION_CHANNEL, _on_principal_invalidation)
+
+# [NEW] 전체 팀원 목록 캐시 (워커 간 공유, 회원가입 시 무효화)
+MEMBERS_CACHE_TTL = float(os.getenv("MEMBERS_CACHE_TTL", 60))
+# 목록 API에 필요한 공개 프로필 컬럼만 조회합니다.
+# 캐시 값은 공유 저장소에 직렬화되므로 password_hash, gold(최대 stale_ttl만큼 오래된 값)는 넣지 않음
+MEMBER_LIST_COLUMNS = ("username", "name", "gender", "style", "location")
+
+def _load_members():
     conn = get_db_connection()
     try:
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM members")
+        cursor.execute("SELECT " + ", ".join(MEMBER_LIST_COLUMNS) + " FROM members")
         members = cursor.fetchall()
         cursor.close()
     finally:
@@ -20,9 +50,19 @@ def get_all_members():
 
     return result
 
-def get_member(username: str):
+members_cache = SingleFlightCache(_load_members, ttl=MEMBERS_CACHE_TTL, stale_ttl=MEMBERS_CACHE_TTL * 5,
+                                  name="members", backend=cache_backend)
+
+def get_all_members():
+    """전체 팀원 목록을 딕셔너리 리스트로 반환합니다."""
+    return members_cache.get()
+
+def invalidate_members():
+    members_cache.invalidate()
+
+def get_member(username: str, conn=None):
     """특정 팀원의 상세 정보를 딕셔너리로 반환합니다."""
-    conn = get_db_connection()
+    conn = get_db_connection(conn)
     try:
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT * FROM members WHERE username = %s", (username,))
@@ -32,6 +72,67 @@ def get_member(username: str):
         conn.close()
     return member
 
+@sync_fallback(get_member)
+async def get_member_async(username: str):
+    """get_member()의 비동기 버전"""
+    async with get_async_connection() as conn:
+        async with dict_cursor(conn) as cursor:
+            await cursor.execute("SELECT * FROM members WHERE username = %s", (username,))
+            return await cursor.fetchone()
+
+def get_principal(username: str, token: str, conn=None):
+    """검증된 토큰의 주인을 {username, role}로 반환합니다. (Principal 캐시 적용)"""
+    key = (username, hashlib.sha256(token.encode("utf-8")).hexdigest())
+    principal = principal_cache.get(key)
+    if principal is None:
+        member = get_member(username, conn=conn)
+        if member is None:
+            return None
+        principal = _principal(member)
+        principal_cache.set(key, principal)
+    return dict(principal)
+
+async def get_principal_async(username: str, token: str):
+    """get_principal()의 비동기 버전 (같은 캐시를 공유)"""
+    key = (username, hashlib.sha256(token.encode("utf-8")).hexdigest())
+    principal = principal_cache.get(key)
+    if principal is None:
+        member = await get_member_async(username)
+        if member is None:
+            return None
+        principal = _principal(member)
+        principal_cache.set(key, principal)
+    return dict(principal)
+
+def invalidate_principal(username: str):
+    """해당 사용자의 Principal 캐시를 비웁니다. (회원가입, 권한 변경 시 호출 - 공유 저장소 사용 시 모든 워커에 전파)"""
+    removed = principal_cache.delete_where(lambda key: key[0] == username)
+    try:
+        cache_backend.publish(INVALIDATION_CHANNEL, PRINCIPAL_INVALIDATION_PREFIX + username)
+    except Exception as e:
+        print(f"⚠️ principal invalidation broadcast failed: {e}")
+    return removed
+
+def set_member_role(username: str, role: str, conn=None):
+    """회원 권한을 바꾸고 Principal 캐시를 비웁니다. (다음 요청부터 바로 새 권한 적용)"""
+    conn = get_db_connection(conn)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE members SET role = %s WHERE username = %s", (role, username))
+        # rowcount는 바뀐 행 수이므로 같은 권한으로 바꾸면 0 → 존재 여부는 따로 확인
+        if cursor.rowcount == 0:
+            cursor.execute("SELECT 1 FROM members WHERE username = %s", (username,))
+            if cursor.fetchone() is None:
+                conn.rollback()
+                cursor.close()
+                return {"success": False, "message": "존재하지 않는 회원입니다."}
+        conn.commit()
+        cursor.close()
+    finally:
+        conn.close()
+    invalidate_principal(username)
+    return {"success": True, "message": f"{username}님의 권한이 {role}(으)로 변경되었습니다."}
+
 def get_ootd(day: str):
     """특정 요일의 OOTD(코디) 기록을 반환합니다."""
     try:
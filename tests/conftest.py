@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# 프로젝트 루트의 모듈(core, services, database ...) 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# database 모듈을 import할 때 MySQL에 미리 연결하지 않도록 light 풀(처음 요청 시 연결)을 사용
+os.environ.setdefault("DB_POOL_RESET_MODE", "light")
+
+
+class FakeCursor:
+    """실행한 SQL만 기록하는 최소한의 커서 (결과 행 없음)"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+
+    def execute(self, operation, params=None):
+        self.connection.statements.append((operation, params))
+        self.rowcount = 0
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """연결 풀 테스트용 가짜 연결"""
+
+    def __init__(self, name):
+        self.name = name
+        self.in_transaction = False
+        self.closed = False
+        self.rollbacks = 0
+        self.pings = 0
+        self.statements = []
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+
+    def close(self):
+        self.closed = True
+
+
+class Connector:
+    """호출할 때마다 FakeConnection을 만들고 기록하는 connect 함수"""
+
+    def __init__(self):
+        self.opened = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            conn = FakeConnection(f"conn-{len(self.opened)}")
+            self.opened.append(conn)
+            return conn
+
+
+@pytest.fixture
+def connector():
+    return Connector()
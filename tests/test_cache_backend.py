@@ -0,0 +1,59 @@
+import threading
+
+from core.cache import SingleFlightCache
+from core.cache_backend import LocalCacheBackend
+
+# 워커 간 공유 캐시 테스트 (같은 LocalCacheBackend를 쓰는 캐시 두 개 = 워커 두 개)
+
+
+def test_add_only_sets_missing_key():
+    backend = LocalCacheBackend()
+    assert backend.add("lock", b"1", ttl=1)
+    assert not backend.add("lock", b"2", ttl=1)
+    assert backend.get("lock") == b"1"
+    assert backend.incr("gen") == 1 and backend.incr("gen") == 2
+
+
+def test_invalidate_during_load_discards_stale_value():
+    # 조회 도중 invalidate()되면 그 조회 결과는 캐시에 남지 않아야 함
+    prices = [100]
+    loading = threading.Event()
+    release = threading.Event()
+
+    def loader():
+        value = {"price": prices[0]}
+        loading.set()
+        release.wait(1)
+        return value
+
+    backend = LocalCacheBackend()
+    cache = SingleFlightCache(loader, ttl=60, name="items_test", backend=backend)
+    first = threading.Thread(target=cache.get)
+    first.start()
+    loading.wait(1)
+    prices[0] = 200
+    cache.invalidate()
+    release.set()
+    first.join()
+    assert cache.get() == {"price": 200}
+
+
+def test_shared_backend_propagates_invalidation_between_workers():
+    backend = LocalCacheBackend()
+    source = {"value": 1}
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return dict(source)
+
+    worker_a = SingleFlightCache(loader, ttl=60, name="shared_test", backend=backend)
+    worker_b = SingleFlightCache(loader, ttl=60, name="shared_test", backend=backend)
+    assert worker_a.get() == {"value": 1}
+    assert worker_b.get() == {"value": 1}
+    assert len(loads) == 1  # b는 공유 저장소의 값을 사용
+
+    source["value"] = 2
+    worker_a.invalidate()
+    assert worker_b.get() == {"value": 2}
+    assert worker_a.get() == {"value": 2}
@@ -0,0 +1,114 @@
+import threading
+import time
+
+from core.cache import TTLCache, SingleFlightCache
+
+# 캐시 테스트 (DB 없이 loader 함수로 확인)
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")          # a를 최근 사용으로
+    cache.set("c", 3)       # 가장 오래 안 쓴 b가 빠짐
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_delete_where():
+    cache = TTLCache()
+    cache.set(("alice", "t1"), 1)
+    cache.set(("alice", "t2"), 2)
+    cache.set(("bob", "t1"), 3)
+    assert cache.delete_where(lambda key: key[0] == "alice") == 2
+    assert cache.get(("bob", "t1")) == 3
+
+
+def test_single_flight_loads_once_for_concurrent_misses():
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(1)
+        return {"value": len(calls)}
+
+    cache = SingleFlightCache(loader, ttl=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [{"value": 1}] * 5
+
+
+def test_invalidate_forces_reload():
+    version = [0]
+
+    def loader():
+        version[0] += 1
+        return version[0]
+
+    cache = SingleFlightCache(loader, ttl=60)
+    assert cache.get() == 1
+    assert cache.get() == 1
+    cache.invalidate()
+    assert cache.get() == 2
+
+
+def test_peek_never_loads_or_waits():
+    loading = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        loading.set()
+        release.wait(1)
+        return len(calls)
+
+    cache = SingleFlightCache(loader, ttl=60)
+    assert cache.peek() is None and not calls  # 빈 캐시: loader를 부르지 않음
+
+    first = threading.Thread(target=cache.get)
+    first.start()
+    loading.wait(1)
+    started = time.monotonic()
+    assert cache.peek() is None  # 다른 요청이 조회 중이어도 기다리지 않음
+    assert time.monotonic() - started < 0.5
+    release.set()
+    first.join()
+    assert cache.peek() == 1
+
+    cache.invalidate()
+    assert cache.peek() is None and len(calls) == 1
+
+
+def test_peek_returns_stale_value_and_refreshes_in_background():
+    version = [0]
+    refreshed = threading.Event()
+
+    def loader():
+        version[0] += 1
+        if version[0] > 1:
+            refreshed.set()
+        return version[0]
+
+    cache = SingleFlightCache(loader, ttl=0.01, stale_ttl=60)
+    assert cache.get() == 1
+    time.sleep(0.02)
+    assert cache.peek() == 1  # 지난 값을 바로 반환
+    assert refreshed.wait(1)
+    for _ in range(100):
+        if cache.peek() >= 2:
+            break
+        time.sleep(0.01)
+    assert cache.peek() >= 2
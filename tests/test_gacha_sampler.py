@@ -0,0 +1,60 @@
+import random
+from collections import Counter
+
+import pytest
+
+from services.gacha_sampler import AliasTable, GachaPools, GachaSampler
+
+# 가챠 샘플러 테스트 (고정 시드로 분포 확인)
+
+
+def test_alias_table_follows_weights():
+    table = AliasTable(["common", "rare", "legendary"], [70, 25, 5])
+    counts = Counter(table.sample_many(100_000, rng=random.Random(1)))
+    assert counts["common"] / 100_000 == pytest.approx(0.70, abs=0.01)
+    assert counts["rare"] / 100_000 == pytest.approx(0.25, abs=0.01)
+    assert counts["legendary"] / 100_000 == pytest.approx(0.05, abs=0.005)
+
+
+def test_alias_table_never_picks_zero_weight():
+    table = AliasTable(["a", "b", "never"], [1, 3, 0])
+    rng = random.Random(2)
+    assert "never" not in set(table.sample_many(10_000, rng=rng))
+    assert table.sample(rng=rng) in {"a", "b"}
+
+
+def test_alias_table_rejects_empty_or_zero_total():
+    with pytest.raises(ValueError):
+        AliasTable([], [])
+    with pytest.raises(ValueError):
+        AliasTable(["a"], [0])
+
+
+ITEMS = [
+    {"id": 1, "rarity": "COMMON", "gacha_weight": 10},
+    {"id": 2, "rarity": "RARE", "gacha_weight": 0},
+    {"id": 3, "rarity": "LEGENDARY", "gacha_weight": 1},
+]
+
+
+def test_plan_dynamic_applies_pity():
+    pools = GachaPools(ITEMS)
+    # 전설 확률 0 → 천장(3번째)마다만 전설
+    plan, fail_count = pools.plan_dynamic(0, 7, pity_limit=3, legendary_chance=0.0)
+    assert plan == [False, False, True, False, False, True, False]
+    assert fail_count == 1
+    results = pools.fill_plan(plan)
+    assert [item["rarity"] == "LEGENDARY" for item in results] == plan
+
+
+def test_pick_weighted_only_uses_weighted_items():
+    pools = GachaPools(ITEMS)
+    assert {item["id"] for item in pools.pick_weighted(1000)} <= {1, 3}
+
+
+def test_sampler_rebuilds_only_when_catalog_changes():
+    sampler = GachaSampler()
+    first = sampler.pools_for(ITEMS)
+    assert sampler.pools_for(ITEMS) is first
+    sampler.pools_for(list(ITEMS))
+    assert sampler.rebuilds == 2
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from core.cache_backend import LocalCacheBackend
+from core.idempotency import IdempotencyStore, IdempotencyConflictError
+
+# Idempotency-Key 저장소 테스트
+
+
+def make_store(**kwargs):
+    return IdempotencyStore(backend=LocalCacheBackend(), **kwargs)
+
+
+def test_replays_stored_result():
+    store = make_store()
+    calls = []
+    fn = lambda: calls.append(1) or {"success": True, "gold": 100 - 10 * len(calls)}
+    first = store.run(("alice", "buy", "k1"), fn, fingerprint="item-1")
+    second = store.run(("alice", "buy", "k1"), fn, fingerprint="item-1")
+    assert first == second == {"success": True, "gold": 90}
+    assert len(calls) == 1
+    assert store.stats()["replays"] == 1
+
+
+def test_same_key_with_different_request_conflicts():
+    store = make_store()
+    store.run(("alice", "buy", "k1"), lambda: "ok", fingerprint="item-1")
+    with pytest.raises(IdempotencyConflictError):
+        store.run(("alice", "buy", "k1"), lambda: "ok", fingerprint="item-2")
+
+
+def test_failed_call_is_not_stored():
+    store = make_store()
+
+    def fail():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        store.run("k1", fail)
+    assert store.run("k1", lambda: "ok") == "ok"
+    assert store.stats()["executions"] == 2
+
+
+def test_concurrent_requests_run_once_and_wait():
+    store = make_store(wait_timeout=2)
+    started = threading.Event()
+    calls = []
+    waited = []
+    results = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "done"
+
+    def request():
+        results.append(store.run("k1", slow, on_wait=lambda: waited.append(1)))
+
+    first = threading.Thread(target=request)
+    first.start()
+    started.wait(1)
+    others = [threading.Thread(target=request) for _ in range(2)]
+    for t in others:
+        t.start()
+    for t in [first] + others:
+        t.join()
+    assert results == ["done"] * 3
+    assert len(calls) == 1
+    assert len(waited) == 2  # 기다린 요청마다 on_wait() 한 번
+
+
+def test_wait_timeout_raises_conflict():
+    store = make_store(wait_timeout=0.05)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(1)
+        return "done"
+
+    first = threading.Thread(target=lambda: store.run("k1", slow))
+    first.start()
+    started.wait(1)
+    with pytest.raises(IdempotencyConflictError):
+        store.run("k1", slow)
+    release.set()
+    first.join()
+
+
+def test_shared_backend_deduplicates_across_stores():
+    # 같은 저장소를 쓰는 두 워커
+    backend = LocalCacheBackend()
+    worker_a, worker_b = IdempotencyStore(backend=backend), IdempotencyStore(backend=backend)
+    calls = []
+    fn = lambda: calls.append(1) or "ok"
+    assert worker_a.run("k1", fn) == worker_b.run("k1", fn) == "ok"
+    assert len(calls) == 1
+
+
+def test_backend_errors_fall_back_to_local_store():
+    class BrokenBackend:
+        def __getattr__(self, name):
+            def fail(*args, **kwargs):
+                raise ConnectionError("redis down")
+            return fail
+
+    store = IdempotencyStore(backend=BrokenBackend())
+    calls = []
+    fn = lambda: calls.append(1) or "ok"
+    assert store.run("k1", fn) == store.run("k1", fn) == "ok"
+    assert len(calls) == 1
+    assert store.stats()["backend_errors"] > 0
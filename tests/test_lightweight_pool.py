@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from database import LightweightPool
+
+# light 풀 테스트: 반납 시 rollback, ping, recycle, 미리 연결 (실제 DB 대신 가짜 연결 사용)
+
+
+def test_lightweight_pool_reuses_returned_connection(connector):
+    pool = LightweightPool(2, connect=connector)
+    first = pool.get_connection()
+    pool.put(first)
+    assert pool.get_connection() is first
+    assert len(connector.opened) == 1
+
+
+def test_lightweight_pool_rolls_back_open_transaction_on_return(connector):
+    pool = LightweightPool(1, connect=connector)
+    conn = pool.get_connection()
+    conn.in_transaction = True
+    pool.put(conn)
+    assert conn.rollbacks == 1
+    assert pool.stats()["rollbacks_on_return"] == 1
+
+
+def test_lightweight_pool_pings_idle_connections_and_recycles_old_ones(connector):
+    pool = LightweightPool(1, ping_after=0, connect=connector, recycle=0)
+    conn = pool.get_connection()
+    pool.put(conn)
+    assert pool.get_connection() is conn
+    assert conn.pings == 1
+
+    pool.put(conn)
+    pool.recycle = 1e-9  # 오래된 연결로 만들기
+    fresh = pool.get_connection()
+    assert fresh is not conn and conn.closed
+    assert pool.stats()["recycled"] == 1
+
+
+def test_lightweight_pool_prewarm_and_close(connector):
+    pool = LightweightPool(3, connect=connector)
+    assert pool.prewarm(5) == 3
+    assert pool.stats()["idle"] == 3
+    pool.close()
+    assert all(conn.closed for conn in connector.opened)
+    assert pool.stats()["created"] == 0
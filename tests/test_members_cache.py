@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from services import user_service
+
+# 팀원 목록 캐시 테스트 - 공유 저장소에 들어가는 값에 민감한 컬럼이 없는지 확인
+
+
+def test_member_list_selects_public_columns_only(monkeypatch, connector):
+    monkeypatch.setattr(user_service, "get_db_connection", lambda conn=None: connector())
+    assert user_service._load_members() == []
+    (sql, _params), = connector.opened[0].statements
+    assert "*" not in sql
+    assert "password_hash" not in sql and "gold" not in sql
+    for column in user_service.MEMBER_LIST_COLUMNS:
+        assert column in sql
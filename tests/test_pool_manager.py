@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from database import LightweightPool, PoolManager, PoolExhaustedError
+
+# 연결 수 한도 / overflow / 대기 테스트 (실제 DB 대신 가짜 연결 사용)
+
+
+def test_pool_manager_uses_overflow_then_times_out(connector):
+    manager = PoolManager(LightweightPool(1, connect=connector), 1, 1, 0.05, name="test", connect=connector)
+    pooled = manager.get_connection()
+    overflow = manager.get_connection()
+    assert not pooled.overflow and overflow.overflow
+    assert manager.stats()["in_use"] == 2
+
+    with pytest.raises(PoolExhaustedError):
+        manager.get_connection()
+    assert manager.stats()["timeouts"] == 1
+
+    overflow.close()
+    assert overflow._raw.closed  # overflow 연결은 실제로 닫힘
+    pooled.close()
+    assert not pooled._raw.closed  # 풀 연결은 풀로 돌아감
+    assert manager.stats()["in_use"] == 0
+
+
+def test_pool_manager_close_is_idempotent_and_wakes_waiter(connector):
+    manager = PoolManager(LightweightPool(1, connect=connector), 1, 0, 1, name="test", connect=connector)
+    held = manager.get_connection()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(manager.get_connection()))
+    waiter.start()
+    held.close()
+    held.close()
+    waiter.join(1)
+    assert got and got[0]._raw is held._raw
+    got[0].close()
+    assert manager.stats()["in_use"] == 0
+
+
+def test_pool_manager_releases_slot_when_connect_fails():
+    def broken():
+        raise RuntimeError("connect failed")
+
+    manager = PoolManager(LightweightPool(1, connect=broken), 1, 0, 0.05, name="test", connect=broken)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            manager.get_connection()
+    assert manager.stats()["in_use"] == 0
+    assert manager.stats()["timeouts"] == 0
+
+
+def test_managed_connection_cursor_runs_on_raw_connection(connector):
+    manager = PoolManager(LightweightPool(1, connect=connector), 1, 0, 0.05, name="test", connect=connector)
+    conn = manager.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT gold FROM members WHERE username = %s", ("alice",))
+    assert cursor.fetchone() is None
+    cursor.close()
+    conn.close()
+    assert connector.opened[0].statements == [("SELECT gold FROM members WHERE username = %s", ("alice",))]
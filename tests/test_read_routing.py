@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+import database
+from core.cache_backend import LocalCacheBackend
+from database import pin_reads, is_pinned, use_replica, read_only
+
+# 읽기 고정(read-your-writes) 테스트 - 고정 표시가 공유 저장소에 있어 다른 워커에서도 보이는지 확인
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    backend = LocalCacheBackend()
+    monkeypatch.setattr(database, "read_pool_manager", object())
+    monkeypatch.setattr(database, "cache_backend", backend)
+    database._read_pins.clear()
+    yield backend
+    database._read_pins.clear()
+
+
+def test_pin_is_visible_from_another_worker(replica):
+    pin_reads("alice")
+    database._read_pins.clear()  # 다른 워커 = 이 워커의 고정 기록이 없음
+    assert is_pinned("alice")
+    assert not is_pinned("bob")
+
+
+def test_pinned_user_reads_from_primary(replica):
+    @read_only
+    def route(pin_key):
+        return use_replica(pin_key)
+
+    assert route("alice") is True
+    pin_reads("alice")
+    assert route("alice") is False
+    assert use_replica("bob") is False  # @read_only 밖은 항상 primary
+
+
+def test_pins_are_ignored_without_replica(monkeypatch):
+    backend = LocalCacheBackend()
+    monkeypatch.setattr(database, "read_pool_manager", None)
+    monkeypatch.setattr(database, "cache_backend", backend)
+    pin_reads("alice")
+    assert not is_pinned("alice")
+    assert backend.get(database._READ_PIN_PREFIX + "alice") is None
+
+
+def test_pin_store_errors_fall_back_to_this_worker(replica, monkeypatch):
+    class BrokenBackend:
+        def set(self, *args, **kwargs):
+            raise ConnectionError("redis down")
+
+        get = set
+
+    monkeypatch.setattr(database, "cache_backend", BrokenBackend())
+    pin_reads("alice")
+    assert is_pinned("alice")
+    assert not is_pinned("bob")
+    assert database.read_routing_stats()["pin_backend_errors"] >= 2
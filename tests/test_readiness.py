@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+import database
+from routers import monitoring
+from routers.monitoring import _TimeoutTracker
+
+# readiness probe 테스트 - 순간적인 대기가 아니라 지속적인 포화에서만 실패하는지 확인
+
+
+class StubPoolManager:
+    capacity = 4
+
+    def __init__(self):
+        self.in_use = 0
+        self.waiting = 0
+        self.timeouts = 0
+
+    def stats(self):
+        return {"in_use": self.in_use, "waiting": self.waiting, "timeouts": self.timeouts}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    stub = StubPoolManager()
+    monkeypatch.setattr(database, "pool_manager", stub)
+    monkeypatch.setattr(database, "read_pool_manager", None)
+    monkeypatch.setattr(monitoring, "_mysql_timeouts", _TimeoutTracker(window=60))
+    return stub
+
+
+def probe():
+    response = monitoring.readiness_probe()
+    return response.status_code, json.loads(response.body)
+
+
+def test_full_pool_with_few_waiters_stays_ready(pool):
+    pool.in_use, pool.waiting = pool.capacity, 1
+    status, body = probe()
+    assert status == 200 and body["ready"]
+
+
+def test_waiting_above_threshold_is_not_ready(pool, monkeypatch):
+    monkeypatch.setattr(monitoring, "READINESS_MAX_WAITING", 2)
+    pool.in_use, pool.waiting = pool.capacity, 3
+    assert probe()[0] == 503
+
+
+def test_recent_checkout_timeout_is_not_ready(pool):
+    pool.timeouts = 5  # 첫 조회 전의 누적값은 기준값
+    assert probe()[0] == 200
+    pool.timeouts = 6
+    status, body = probe()
+    assert status == 503 and body["mysql_pool"]["recent_timeouts"]
+
+
+def test_timeouts_expire_after_window():
+    tracker = _TimeoutTracker(window=10)
+    assert not tracker.recent(0, now=0)
+    assert tracker.recent(1, now=1)
+    assert tracker.recent(1, now=10)
+    assert not tracker.recent(1, now=12)
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+import services.registration_queue as registration_queue_module
+from services.registration_queue import RegistrationQueue, RegistrationQueueFullError
+
+# 수강신청 대기열 테스트 (register_student 대신 호출 순서를 기록하는 함수 사용)
+
+
+class FakeRegistrar:
+    def __init__(self):
+        self.calls = []
+        self.active = {}
+        self.overlaps = 0
+        self.gates = {}
+        self._lock = threading.Lock()
+
+    def block(self, student_name):
+        self.gates[student_name] = threading.Event()
+        return self.gates[student_name]
+
+    def __call__(self, student_name, course_id, waitlist=False):
+        with self._lock:
+            self.calls.append((student_name, course_id))
+            self.active[course_id] = self.active.get(course_id, 0) + 1
+            if self.active[course_id] > 1:
+                self.overlaps += 1
+        gate = self.gates.get(student_name)
+        if gate is not None:
+            gate.wait(2)
+        with self._lock:
+            self.active[course_id] -= 1
+        return {"success": True, "message": f"{student_name} 등록", "waitlist": waitlist}
+
+
+@pytest.fixture
+def registrar(monkeypatch):
+    fake = FakeRegistrar()
+    monkeypatch.setattr(registration_queue_module, "register_student", fake)
+    return fake
+
+
+def wait_until(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+def test_same_course_processed_in_order_one_at_a_time(registrar):
+    queue = RegistrationQueue(workers=3, max_pending=100)
+    release = registrar.block("s0")
+    tickets = [queue.submit(f"s{i}", 1) for i in range(4)]
+    wait_until(lambda: registrar.calls)
+    assert queue.status(tickets[1]["ticket_id"])["position"] == 1
+    release.set()
+    wait_until(lambda: queue.stats()["processed"] == 4)
+    queue.shutdown()
+    assert registrar.calls == [(f"s{i}", 1) for i in range(4)]
+    assert registrar.overlaps == 0
+    done = queue.status(tickets[3]["ticket_id"], "s3")
+    assert done["status"] == "done" and done["result"]["waitlist"] is True
+
+
+def test_processed_registration_pins_student_reads(registrar, monkeypatch):
+    pinned = []
+    monkeypatch.setattr(registration_queue_module, "pin_reads", pinned.append)
+    queue = RegistrationQueue(workers=1, max_pending=10)
+    queue.submit("s0", 1)
+    wait_until(lambda: queue.stats()["processed"] == 1)
+    queue.shutdown()
+    assert pinned == ["s0"]
+
+
+def test_other_courses_are_not_blocked_by_busy_course(registrar):
+    queue = RegistrationQueue(workers=2, max_pending=100)
+    release = registrar.block("a0")
+    queue.submit("a0", 1)
+    queue.submit("a1", 1)
+    queue.submit("b0", 2)
+    # 강좌 1이 처리 중인 동안 강좌 2가 먼저 끝남
+    wait_until(lambda: ("b0", 2) in registrar.calls)
+    assert ("a1", 1) not in registrar.calls
+    release.set()
+    wait_until(lambda: queue.stats()["processed"] == 3)
+    queue.shutdown()
+    assert registrar.calls == [("a0", 1), ("b0", 2), ("a1", 1)]
+
+
+def test_duplicate_submit_returns_same_ticket_and_full_queue_rejects(registrar):
+    queue = RegistrationQueue(workers=1, max_pending=2)
+    release = registrar.block("s0")
+    first = queue.submit("s0", 1)
+    assert queue.submit("s0", 1)["ticket_id"] == first["ticket_id"]
+    queue.submit("s1", 1)
+    with pytest.raises(RegistrationQueueFullError):
+        queue.submit("s2", 1)
+    assert queue.status(first["ticket_id"], "someone-else") is None
+    release.set()
+    wait_until(lambda: queue.stats()["processed"] == 2)
+    queue.shutdown()
+    assert queue.stats()["rejected"] == 1
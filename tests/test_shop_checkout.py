@@ -0,0 +1,116 @@
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+import services.shop_service as shop_service
+from services.shop_service import checkout_cart, CHARGE_GOLD_SQL, LOCK_GOLD_SQL, GRANT_ITEMS_SQL
+
+# 장바구니 결제 테스트 - members/inventory 대신 MySQL의 rowcount 규칙(바뀐 행 수)을 흉내 내는 가짜 커서 사용
+
+CATALOG = [
+    {"id": 1, "name": "무료 스티커", "price": 0, "rarity": "COMMON"},
+    {"id": 2, "name": "모자", "price": 300, "rarity": "RARE"},
+]
+
+
+class ShopCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = -1
+        self.lastrowid = None
+        self._row = None
+
+    def execute(self, operation, params=()):
+        self._row = None
+        if operation == CHARGE_GOLD_SQL:
+            amount, username, _ = params
+            gold = self.db.gold.get(username)
+            if gold is None or gold < amount:
+                self.rowcount = 0
+                return
+            self.db.gold[username] = gold - amount
+            # CLIENT_FOUND_ROWS 없이 연결하므로 값이 그대로면(0G 차감) 0으로 보고됨
+            self.rowcount = 1 if amount else 0
+            self.lastrowid = gold - amount
+        elif operation == LOCK_GOLD_SQL:
+            username = params[0]
+            self._row = {"gold": self.db.gold[username]} if username in self.db.gold else None
+        elif operation.startswith("SELECT 1 FROM members"):
+            self._row = {"1": 1} if params[0] in self.db.gold else None
+        else:
+            raise AssertionError(f"unexpected SQL: {operation}")
+
+    def executemany(self, operation, rows):
+        assert operation == GRANT_ITEMS_SQL
+        for username, item_id, quantity in rows:
+            key = (username, item_id)
+            self.db.inventory[key] = self.db.inventory.get(key, 0) + quantity
+
+    def fetchone(self):
+        return self._row
+
+    def close(self):
+        pass
+
+
+class ShopConnection:
+    def __init__(self, gold):
+        self.gold = dict(gold)
+        self.inventory = {}
+        self.in_transaction = False
+        self.commits = 0
+
+    def start_transaction(self):
+        self.in_transaction = True
+
+    def cursor(self, *args, **kwargs):
+        return ShopCursor(self)
+
+    def commit(self):
+        self.in_transaction = False
+        self.commits += 1
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def catalog(monkeypatch):
+    monkeypatch.setattr(shop_service, "get_items", lambda: CATALOG)
+
+
+def test_zero_total_checkout_succeeds():
+    conn = ShopConnection({"alice": 0})
+    result = checkout_cart("alice", [(1, 3)], conn=conn)
+    assert result["success"] is True
+    assert result["total_price"] == 0 and result["gold"] == 0
+    assert conn.inventory == {("alice", 1): 3}
+    assert conn.commits == 1
+
+
+def test_zero_total_checkout_for_unknown_member_fails():
+    conn = ShopConnection({})
+    result = checkout_cart("nobody", [(1, 1)], conn=conn)
+    assert result["success"] is False
+    assert "사용자를 찾을 수 없습니다" in result["message"]
+    assert conn.inventory == {}
+
+
+def test_checkout_charges_total_once():
+    conn = ShopConnection({"alice": 1000})
+    result = checkout_cart("alice", [(2, 2), (1, 1), (99, 1)], conn=conn)
+    assert result["success"] is True
+    assert result["total_price"] == 600 and result["gold"] == 400
+    assert conn.inventory == {("alice", 2): 2, ("alice", 1): 1}
+    assert [line["success"] for line in result["lines"]] == [True, True, False]
+
+
+def test_checkout_with_insufficient_gold_fails():
+    conn = ShopConnection({"alice": 100})
+    result = checkout_cart("alice", [(2, 1)], conn=conn)
+    assert result["success"] is False
+    assert "골드가 부족합니다" in result["message"]
+    assert conn.gold["alice"] == 100 and conn.inventory == {}
@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+import services.shop_service as shop_service
+from services.shop_service import play_gacha_dynamic, GACHA_LIST_MAX_PULLS, GACHA_MAX_PULLS
+
+# 럭키 박스 뽑기 횟수 제한 테스트 - 제한에 걸리면 DB 연결을 쓰지 않아야 함
+
+
+class NoConnection:
+    def __getattr__(self, name):
+        raise AssertionError("DB connection must not be used")
+
+
+def test_list_mode_rejects_large_counts_without_touching_db():
+    result = play_gacha_dynamic("alice", GACHA_LIST_MAX_PULLS + 1, conn=NoConnection())
+    assert result["success"] is False
+    assert "bulk=true" in result["message"]
+
+
+def test_large_counts_go_to_bulk_mode(monkeypatch):
+    calls = []
+    monkeypatch.setattr(shop_service, "play_gacha_bulk",
+                        lambda student_name, count, conn=None: calls.append(count) or {"success": True})
+    assert play_gacha_dynamic("alice", GACHA_LIST_MAX_PULLS + 1, bulk=True)["success"] is True
+    assert calls == [GACHA_LIST_MAX_PULLS + 1]
+
+
+def test_bulk_mode_keeps_its_own_limit():
+    result = play_gacha_dynamic("alice", GACHA_MAX_PULLS + 1, bulk=True, conn=NoConnection())
+    assert result["success"] is False
+    assert f"{GACHA_MAX_PULLS:,}" in result["message"]
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+import core.transactions as transactions
+from core.transactions import retry_transaction, error_code, is_retryable, DEADLOCK, LOCK_WAIT_TIMEOUT
+
+# 트랜잭션 재시도 테스트 (mysql.connector/aiomysql 오류 대신 errno를 가진 예외 사용)
+
+
+class FakeMySQLError(Exception):
+    def __init__(self, errno):
+        super().__init__(f"MySQL error {errno}")
+        self.errno = errno
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(transactions, "TX_RETRY_BASE_DELAY", 0)
+
+
+def test_error_code_reads_errno_and_args():
+    assert error_code(FakeMySQLError(DEADLOCK)) == DEADLOCK
+    assert error_code(Exception(LOCK_WAIT_TIMEOUT, "Lock wait timeout")) == LOCK_WAIT_TIMEOUT  # PyMySQL 형식
+    assert error_code(ValueError("x")) is None
+    assert is_retryable(FakeMySQLError(DEADLOCK))
+    assert not is_retryable(FakeMySQLError(1062))
+
+
+def test_retries_deadlock_until_success():
+    calls = []
+
+    @retry_transaction(attempts=3)
+    def buy():
+        calls.append(1)
+        if len(calls) < 3:
+            raise FakeMySQLError(DEADLOCK)
+        return "ok"
+
+    assert buy() == "ok"
+    assert len(calls) == 3
+
+
+def test_gives_up_after_max_attempts():
+    calls = []
+
+    @retry_transaction(attempts=2)
+    def buy():
+        calls.append(1)
+        raise FakeMySQLError(LOCK_WAIT_TIMEOUT)
+
+    with pytest.raises(FakeMySQLError):
+        buy()
+    assert len(calls) == 2
+
+
+def test_does_not_retry_other_errors():
+    calls = []
+
+    @retry_transaction
+    def buy():
+        calls.append(1)
+        raise FakeMySQLError(1062)
+
+    with pytest.raises(FakeMySQLError):
+        buy()
+    assert len(calls) == 1
+
+
+def test_retries_async_functions():
+    calls = []
+
+    @retry_transaction(attempts=3)
+    async def buy():
+        calls.append(1)
+        if len(calls) == 1:
+            raise FakeMySQLError(DEADLOCK)
+        return "ok"
+
+    assert asyncio.run(buy()) == "ok"
+    assert len(calls) == 2
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from core.user_gate import UserGate, UserBusyError
+
+# 사용자별 쓰기 게이트 테스트
+
+
+def test_same_user_requests_run_one_at_a_time():
+    gate = UserGate(max_wait=2, max_waiters=8)
+    active = []
+    overlaps = []
+    lock = threading.Lock()
+
+    def request():
+        with gate.hold("alice"):
+            with lock:
+                active.append(1)
+                if len(active) > 1:
+                    overlaps.append(1)
+            time.sleep(0.01)
+            with lock:
+                active.pop()
+
+    threads = [threading.Thread(target=request) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not overlaps
+    assert gate.stats()["acquired"] == 5
+    assert gate.stats()["active_keys"] == 0
+
+
+def test_other_users_are_not_blocked():
+    gate = UserGate(max_wait=0.05)
+    with gate.hold("alice"):
+        with gate.hold("bob"):
+            pass
+    assert gate.stats()["contended"] == 0
+
+
+def test_on_wait_called_only_when_waiting():
+    gate = UserGate(max_wait=1)
+    waited = []
+
+    def second_request():
+        with gate.hold("alice", on_wait=lambda: waited.append("second")):
+            pass
+
+    with gate.hold("alice", on_wait=lambda: waited.append("first")):
+        second = threading.Thread(target=second_request)
+        second.start()
+        time.sleep(0.05)
+    second.join(1)
+    assert waited == ["second"]
+    assert gate.stats()["active_keys"] == 0
+
+
+def test_wait_timeout_raises_busy():
+    gate = UserGate(max_wait=0.05)
+    with gate.hold("alice"):
+        errors = []
+
+        def request():
+            try:
+                with gate.hold("alice"):
+                    pass
+            except UserBusyError as e:
+                errors.append(e)
+
+        t = threading.Thread(target=request)
+        t.start()
+        t.join()
+    assert len(errors) == 1
+    assert gate.stats()["timeouts"] == 1
+
+
+def test_too_many_waiters_rejected_immediately():
+    gate = UserGate(max_wait=1, max_waiters=0)
+    with gate.hold("alice"):
+        with pytest.raises(UserBusyError):
+            with gate.hold("alice"):
+                pass
+    assert gate.stats()["rejected"] == 1